@@ -399,5 +399,43 @@ CREATE INDEX idx_produtora_username ON Produtora (username);
 CREATE INDEX idx_produtora_email ON Produtora USING GIN (email);
 CREATE INDEX idx_musica_titulo ON Musica (titulo);
 CREATE INDEX idx_colecao_titulo ON Colecao (titulo);
+CREATE INDEX idx_colecao_tipo_data_lancamento ON Colecao (tipo, data_lancamento);
+CREATE INDEX idx_genero_surgiu_em ON Genero (surgiu_em);
+CREATE INDEX idx_genero_colecao_id_colecao ON Genero_Colecao (id_colecao);
+
+-- Busca textual de títulos de coleções e nomes de gêneros (pg_trgm + unaccent)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+  LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+  AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+CREATE INDEX idx_colecao_titulo_trgm ON Colecao USING GIN (titulo gin_trgm_ops);
+CREATE INDEX idx_colecao_titulo_normalizado_trgm ON Colecao USING GIN (f_unaccent(lower(titulo)) gin_trgm_ops);
+CREATE INDEX idx_genero_nome_normalizado_trgm ON Genero USING GIN (f_unaccent(lower(nome)) gin_trgm_ops);
+
+-- Estatísticas do catálogo: visões materializadas atualizadas com REFRESH ... CONCURRENTLY (por isso o índice único)
+CREATE TABLE Estatisticas_Atualizacao (
+  visao VARCHAR(60) PRIMARY KEY,
+  atualizada_em TIMESTAMPTZ NOT NULL
+);
+CREATE MATERIALIZED VIEW Estatisticas_Genero AS
+  SELECT gc.id_genero, count(*) AS colecoes, sum(c.duracao) AS duracao_total,
+         avg(c.duracao)::double precision AS duracao_media
+  FROM Genero_Colecao gc JOIN Colecao c ON c.id_colecao = gc.id_colecao
+  GROUP BY gc.id_genero;
+CREATE MATERIALIZED VIEW Estatisticas_Tipo AS
+  SELECT tipo, count(*) AS colecoes, sum(duracao) AS duracao_total,
+         avg(duracao)::double precision AS duracao_media
+  FROM Colecao GROUP BY tipo;
+CREATE MATERIALIZED VIEW Estatisticas_Ano AS
+  SELECT extract(year FROM data_lancamento)::integer AS ano, count(*) AS colecoes,
+         sum(duracao) AS duracao_total, avg(duracao)::double precision AS duracao_media
+  FROM Colecao GROUP BY 1;
+CREATE UNIQUE INDEX idx_estatisticas_genero_id_genero ON Estatisticas_Genero (id_genero);
+CREATE UNIQUE INDEX idx_estatisticas_tipo_tipo ON Estatisticas_Tipo (tipo);
+CREATE UNIQUE INDEX idx_estatisticas_ano_ano ON Estatisticas_Ano (ano);
+INSERT INTO Estatisticas_Atualizacao (visao, atualizada_em) VALUES
+  ('estatisticas_genero', now()), ('estatisticas_tipo', now()), ('estatisticas_ano', now());
+
 CREATE INDEX idx_evento_inicio ON Evento (inicio);
 CREATE INDEX idx_playlist_nome ON Playlist (nome);
\ No newline at end of file
@@ -0,0 +1,316 @@
+"""Teste de carga HTTP: uma mistura de requisições, com concorrência configurável, contra cada backend da API.
+
+`rodar` amostra IDs e títulos de cada backend e então, para um backend de cada vez (para que um não dispute
+CPU e disco com o outro), dispara requisições sorteadas da mistura durante `--duracao` segundos, depois de
+`--aquecimento` segundos não medidos. O JSON de saída traz, por endpoint, a vazão, a latência média, p50, p95
+e p99 e a taxa de erros. `comparar` mostra a variação de cada endpoint entre duas rodadas e, com
+`--tolerancia`, sai com status 1 se algum piorou mais que o tolerado.
+
+Exemplo (com a API rodando em outro terminal e os bancos com dados):
+
+    python benchmarks/bench_carga.py rodar http://localhost:8000 --concorrencia 50 --saida antes.json
+    python benchmarks/bench_carga.py comparar antes.json depois.json --tolerancia 5
+
+A mistura padrão é MISTURA; `--mistura arquivo.json` a substitui por outra no mesmo formato. Nas rotas e nos
+corpos, `{id_colecao}`, `{id_genero}` e `{termo}` vêm da amostra, `{duracao}` é sorteada e `{unico}` é único
+na rodada. Com a mesma `--semente`, cada worker sorteia a mesma sequência de requisições.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from datetime import UTC, datetime
+from time import perf_counter
+from urllib.parse import quote
+from uuid import uuid4
+
+import httpx
+from bench_http import percentil
+
+# Nome do endpoint: peso no sorteio, método, rota (relativa ao backend) e corpo opcional
+MISTURA = {
+    'listar colecoes': {'peso': 15, 'metodo': 'GET', 'rota': '/colecoes/?limit=20'},
+    'colecao por id': {'peso': 25, 'metodo': 'GET', 'rota': '/colecoes/{id_colecao}'},
+    'buscar colecoes': {'peso': 15, 'metodo': 'GET', 'rota': '/colecoes/buscar?titulo={termo}&limit=20'},
+    'busca facetada': {
+        'peso': 5,
+        'metodo': 'GET',
+        'rota': '/colecoes/buscar/facetas?titulo={termo}&limit=20',
+    },
+    'listar generos': {'peso': 10, 'metodo': 'GET', 'rota': '/generos/?limit=20'},
+    'genero por id': {'peso': 10, 'metodo': 'GET', 'rota': '/generos/{id_genero}'},
+    'estatisticas': {'peso': 5, 'metodo': 'GET', 'rota': '/estatisticas/tipos'},
+    'alterar colecao': {
+        'peso': 10,
+        'metodo': 'PATCH',
+        'rota': '/colecoes/{id_colecao}',
+        'corpo': {'duracao': '{duracao}'},
+    },
+    'criar colecao': {
+        'peso': 5,
+        'metodo': 'POST',
+        'rota': '/colecoes/',
+        'corpo': {
+            'titulo': 'Carga {unico}',
+            'tipo': 'Album',
+            'duracao': '{duracao}',
+            'caminho_capa': '/capas/carga.jpg',
+            'data_lancamento': '2001-01-01',
+        },
+    },
+}
+
+STATUS_ERRO = 400  # a partir deste status a resposta conta como erro (0: falha de conexão ou timeout)
+TAMANHO_MINIMO_TERMO = 3
+
+
+def preencher(modelo, campos: dict):
+    """Substitui os campos em um corpo; um valor que é só `{campo}` recebe o valor com o seu tipo."""
+    if isinstance(modelo, dict):
+        return {chave: preencher(valor, campos) for chave, valor in modelo.items()}
+    if isinstance(modelo, str):
+        if modelo.startswith('{') and modelo.endswith('}') and modelo[1:-1] in campos:
+            return campos[modelo[1:-1]]
+        return modelo.format(**campos)
+    return modelo
+
+
+async def amostrar(client: httpx.AsyncClient, backend: str, tamanho: int) -> dict:
+    """IDs de coleções e gêneros e termos de busca (palavras dos títulos) de uma página de cada backend."""
+    colecoes = (await client.get(f'/{backend}/colecoes/', params={'limit': tamanho})).raise_for_status()
+    generos = (await client.get(f'/{backend}/generos/', params={'limit': tamanho})).raise_for_status()
+    colecoes, generos = colecoes.json()['colecoes'], generos.json()['generos']
+
+    termos = {
+        palavra.lower()
+        for colecao in colecoes
+        for palavra in colecao['titulo'].split()
+        if len(palavra) >= TAMANHO_MINIMO_TERMO
+    }
+    amostra = {
+        'id_colecao': [colecao['id_colecao'] for colecao in colecoes],
+        'id_genero': [genero['id_genero'] for genero in generos],
+        'termo': sorted(termos),
+    }
+    vazios = [campo for campo, valores in amostra.items() if not valores]
+    if vazios:
+        sys.exit(f'O backend {backend} não tem dados para a amostra ({", ".join(vazios)}); carregue-o antes.')
+    return amostra
+
+
+def montar_requisicao(endpoint: dict, amostra: dict, rng, unico: str) -> tuple[str, str, dict | None]:
+    """Método, rota e corpo de uma requisição ao endpoint, com os campos sorteados."""
+    campos = {campo: rng.choice(valores) for campo, valores in amostra.items()}
+    campos |= {'duracao': rng.randint(60, 7200), 'unico': unico}
+
+    rota = endpoint['rota'].format(**{campo: quote(str(valor)) for campo, valor in campos.items()})
+    corpo = preencher(endpoint['corpo'], campos) if 'corpo' in endpoint else None
+    return endpoint['metodo'], rota, corpo
+
+
+async def worker(client, backend: str, carga: dict, rng):
+    nomes = list(carga['mistura'])
+    pesos = [carga['mistura'][nome]['peso'] for nome in nomes]
+    prefixo = uuid4().hex[:8]  # `{unico}` não se repete entre workers nem entre rodadas
+    inicio_medicao, fim = carga['janela']
+
+    n = 0
+    while perf_counter() < fim:
+        n += 1
+        nome = rng.choices(nomes, pesos)[0]
+        metodo, rota, corpo = montar_requisicao(
+            carga['mistura'][nome], carga['amostra'], rng, f'{prefixo}-{n}'
+        )
+
+        inicio = perf_counter()
+        try:
+            response = await client.request(metodo, f'/{backend}{rota}', json=corpo)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        latencia = perf_counter() - inicio
+
+        if inicio >= inicio_medicao:
+            medicao = carga['medicoes'][nome]
+            medicao['latencias'].append(latencia)
+            if status == 0 or status >= STATUS_ERRO:
+                medicao['erros'][status] += 1
+
+
+def resumir(latencias: list[float], erros: Counter, duracao: float) -> dict:
+    total_erros = sum(erros.values())
+    return {
+        'requisicoes': len(latencias),
+        'vazao': len(latencias) / duracao,
+        'media_ms': statistics.mean(latencias) * 1000 if latencias else 0.0,
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p95_ms': percentil(latencias, 95) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+        'erros': total_erros,
+        'taxa_erros': total_erros / len(latencias) if latencias else 0.0,
+        'status_erros': {str(status): quantidade for status, quantidade in sorted(erros.items())},
+    }
+
+
+async def rodar_backend(client, backend: str, mistura: dict, args) -> dict:
+    medicoes = {nome: {'latencias': [], 'erros': Counter()} for nome in mistura}
+    inicio_medicao = perf_counter() + args.aquecimento
+    carga = {
+        'mistura': mistura,
+        'amostra': await amostrar(client, backend, args.amostra),
+        'janela': (inicio_medicao, inicio_medicao + args.duracao),
+        'medicoes': medicoes,
+    }
+    await asyncio.gather(
+        *(
+            worker(client, backend, carga, random.Random(f'{args.semente}-{i}'))
+            for i in range(args.concorrencia)
+        )
+    )
+
+    endpoints = {
+        nome: resumir(medicao['latencias'], medicao['erros'], args.duracao)
+        for nome, medicao in medicoes.items()
+    }
+    todas = [latencia for medicao in medicoes.values() for latencia in medicao['latencias']]
+    erros = sum((medicao['erros'] for medicao in medicoes.values()), Counter())
+    return {'total': resumir(todas, erros, args.duracao), 'endpoints': endpoints}
+
+
+def versao_git() -> str | None:
+    """Commit do código medido (com `-dirty` se houver alterações), para identificar a rodada."""
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(resultado: dict):
+    for backend, dados in resultado['backends'].items():
+        print(f'{backend}:')
+        for nome, r in {**dados['endpoints'], 'TOTAL': dados['total']}.items():
+            print(
+                f'  {nome:<16} {r["vazao"]:8.1f} req/s | p50 {r["p50_ms"]:7.1f} ms | '
+                f'p95 {r["p95_ms"]:7.1f} ms | p99 {r["p99_ms"]:7.1f} ms | erros {r["taxa_erros"]:6.2%}'
+            )
+
+
+async def rodar(args):
+    mistura = MISTURA
+    if args.mistura:
+        with open(args.mistura, encoding='utf-8') as arquivo:
+            mistura = json.load(arquivo)
+
+    limits = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+    resultado = {
+        'criado_em': datetime.now(UTC).isoformat(),
+        'versao': versao_git(),
+        'url': args.url,
+        'parametros': {
+            'concorrencia': args.concorrencia,
+            'duracao': args.duracao,
+            'aquecimento': args.aquecimento,
+            'semente': args.semente,
+            'amostra': args.amostra,
+            'mistura': mistura,
+        },
+        'backends': {},
+    }
+    async with httpx.AsyncClient(base_url=args.url.rstrip('/'), limits=limits, timeout=30) as client:
+        for backend in args.backends:
+            resultado['backends'][backend] = await rodar_backend(client, backend, mistura, args)
+
+    imprimir(resultado)
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f'Resultado gravado em {args.saida}')
+
+
+def variacao(antes: float, depois: float) -> float:
+    return (depois - antes) / antes * 100 if antes else 0.0
+
+
+def comparar(args):
+    with open(args.antes, encoding='utf-8') as arquivo:
+        antes = json.load(arquivo)
+    with open(args.depois, encoding='utf-8') as arquivo:
+        depois = json.load(arquivo)
+    print(f'{antes["versao"]} ({antes["criado_em"]}) -> {depois["versao"]} ({depois["criado_em"]})')
+
+    # Piora: vazão menor, p95 maior (em %) ou taxa de erros maior (em pontos percentuais) que a tolerância
+    pioras = []
+    for backend in sorted(antes['backends'].keys() & depois['backends'].keys()):
+        print(f'{backend}:')
+        endpoints_antes = {
+            **antes['backends'][backend]['endpoints'],
+            'TOTAL': antes['backends'][backend]['total'],
+        }
+        endpoints_depois = {
+            **depois['backends'][backend]['endpoints'],
+            'TOTAL': depois['backends'][backend]['total'],
+        }
+        for nome, a in endpoints_antes.items():
+            if nome not in endpoints_depois:
+                print(f'  {nome:<16} (ausente na segunda rodada)')
+                continue
+            d = endpoints_depois[nome]
+            vazao = variacao(a['vazao'], d['vazao'])
+            p95 = variacao(a['p95_ms'], d['p95_ms'])
+            erros = (d['taxa_erros'] - a['taxa_erros']) * 100
+            piorou = args.tolerancia is not None and (
+                -vazao > args.tolerancia or p95 > args.tolerancia or erros > args.tolerancia
+            )
+            if piorou:
+                pioras.append(f'{backend} {nome}')
+            marca = '!' if piorou else ' '
+            print(
+                f'{marca} {nome:<16} vazão {a["vazao"]:8.1f} -> {d["vazao"]:8.1f} ({vazao:+6.1f}%) | '
+                f'p50 {variacao(a["p50_ms"], d["p50_ms"]):+6.1f}% | p95 {p95:+6.1f}% | '
+                f'p99 {variacao(a["p99_ms"], d["p99_ms"]):+6.1f}% | '
+                f'erros {a["taxa_erros"]:6.2%} -> {d["taxa_erros"]:6.2%}'
+            )
+
+    if pioras:
+        sys.exit(f'Pioraram mais que {args.tolerancia}%: {", ".join(pioras)}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    parser_rodar = subparsers.add_parser('rodar', help='dispara a carga e grava o resultado em JSON')
+    parser_rodar.add_argument('url', help='raiz da API, ex.: http://localhost:8000')
+    parser_rodar.add_argument(
+        '--backends', nargs='+', choices=['postgres', 'mongo'], default=['postgres', 'mongo']
+    )
+    parser_rodar.add_argument('--concorrencia', type=int, default=50, help='requisições simultâneas')
+    parser_rodar.add_argument('--duracao', type=float, default=30.0, help='segundos medidos por backend')
+    parser_rodar.add_argument('--aquecimento', type=float, default=5.0, help='segundos não medidos')
+    parser_rodar.add_argument('--semente', type=int, default=0)
+    parser_rodar.add_argument('--amostra', type=int, default=200, help='coleções e gêneros amostrados')
+    parser_rodar.add_argument('--mistura', help='arquivo JSON com a mistura de requisições')
+    parser_rodar.add_argument('--saida', default='carga.json')
+
+    parser_comparar = subparsers.add_parser('comparar', help='compara duas rodadas')
+    parser_comparar.add_argument('antes')
+    parser_comparar.add_argument('depois')
+    parser_comparar.add_argument(
+        '--tolerancia',
+        type=float,
+        help='piora máxima aceita, em % (vazão e p95) e pontos percentuais (erros)',
+    )
+
+    args = parser.parse_args()
+    if args.comando == 'rodar':
+        asyncio.run(rodar(args))
+    else:
+        comparar(args)
@@ -0,0 +1,78 @@
+"""Latência de `PUT /colecoes/{id}/generos` com conjuntos grandes de gêneros.
+
+Cria `--generos` gêneros (1000 por padrão) e uma coleção, define todos na coleção e então mede trocas com
+diferentes tamanhos de mudança: o mesmo conjunto (nada muda), um gênero trocado, metade trocada e o conjunto
+inteiro trocado. Cada cenário é repetido `--repeticoes` vezes, alternando entre os dois conjuntos do cenário.
+
+Exemplo (com a API rodando em outro terminal):
+
+    python benchmarks/bench_definir_generos.py http://localhost:8000/postgres --repeticoes 50
+"""
+
+import argparse
+import asyncio
+import statistics
+from time import perf_counter
+from uuid import uuid4
+
+import httpx
+from bench_http import percentil
+
+
+async def main(args):
+    prefixo = uuid4().hex[:8]  # nomes de gênero únicos entre execuções
+    n = args.generos
+
+    async with httpx.AsyncClient(base_url=args.url.rstrip('/'), timeout=60) as client:
+        response = await client.post(
+            '/generos/bulk',
+            json=[{'nome': f'{prefixo}-{i}', 'surgiu_em': '1970-01-01'} for i in range(2 * n)],
+        )
+        response.raise_for_status()
+        ids = [item['id'] for item in response.json()['resultados']]
+        base, reserva = ids[:n], ids[n:]
+
+        response = await client.post(
+            '/colecoes/',
+            json={
+                'titulo': f'Bench {prefixo}',
+                'tipo': 'Album',
+                'duracao': 2400,
+                'caminho_capa': '/capas/bench.jpg',
+                'data_lancamento': '2001-01-01',
+            },
+        )
+        response.raise_for_status()
+        url = f'/colecoes/{response.json()["id_colecao"]}/generos'
+        (await client.put(url, json=base)).raise_for_status()
+
+        cenarios = {
+            'mesmo conjunto': base,
+            '1 trocado': base[1:] + reserva[:1],
+            'metade trocada': base[n // 2 :] + reserva[: n // 2],
+            'todos trocados': reserva,
+        }
+
+        print(f'{args.url} ({n} gêneros, {args.repeticoes} chamadas por cenário)')
+        for nome, alterado in cenarios.items():
+            latencias = []
+            for i in range(args.repeticoes):
+                inicio = perf_counter()
+                response = await client.put(url, json=alterado if i % 2 == 0 else base)
+                latencias.append(perf_counter() - inicio)
+                response.raise_for_status()
+            print(
+                f'  {nome:<15} média {statistics.mean(latencias) * 1000:7.2f} ms | '
+                f'p50 {percentil(latencias, 50) * 1000:7.2f} ms | '
+                f'p99 {percentil(latencias, 99) * 1000:7.2f} ms'
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('url', help='prefixo do backend, ex.: http://localhost:8000/postgres')
+    parser.add_argument('--generos', type=int, default=1000)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
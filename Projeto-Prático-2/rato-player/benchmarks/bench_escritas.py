@@ -0,0 +1,85 @@
+"""Latência por chamada das rotas de escrita (criar, PUT, PATCH e DELETE) de um backend.
+
+Cada operação é repetida `--repeticoes` vezes, em sequência, para medir o custo de uma chamada isolada
+(as idas e voltas ao banco), e não a vazão. Compare duas versões da API rodando o script contra cada uma.
+
+Exemplo (com a API rodando em outro terminal):
+
+    python benchmarks/bench_escritas.py http://localhost:8000/mongo --repeticoes 500
+"""
+
+import argparse
+import asyncio
+import statistics
+from time import perf_counter
+from uuid import uuid4
+
+import httpx
+from bench_http import percentil
+
+
+async def medir(latencias: dict[str, list[float]], operacao: str, requisicao):
+    inicio = perf_counter()
+    response = await requisicao
+    latencias.setdefault(operacao, []).append(perf_counter() - inicio)
+    response.raise_for_status()
+    return response.json()
+
+
+async def main(args):
+    latencias: dict[str, list[float]] = {}
+    prefixo = uuid4().hex[:8]  # nomes de gênero únicos entre execuções
+
+    async with httpx.AsyncClient(base_url=args.url.rstrip('/'), timeout=30) as client:
+        for i in range(args.repeticoes):
+            genero = await medir(
+                latencias,
+                'POST generos',
+                client.post('/generos/', json={'nome': f'{prefixo}-{i}', 'surgiu_em': '1970-01-01'}),
+            )
+            id_genero = genero['id_genero']
+            await medir(
+                latencias,
+                'PUT generos',
+                client.put(
+                    f'/generos/{id_genero}', json={'nome': f'{prefixo}-{i}-put', 'surgiu_em': '1971-01-01'}
+                ),
+            )
+            await medir(
+                latencias,
+                'PATCH generos',
+                client.patch(f'/generos/{id_genero}', json={'surgiu_em': '1972-01-01'}),
+            )
+
+            colecao = {
+                'titulo': f'Bench {i}',
+                'tipo': 'Album',
+                'duracao': 2400,
+                'caminho_capa': '/capas/bench.jpg',
+                'data_lancamento': '2001-01-01',
+            }
+            criada = await medir(latencias, 'POST colecoes', client.post('/colecoes/', json=colecao))
+            id_colecao = criada['id_colecao']
+            await medir(latencias, 'PUT colecoes', client.put(f'/colecoes/{id_colecao}', json=colecao))
+            await medir(
+                latencias, 'PATCH colecoes', client.patch(f'/colecoes/{id_colecao}', json={'duracao': 1})
+            )
+            await medir(latencias, 'DELETE colecoes', client.delete(f'/colecoes/{id_colecao}'))
+            await medir(latencias, 'DELETE generos', client.delete(f'/generos/{id_genero}'))
+
+    print(f'{args.url} ({args.repeticoes} chamadas por operação)')
+    for operacao, valores in latencias.items():
+        print(
+            f'  {operacao:<16} média {statistics.mean(valores) * 1000:6.2f} ms | '
+            f'p50 {percentil(valores, 50) * 1000:6.2f} ms | '
+            f'p99 {percentil(valores, 99) * 1000:6.2f} ms'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('url', help='prefixo do backend, ex.: http://localhost:8000/mongo')
+    parser.add_argument('--repeticoes', type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,56 @@
+"""Mede a exportação NDJSON: linhas/s, MB/s, tempo até o primeiro byte e pico de memória do servidor.
+
+Exemplo (com a API rodando em outro terminal):
+
+    python benchmarks/bench_export.py http://localhost:8000/postgres/colecoes/export --pid $(pgrep -f uvicorn)
+
+Com `--pid`, lê o pico de RSS (VmHWM, em /proc) do processo da API antes e depois da exportação; só no Linux.
+Como o VmHWM é o pico desde o início do processo, meça com a API recém-iniciada.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+from time import perf_counter
+
+import httpx
+
+
+def pico_rss_mb(pid: int) -> float:
+    for linha in Path(f'/proc/{pid}/status').read_text(encoding='utf-8').splitlines():
+        if linha.startswith('VmHWM:'):
+            return int(linha.split()[1]) / 1024
+    return 0.0
+
+
+async def main(args):
+    rss_antes = pico_rss_mb(args.pid) if args.pid else None
+    linhas = total_bytes = 0
+    primeiro_byte = None
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        inicio = perf_counter()
+        async with client.stream('GET', args.url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                if primeiro_byte is None:
+                    primeiro_byte = perf_counter() - inicio
+                linhas += chunk.count(b'\n')
+                total_bytes += len(chunk)
+        total = perf_counter() - inicio
+
+    print(f'GET {args.url}')
+    print(f'  linhas:          {linhas} em {total:.1f}s ({linhas / total:.0f} linhas/s)')
+    print(f'  volume:          {total_bytes / 2**20:.1f} MB ({total_bytes / 2**20 / total:.1f} MB/s)')
+    print(f'  primeiro byte:   {(primeiro_byte or 0) * 1000:.1f} ms')
+    if args.pid:
+        print(f'  pico RSS da API: {rss_antes:.1f} MB antes | {pico_rss_mb(args.pid):.1f} MB depois')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('url')
+    parser.add_argument('--pid', type=int, help='PID do processo da API, para medir o pico de memória')
+    asyncio.run(main(parser.parse_args()))
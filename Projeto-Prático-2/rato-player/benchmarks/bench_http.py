@@ -0,0 +1,66 @@
+"""Benchmark HTTP simples: dispara requisições concorrentes contra uma rota da API.
+
+Exemplo (com a API rodando em outro terminal):
+
+    python benchmarks/bench_http.py http://localhost:8000/mongo/colecoes/ --concorrencia 50 --duracao 30
+"""
+
+import argparse
+import asyncio
+import statistics
+from time import perf_counter
+
+import httpx
+
+
+def percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, round(p / 100 * (len(ordenados) - 1)))
+    return ordenados[indice]
+
+
+async def worker(client: httpx.AsyncClient, args, fim: float, latencias: list[float], erros: list[int]):
+    while perf_counter() < fim:
+        inicio = perf_counter()
+        try:
+            response = await client.request(args.metodo, args.url)
+            if response.status_code >= 400:  # noqa: PLR2004
+                erros.append(response.status_code)
+        except httpx.HTTPError:
+            erros.append(0)
+        latencias.append(perf_counter() - inicio)
+
+
+async def main(args):
+    latencias: list[float] = []
+    erros: list[int] = []
+    limits = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        inicio = perf_counter()
+        fim = inicio + args.duracao
+        await asyncio.gather(*(worker(client, args, fim, latencias, erros) for _ in range(args.concorrencia)))
+        total = perf_counter() - inicio
+
+    print(f'{args.metodo} {args.url}')
+    print(f'  requisições: {len(latencias)} em {total:.1f}s ({len(latencias) / total:.1f} req/s)')
+    print(f'  erros:       {len(erros)}')
+    if latencias:
+        print(
+            f'  latência:    média {statistics.mean(latencias) * 1000:.1f} ms | '
+            f'p50 {percentil(latencias, 50) * 1000:.1f} ms | '
+            f'p99 {percentil(latencias, 99) * 1000:.1f} ms'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('url')
+    parser.add_argument('--metodo', default='GET')
+    parser.add_argument('--concorrencia', type=int, default=50)
+    parser.add_argument('--duracao', type=float, default=30.0, help='segundos')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""Memória e tempo de resolução do registro de gêneros em memória (`rato_player.registro`).
+
+Carrega `--generos` gêneros sintéticos (100 mil por padrão) em um RegistroGeneros e mede com tracemalloc
+a memória ocupada, com IDs inteiros (PostgreSQL) e ObjectIds em texto (MongoDB). Depois mede quanto leva
+para resolver os gêneros de uma página de coleções (`--pagina` coleções com `--por-colecao` gêneros cada).
+Não usa banco de dados, mas importa a aplicação (as variáveis do `.env` precisam estar definidas):
+
+    PYTHONPATH=. python benchmarks/bench_registro.py --generos 100000
+"""
+
+import argparse
+import asyncio
+import random
+import tracemalloc
+from datetime import date, timedelta
+from time import perf_counter
+
+from bson import ObjectId
+
+from rato_player.registro import RegistroGeneros
+from rato_player.schemas import GeneroBasic
+
+
+def gerar_generos(quantidade: int, ids) -> list[GeneroBasic]:
+    inicio = date(1900, 1, 1)
+    return [
+        GeneroBasic.model_construct(
+            id_genero=id_genero, nome=f'Gênero {i:06d}', surgiu_em=inicio + timedelta(days=i % 40_000)
+        )
+        for i, id_genero in zip(range(quantidade), ids)
+    ]
+
+
+async def nada(ids):
+    return []
+
+
+async def medir(backend: str, ids: list, args):
+    tracemalloc.start()
+    generos = gerar_generos(args.generos, ids)
+    registro = RegistroGeneros(backend, ativo=True)
+    registro.carregar(generos, registro.versao)
+    del generos
+    atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    paginas = [random.sample(ids, args.pagina * args.por_colecao) for _ in range(args.repeticoes)]
+    inicio = perf_counter()
+    for pagina in paginas:
+        await registro.resolver(pagina, nada)
+    por_pagina = (perf_counter() - inicio) / args.repeticoes
+
+    print(
+        f'  {backend:<9} {atual / 2**20:7.1f} MB ({atual / args.generos:5.0f} bytes/gênero, '
+        f'pico {pico / 2**20:.1f} MB) | resolver {args.pagina}x{args.por_colecao}: {por_pagina * 1e6:6.1f} µs'
+    )
+
+
+async def main(args):
+    print(f'{args.generos} gêneros')
+    await medir('postgres', list(range(1, args.generos + 1)), args)
+    await medir('mongo', [str(ObjectId()) for _ in range(args.generos)], args)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--generos', type=int, default=100_000)
+    parser.add_argument('--pagina', type=int, default=100, help='coleções por página')
+    parser.add_argument('--por-colecao', type=int, default=5, help='gêneros por coleção')
+    parser.add_argument('--repeticoes', type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,47 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from rato_player.databases.postgres import POSTGRES_URL
+from rato_player.models import table_registry
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# Metadata dos modelos, usada pelo `alembic revision --autogenerate`
+target_metadata = table_registry.metadata
+
+
+def run_migrations_offline() -> None:
+    """Gera o SQL das migrações sem conectar ao banco (`alembic upgrade head --sql`)."""
+    context.configure(
+        url=POSTGRES_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Aplica as migrações conectando ao banco configurado no .env."""
+    connectable = create_engine(POSTGRES_URL)
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+    connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
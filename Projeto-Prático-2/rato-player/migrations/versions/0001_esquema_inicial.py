@@ -0,0 +1,58 @@
+"""esquema inicial
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 12:00:38.009491
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'colecao',
+        sa.Column('id_colecao', sa.Integer(), sa.Identity(always=True), nullable=False),
+        sa.Column('caminho_capa', sa.String(length=500), nullable=False),
+        sa.Column('duracao', sa.Integer(), nullable=False),
+        sa.Column('data_lancamento', sa.Date(), nullable=False),
+        sa.Column('titulo', sa.String(length=90), nullable=False),
+        sa.Column(
+            'tipo', sa.Enum('Album', 'EP', 'Single', 'Compilacao', name='tipo_colecao_enum'), nullable=False
+        ),
+        sa.PrimaryKeyConstraint('id_colecao'),
+    )
+    op.create_table(
+        'genero',
+        sa.Column('id_genero', sa.Integer(), sa.Identity(always=True), nullable=False),
+        sa.Column('nome', sa.String(length=60), nullable=False),
+        sa.Column('surgiu_em', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('id_genero'),
+        sa.UniqueConstraint('nome'),
+    )
+    op.create_table(
+        'genero_colecao',
+        sa.Column('id_genero', sa.Integer(), nullable=False),
+        sa.Column('id_colecao', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['id_colecao'], ['colecao.id_colecao']),
+        sa.ForeignKeyConstraint(['id_genero'], ['genero.id_genero']),
+        sa.PrimaryKeyConstraint('id_genero', 'id_colecao'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('genero_colecao')
+    op.drop_table('genero')
+    op.drop_table('colecao')
+    sa.Enum(name='tipo_colecao_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,34 @@
+"""índices de desempenho
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 12:05:12.417301
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Gêneros de uma coleção (a PK começa por id_genero)
+    op.create_index('idx_genero_colecao_id_colecao', 'genero_colecao', ['id_colecao'], unique=False)
+    # Filtros por tipo e/ou período de lançamento
+    op.create_index('idx_colecao_tipo_data_lancamento', 'colecao', ['tipo', 'data_lancamento'], unique=False)
+    # Filtros por período de surgimento
+    op.create_index('idx_genero_surgiu_em', 'genero', ['surgiu_em'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_genero_surgiu_em', table_name='genero')
+    op.drop_index('idx_colecao_tipo_data_lancamento', table_name='colecao')
+    op.drop_index('idx_genero_colecao_id_colecao', table_name='genero_colecao')
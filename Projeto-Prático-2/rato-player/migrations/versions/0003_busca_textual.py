@@ -0,0 +1,64 @@
+"""busca textual (pg_trgm + unaccent)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 12:09:47.552840
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Requer o pacote contrib do PostgreSQL
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    # unaccent() não é IMMUTABLE e não pode ser usado diretamente em índices
+    op.execute(
+        'CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text '
+        'LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT '
+        "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+    )
+
+    op.create_index(
+        'idx_colecao_titulo_trgm',
+        'colecao',
+        ['titulo'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'titulo': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'idx_colecao_titulo_normalizado_trgm',
+        'colecao',
+        [sa.literal_column('f_unaccent(lower(titulo))').label('titulo_normalizado')],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'titulo_normalizado': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'idx_genero_nome_normalizado_trgm',
+        'genero',
+        [sa.literal_column('f_unaccent(lower(nome))').label('nome_normalizado')],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'nome_normalizado': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_genero_nome_normalizado_trgm', table_name='genero')
+    op.drop_index('idx_colecao_titulo_normalizado_trgm', table_name='colecao')
+    op.drop_index('idx_colecao_titulo_trgm', table_name='colecao')
+    op.execute('DROP FUNCTION IF EXISTS f_unaccent(text)')
@@ -0,0 +1,63 @@
+"""estatísticas do catálogo (visões materializadas)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 15:20:11.804317
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Coleções, duração total e média por gênero, por tipo e por ano de lançamento. O índice único de
+# cada visão permite o REFRESH MATERIALIZED VIEW CONCURRENTLY (ver `rato_player.estatisticas`).
+VISOES = {
+    'estatisticas_genero': (
+        'id_genero',
+        'SELECT gc.id_genero, count(*) AS colecoes, sum(c.duracao) AS duracao_total, '
+        'avg(c.duracao)::double precision AS duracao_media '
+        'FROM genero_colecao gc JOIN colecao c ON c.id_colecao = gc.id_colecao '
+        'GROUP BY gc.id_genero',
+    ),
+    'estatisticas_tipo': (
+        'tipo',
+        'SELECT tipo, count(*) AS colecoes, sum(duracao) AS duracao_total, '
+        'avg(duracao)::double precision AS duracao_media '
+        'FROM colecao GROUP BY tipo',
+    ),
+    'estatisticas_ano': (
+        'ano',
+        'SELECT extract(year FROM data_lancamento)::integer AS ano, count(*) AS colecoes, '
+        'sum(duracao) AS duracao_total, avg(duracao)::double precision AS duracao_media '
+        'FROM colecao GROUP BY 1',
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'estatisticas_atualizacao',
+        sa.Column('visao', sa.String(length=60), nullable=False),
+        sa.Column('atualizada_em', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('visao'),
+    )
+    for visao, (chave, consulta) in VISOES.items():
+        op.execute(f'CREATE MATERIALIZED VIEW {visao} AS {consulta}')
+        op.execute(f'CREATE UNIQUE INDEX idx_{visao}_{chave} ON {visao} ({chave})')
+        op.execute(f"INSERT INTO estatisticas_atualizacao (visao, atualizada_em) VALUES ('{visao}', now())")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for visao in reversed(VISOES):
+        op.execute(f'DROP MATERIALIZED VIEW IF EXISTS {visao}')
+    op.drop_table('estatisticas_atualizacao')
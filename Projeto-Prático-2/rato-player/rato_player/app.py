@@ -1,22 +1,91 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from rato_player.databases.mongo import (
+    DB_NAME,
+    close_mongo,
+    connect_mongo,
+    garantir_indices,
+    mongo_state,
+    ping_mongo,
+)
+from rato_player.databases.postgres import async_engine, engine
+from rato_player.estatisticas import atualizar_estatisticas_periodicamente
+from rato_player.metricas import MetricasMiddleware
+from rato_player.registro import carregar_registros, recarregar_registros
 from rato_player.routers import (
+    cache,
     colecoes_mongo,
     colecoes_postgres,
+    estatisticas_mongo,
+    estatisticas_postgres,
     generos_mongo,
     generos_postgres,
+    metricas,
 )
+from rato_player.settings import Settings
+
+settings = Settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Um único cliente MongoDB (e pool de conexões) para todo o processo
+    client = connect_mongo()
+    # Os índices (ao menos os únicos) são garantidos aqui ou, se o MongoDB estiver fora ou a criação
+    # falhar, nas requisições seguintes (`get_mongo`); a falha não impede a inicialização
+    if await ping_mongo(force=True):
+        await garantir_indices(client[DB_NAME])
+
+    # Gêneros em memória para as rotas de coleções, mantidos em dia por uma tarefa de fundo
+    await carregar_registros()
+    recarga = None
+    if settings.REGISTRO_GENEROS and settings.REGISTRO_GENEROS_RECARGA > 0:
+        recarga = asyncio.create_task(recarregar_registros())
+
+    # Estatísticas do catálogo (visões materializadas e resumos), atualizadas em segundo plano
+    estatisticas = None
+    if settings.ESTATISTICAS_INTERVALO > 0:
+        estatisticas = asyncio.create_task(atualizar_estatisticas_periodicamente())
+
+    yield
+
+    for tarefa in (recarga, estatisticas):
+        if tarefa is not None:
+            tarefa.cancel()
+    close_mongo()
+    await async_engine.dispose()
+    engine.dispose()
+
 
 app = FastAPI(
     title='Rato Player API',
     description='API do Aplicativo de Música "Rato Player"',
     version='0.1.0',
+    lifespan=lifespan,
 )
 
 # Routers PostgreSQL
 app.include_router(colecoes_postgres.router)
 app.include_router(generos_postgres.router)
+app.include_router(estatisticas_postgres.router)
 
 # Routers MongoDB
 app.include_router(colecoes_mongo.router)
 app.include_router(generos_mongo.router)
+app.include_router(estatisticas_mongo.router)
+
+app.include_router(cache.router)
+
+# Métricas Prometheus: o middleware mede todas as requisições, inclusive as que falham
+if settings.METRICAS:
+    app.add_middleware(MetricasMiddleware)
+    app.include_router(metricas.router)
+
+
+@app.get('/saude', summary='Estado das conexões', tags=['Saúde'])
+async def saude():
+    await ping_mongo()
+    return {'mongo': mongo_state['ok']}
@@ -0,0 +1,87 @@
+from pymongo.errors import BulkWriteError
+from sqlalchemy.exc import DBAPIError
+
+from rato_player.enums import StatusBulkEnum
+from rato_player.schemas import BulkItemResult, BulkResult
+
+# Código de erro do MongoDB para violação de índice único
+DUPLICATE_KEY = 11000
+
+
+def chunked(itens: list, tamanho: int):
+    """Divide os itens em lotes de até `tamanho`, junto com a posição do primeiro item de cada lote."""
+    for inicio in range(0, len(itens), tamanho):
+        yield inicio, itens[inicio : inicio + tamanho]
+
+
+def bulk_result(resultados: list[BulkItemResult]) -> BulkResult:
+    """Totaliza o resultado de cada item de uma criação em lote."""
+    return BulkResult(
+        criados=sum(item.status == StatusBulkEnum.criado for item in resultados),
+        conflitos=sum(item.status == StatusBulkEnum.conflito for item in resultados),
+        erros=sum(item.status == StatusBulkEnum.erro for item in resultados),
+        resultados=resultados,
+    )
+
+
+async def mongo_insert_chunk(
+    collection, documentos: list[dict], inicio: int, detalhe_conflito
+) -> list[BulkItemResult]:
+    """Insere um lote com `insert_many(ordered=False)` e devolve o resultado de cada documento.
+
+    Com `ordered=False` o MongoDB continua após uma falha; os documentos rejeitados vêm em
+    `writeErrors`, indexados pela posição no lote. `detalhe_conflito(documento)` monta a
+    mensagem das violações de índice único.
+    """
+    falhas = {}
+    try:
+        await collection.insert_many(documentos, ordered=False)
+    except BulkWriteError as e:
+        falhas = {falha['index']: falha for falha in e.details.get('writeErrors', [])}
+
+    resultados = []
+    for posicao, documento in enumerate(documentos):
+        indice = inicio + posicao
+        falha = falhas.get(posicao)
+        if falha is None:
+            item = BulkItemResult(indice=indice, status=StatusBulkEnum.criado, id=str(documento['_id']))
+        elif falha['code'] == DUPLICATE_KEY:
+            item = BulkItemResult(
+                indice=indice, status=StatusBulkEnum.conflito, detalhe=detalhe_conflito(documento)
+            )
+        else:
+            item = BulkItemResult(indice=indice, status=StatusBulkEnum.erro, detalhe=falha['errmsg'])
+        resultados.append(item)
+    return resultados
+
+
+async def postgres_insert_chunk(
+    session, inserir, lote: list, inicio: int
+) -> tuple[list, list[BulkItemResult]]:
+    """Grava um lote em uma transação com `await inserir(itens)`, que devolve as linhas do RETURNING.
+
+    Se a transação do lote falhar (ex.: texto maior que a coluna), ela é desfeita e os itens são
+    refeitos um a um, cada um em sua transação, para isolar os inválidos sem perder os demais.
+    Retorna as partes gravadas, como (posição do primeiro item, itens, linhas), e o resultado
+    `erro` de cada item rejeitado.
+    """
+    try:
+        linhas = await inserir(lote)
+        await session.commit()
+        return [(inicio, lote, linhas)], []
+    except DBAPIError:
+        await session.rollback()
+
+    partes, erros = [], []
+    for indice, item in enumerate(lote, start=inicio):
+        try:
+            linhas = await inserir([item])
+            await session.commit()
+        except DBAPIError as e:
+            await session.rollback()
+            erros.append(
+                BulkItemResult(indice=indice, status=StatusBulkEnum.erro, detalhe=str(e.orig).splitlines()[0])
+            )
+        else:
+            partes.append((indice, [item], linhas))
+    return partes, erros
@@ -0,0 +1,179 @@
+import re
+
+from sqlalchemy import Integer, func, literal_column, select, tuple_
+
+from rato_player.databases.mongo import COLLATION_BUSCA
+from rato_player.enums import ModoBuscaEnum
+from rato_player.models import Colecao, genero_colecao, normalizar_texto
+from rato_player.schemas import ColecaoSearchFilters, ContagemFaceta, Facetas
+from rato_player.settings import Settings
+
+settings = Settings()
+
+
+def escapar_like(valor: str) -> str:
+    """Escapa os curingas do LIKE (com '/' como caractere de escape)."""
+    return valor.replace('/', '//').replace('%', '/%').replace('_', '/_')
+
+
+def filtro_texto_postgres(coluna, valor: str, modo: ModoBuscaEnum):
+    """Condição de busca textual no PostgreSQL para o modo escolhido."""
+    if modo == ModoBuscaEnum.relevancia:
+        # Similaridade por trigramas (pg_trgm), usa o índice GIN da expressão normalizada
+        return normalizar_texto(valor).op('<%')(normalizar_texto(coluna))
+    if modo == ModoBuscaEnum.prefixo:
+        return normalizar_texto(coluna).like(normalizar_texto(escapar_like(valor)) + '%', escape='/')
+    return coluna.icontains(valor, autoescape=True)
+
+
+def ordem_relevancia_postgres(coluna, valor: str):
+    """Ordenação do modo `relevancia`: do título mais parecido ao menos parecido."""
+    return func.word_similarity(normalizar_texto(valor), normalizar_texto(coluna)).desc()
+
+
+def filtro_texto_mongo(campo: str, valor: str, modo: ModoBuscaEnum) -> dict:
+    """Filtro de busca textual no MongoDB para o modo escolhido.
+
+    O modo `prefixo` depende da COLLATION_BUSCA (ver `resolver_prefixo_mongo`);
+    o modo `relevancia` usa o índice de texto da coleção.
+    """
+    if modo == ModoBuscaEnum.relevancia:
+        return {'$text': {'$search': valor}}
+    if modo == ModoBuscaEnum.prefixo:
+        # U+FFFF tem o maior peso na collation, delimitando todos os textos que começam com `valor`
+        return {campo: {'$gte': valor, '$lt': valor + '\uffff'}}
+    return {campo: {'$regex': re.escape(valor), '$options': 'i'}}
+
+
+async def resolver_prefixo_mongo(collection, filter_query: dict, page_stages: list[dict]) -> dict:
+    """Resolve uma página da busca por prefixo e devolve o filtro equivalente por `_id`.
+
+    A COLLATION_BUSCA valeria para a agregação inteira, inclusive para o $lookup por IDs em
+    string (que deixaria de usar o índice de `generos_ids`), por isso ela fica só nesta consulta.
+    """
+    pipeline = [{'$match': filter_query}, *page_stages, {'$project': {'_id': 1}}]
+    documentos = await collection.aggregate(pipeline, collation=COLLATION_BUSCA).to_list(length=None)
+    return {'_id': {'$in': [documento['_id'] for documento in documentos]}}
+
+
+def chave_facetas(filters: ColecaoSearchFilters) -> tuple:
+    """Chave das facetas de uma busca no cache: só os filtros, sem a paginação.
+
+    Todos os modos ignoram maiúsculas, então o título entra em minúsculas.
+    """
+    if not filters.titulo:
+        return (None, ModoBuscaEnum.contem, filters.tipo, filters.data_inicio, filters.data_fim)
+    return (filters.titulo.lower(), filters.modo, filters.tipo, filters.data_inicio, filters.data_fim)
+
+
+# GROUPING(tipo, decada) das linhas de cada conjunto do GROUPING SETS de `facetas_postgres`
+GRUPO_TIPO, GRUPO_DECADA, GRUPO_TOTAL = 1, 2, 3
+
+
+def _json_linhas(*colunas, where=True):
+    """Linhas das colunas (que atendem a `where`) como um array JSON de arrays (`[]` se não houver)."""
+    return (
+        select(func.coalesce(func.json_agg(func.json_build_array(*colunas)), literal_column("'[]'::json")))
+        .where(where)
+        .scalar_subquery()
+    )
+
+
+def facetas_postgres(condicoes: list):
+    """Consulta de uma linha com as facetas (JSON) das coleções que atendem às `condicoes`.
+
+    Tipos, décadas e o total saem de um único GROUP BY GROUPING SETS sobre as coleções filtradas;
+    os gêneros mais frequentes, de uma agregação sobre as associações dessas mesmas coleções.
+    O JSON tem o formato de `montar_facetas`: {total, tipos, decadas, generos}, com pares [valor, quantidade].
+    """
+    ano = func.extract('year', Colecao.data_lancamento).cast(Integer)
+    filtradas = (
+        select(Colecao.id_colecao, Colecao.tipo, (ano - ano % 10).label('decada'))
+        .where(*condicoes)
+        .cte('filtradas')
+    )
+
+    contagens = (
+        select(
+            func.grouping(filtradas.c.tipo, filtradas.c.decada).label('grupo'),
+            filtradas.c.tipo,
+            filtradas.c.decada,
+            func.count().label('quantidade'),
+        )
+        .group_by(func.grouping_sets(filtradas.c.tipo, filtradas.c.decada, tuple_()))
+        .cte('contagens')
+    )
+    generos = (
+        select(genero_colecao.c.id_genero, func.count().label('quantidade'))
+        .join(filtradas, filtradas.c.id_colecao == genero_colecao.c.id_colecao)
+        .group_by(genero_colecao.c.id_genero)
+        .order_by(func.count().desc(), genero_colecao.c.id_genero)
+        .limit(settings.FACETAS_MAX_GENEROS)
+        .subquery('generos')
+    )
+
+    return select(
+        func.json_build_object(
+            'total',
+            select(contagens.c.quantidade).where(contagens.c.grupo == GRUPO_TOTAL).scalar_subquery(),
+            'tipos',
+            _json_linhas(contagens.c.tipo, contagens.c.quantidade, where=contagens.c.grupo == GRUPO_TIPO),
+            'decadas',
+            _json_linhas(contagens.c.decada, contagens.c.quantidade, where=contagens.c.grupo == GRUPO_DECADA),
+            'generos',
+            _json_linhas(generos.c.id_genero, generos.c.quantidade),
+        ).label('facetas')
+    )
+
+
+def facetas_mongo() -> dict:
+    """Sub-pipelines do $facet com as facetas das coleções que chegam ao estágio.
+
+    Cada faceta é uma lista de {_id: valor, quantidade}, como espera `montar_facetas`.
+    """
+    ano = {'$toInt': {'$substrBytes': ['$data_lancamento', 0, 4]}}  # datas gravadas como strings ISO
+    return {
+        'total': [{'$count': 'quantidade'}],
+        'tipos': [{'$group': {'_id': '$tipo', 'quantidade': {'$sum': 1}}}],
+        'decadas': [
+            {
+                '$group': {
+                    '_id': {
+                        '$let': {
+                            'vars': {'ano': ano},
+                            'in': {'$subtract': ['$$ano', {'$mod': ['$$ano', 10]}]},
+                        }
+                    },
+                    'quantidade': {'$sum': 1},
+                }
+            }
+        ],
+        'generos': [
+            {'$unwind': '$generos_ids'},
+            {'$group': {'_id': '$generos_ids', 'quantidade': {'$sum': 1}}},
+            {'$sort': {'quantidade': -1, '_id': 1}},
+            {'$limit': settings.FACETAS_MAX_GENEROS},
+        ],
+    }
+
+
+def montar_facetas(total: int, tipos, decadas, generos, nomes: dict) -> Facetas:
+    """Monta as Facetas a partir de pares (valor, quantidade); `nomes` ({id: GeneroBasic}) nomeia os gêneros.
+
+    Tipos e gêneros vêm do mais ao menos frequente; décadas, em ordem cronológica.
+    """
+    return Facetas(
+        total=total,
+        tipos=[
+            ContagemFaceta(valor=tipo, quantidade=quantidade)
+            for tipo, quantidade in sorted(tipos, key=lambda par: (-par[1], par[0]))
+        ],
+        decadas=[
+            ContagemFaceta(valor=decada, quantidade=quantidade) for decada, quantidade in sorted(decadas)
+        ],
+        generos=[
+            ContagemFaceta(valor=id_genero, quantidade=quantidade, nome=nomes[id_genero].nome)
+            for id_genero, quantidade in sorted(generos, key=lambda par: (-par[1], par[0]))
+            if id_genero in nomes
+        ],
+    )
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from time import monotonic
+
+from rato_player.settings import Settings
+
+settings = Settings()
+
+
+class EntityCache:
+    """Cache LRU com TTL, em memória, para as leituras por ID.
+
+    Os valores são JSONRepresentation (modelo, corpo já serializado e ETag), de modo que um
+    hit não consulta o banco nem serializa a resposta de novo.
+    Só é acessado pelo event loop (as rotas são `async def`), por isso dispensa locks.
+    A `versao` muda a cada invalidação: uma leitura que começou antes de uma escrita
+    não grava no cache o valor que leu (ver `set`).
+    """
+
+    def __init__(self, nome: str, ativo: bool, max_itens: int, ttl: float):
+        self.nome = nome
+        self.ativo = ativo
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.versao = 0
+        self._itens: OrderedDict = OrderedDict()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        """Retorna o valor em cache (ou None), marcando-o como o mais recente."""
+        if not self.ativo:
+            return None
+
+        item = self._itens.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expira_em, valor = item
+        if expira_em <= monotonic():
+            del self._itens[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._itens.move_to_end(key)
+        self.hits += 1
+        return valor
+
+    def set(self, key, valor, versao: int):
+        """Guarda o valor lido quando a cache estava na `versao` informada (se ela não mudou)."""
+        if not self.ativo or versao != self.versao:
+            return
+
+        self._itens[key] = (monotonic() + self.ttl, valor)
+        self._itens.move_to_end(key)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys):
+        """Remove as entradas das chaves informadas."""
+        self.versao += 1
+        for key in keys:
+            self._itens.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Remove as entradas cujo valor satisfaz `predicate` (ex.: coleções que exibem um gênero)."""
+        self.versao += 1
+        for key in [key for key, (_, valor) in self._itens.items() if predicate(valor)]:
+            del self._itens[key]
+
+    def clear(self):
+        self.versao += 1
+        self._itens.clear()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict:
+        consultas = self.hits + self.misses
+        return {
+            'ativo': self.ativo,
+            'itens': len(self._itens),
+            'max_itens': self.max_itens,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / consultas if consultas else 0.0,
+        }
+
+
+def contem_genero(id_genero):
+    """Predicado de `invalidate_where` para as coleções em cache que exibem o gênero."""
+    return lambda colecao: any(genero.id_genero == id_genero for genero in colecao.model.generos)
+
+
+def contem_colecao(id_colecao):
+    """Predicado de `invalidate_where` para os gêneros em cache que exibem a coleção."""
+    return lambda genero: any(colecao.id_colecao == id_colecao for colecao in genero.model.colecoes)
+
+
+def _criar_cache(nome: str, ativo: bool, ttl: float = settings.CACHE_TTL) -> EntityCache:
+    return EntityCache(nome, ativo=ativo, max_itens=settings.CACHE_MAX_ITENS, ttl=ttl)
+
+
+postgres_generos_cache = _criar_cache('postgres_generos', settings.CACHE_POSTGRES)
+postgres_colecoes_cache = _criar_cache('postgres_colecoes', settings.CACHE_POSTGRES)
+mongo_generos_cache = _criar_cache('mongo_generos', settings.CACHE_MONGO)
+mongo_colecoes_cache = _criar_cache('mongo_colecoes', settings.CACHE_MONGO)
+
+# Facetas da busca de coleções (Facetas), por filtro normalizado (ver `rato_player.busca.chave_facetas`)
+postgres_facetas_cache = _criar_cache('postgres_facetas', settings.CACHE_POSTGRES, settings.CACHE_FACETAS_TTL)
+mongo_facetas_cache = _criar_cache('mongo_facetas', settings.CACHE_MONGO, settings.CACHE_FACETAS_TTL)
+
+CACHES = {
+    cache.nome: cache
+    for cache in (
+        postgres_generos_cache,
+        postgres_colecoes_cache,
+        mongo_generos_cache,
+        mongo_colecoes_cache,
+        postgres_facetas_cache,
+        mongo_facetas_cache,
+    )
+}
@@ -0,0 +1,325 @@
+"""Carga em massa de gêneros, coleções e associações a partir de arquivos CSV ou NDJSON (ou do gerador).
+
+No PostgreSQL cada lote entra por `COPY FROM STDIN` em uma tabela temporária e é mesclado na
+tabela definitiva com `INSERT ... ON CONFLICT`; no MongoDB vira um `bulk_write` de upserts.
+Como o merge é idempotente, um lote repetido após uma interrupção não duplica dados: o
+checkpoint guarda quantas linhas de cada arquivo já foram confirmadas e a carga retoma dali.
+"""
+
+import csv
+import json
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from time import perf_counter
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from sqlalchemy import text
+
+from rato_player.databases.mongo import DB_NAME, close_mongo, connect_mongo
+from rato_player.databases.postgres import async_engine
+from rato_player.embutidos import backfill
+from rato_player.settings import Settings
+
+settings = Settings()
+
+# Ordem da carga: as associações dependem de gêneros e coleções já carregados
+ENTIDADES = ('generos', 'colecoes', 'associacoes')
+
+COLUNAS = {
+    'generos': ('id_genero', 'nome', 'surgiu_em'),
+    'colecoes': ('id_colecao', 'titulo', 'tipo', 'duracao', 'caminho_capa', 'data_lancamento'),
+    'associacoes': ('id_genero', 'id_colecao'),
+}
+
+# Tabela definitiva e tabela temporária (staging) de cada entidade no PostgreSQL
+TABELAS = {
+    'generos': ('genero', 'carga_genero'),
+    'colecoes': ('colecao', 'carga_colecao'),
+    'associacoes': ('genero_colecao', 'carga_genero_colecao'),
+}
+
+# Merge da staging na tabela definitiva. Os IDs vêm dos arquivos (OVERRIDING SYSTEM VALUE) e
+# as linhas repetidas no mesmo lote são descartadas, pois o ON CONFLICT DO UPDATE não pode
+# alterar a mesma linha duas vezes. Gêneros cujo nome já pertence a outro ID são ignorados.
+MERGE_SQL = {
+    'generos': """
+        WITH por_id AS (SELECT DISTINCT ON (id_genero) * FROM carga_genero ORDER BY id_genero),
+        unicos AS (SELECT DISTINCT ON (nome) * FROM por_id ORDER BY nome, id_genero)
+        INSERT INTO genero (id_genero, nome, surgiu_em) OVERRIDING SYSTEM VALUE
+        SELECT u.id_genero, u.nome, u.surgiu_em FROM unicos u
+        WHERE NOT EXISTS (SELECT 1 FROM genero g WHERE g.nome = u.nome AND g.id_genero <> u.id_genero)
+        ON CONFLICT (id_genero) DO UPDATE SET nome = EXCLUDED.nome, surgiu_em = EXCLUDED.surgiu_em
+    """,
+    'colecoes': """
+        WITH unicos AS (SELECT DISTINCT ON (id_colecao) * FROM carga_colecao ORDER BY id_colecao)
+        INSERT INTO colecao (id_colecao, titulo, tipo, duracao, caminho_capa, data_lancamento)
+        OVERRIDING SYSTEM VALUE
+        SELECT id_colecao, titulo, tipo, duracao, caminho_capa, data_lancamento FROM unicos
+        ON CONFLICT (id_colecao) DO UPDATE SET
+            titulo = EXCLUDED.titulo,
+            tipo = EXCLUDED.tipo,
+            duracao = EXCLUDED.duracao,
+            caminho_capa = EXCLUDED.caminho_capa,
+            data_lancamento = EXCLUDED.data_lancamento
+    """,
+    # Associações com gênero ou coleção inexistente são ignoradas
+    'associacoes': """
+        INSERT INTO genero_colecao (id_genero, id_colecao)
+        SELECT DISTINCT s.id_genero, s.id_colecao FROM carga_genero_colecao s
+        JOIN genero USING (id_genero)
+        JOIN colecao USING (id_colecao)
+        ON CONFLICT DO NOTHING
+    """,
+}
+
+# Após gravar IDs explícitos, a identidade precisa continuar a partir do maior ID
+SETVAL_SQL = {
+    'generos': "SELECT setval(pg_get_serial_sequence('genero', 'id_genero'), max(id_genero)) FROM genero",
+    'colecoes': (
+        "SELECT setval(pg_get_serial_sequence('colecao', 'id_colecao'), max(id_colecao)) FROM colecao"
+    ),
+}
+
+
+def ler_registros(caminho: Path):
+    """Lê os registros de um arquivo `.csv` (com cabeçalho) ou NDJSON (`.ndjson`/`.jsonl`)."""
+    with caminho.open(encoding='utf-8', newline='') as arquivo:
+        if caminho.suffix.lower() == '.csv':
+            yield from csv.DictReader(arquivo)
+        else:
+            for linha in arquivo:
+                if linha.strip():
+                    yield json.loads(linha)
+
+
+def associacoes_do_registro(registro: dict) -> list[dict]:
+    """Associações embutidas em uma coleção (campo `generos_ids`, como na exportação NDJSON)."""
+    return [
+        {'id_genero': id_genero, 'id_colecao': registro['id_colecao']}
+        for id_genero in registro.get('generos_ids') or []
+    ]
+
+
+def mongo_id(valor) -> ObjectId:
+    """Converte o ID do arquivo em ObjectId.
+
+    IDs numéricos (ex.: exportados do PostgreSQL) viram ObjectIds determinísticos, para que as
+    associações e as recargas apontem sempre para o mesmo documento.
+    """
+    valor = str(valor)
+    if len(valor) == 24 and ObjectId.is_valid(valor):  # noqa: PLR2004
+        return ObjectId(valor)
+    return ObjectId(f'{int(valor):024x}')
+
+
+class Checkpoint:
+    """Linhas já confirmadas de cada arquivo, gravadas em JSON após cada lote."""
+
+    def __init__(self, caminho: Path, reiniciar: bool = False):
+        self.caminho = caminho
+        self.linhas = {}
+        if caminho.exists() and not reiniciar:
+            self.linhas = json.loads(caminho.read_text(encoding='utf-8'))
+
+    def get(self, chave: str) -> int:
+        return self.linhas.get(chave, 0)
+
+    def salvar(self, chave: str, linhas: int):
+        self.linhas[chave] = linhas
+        # Grava em um arquivo temporário e renomeia, para não corromper o checkpoint se a carga cair
+        temporario = self.caminho.with_name(self.caminho.name + '.tmp')
+        temporario.write_text(json.dumps(self.linhas, indent=2), encoding='utf-8')
+        temporario.replace(self.caminho)
+
+
+class Progresso:
+    """Contagem de linhas lidas/gravadas e taxa de linhas por segundo de um arquivo."""
+
+    def __init__(self, entidade: str, ja_carregadas: int):
+        self.entidade = entidade
+        self.ja_carregadas = ja_carregadas
+        self.lidas = self.gravadas = 0
+        self.inicio = perf_counter()
+
+    @property
+    def taxa(self) -> float:
+        return self.lidas / max(perf_counter() - self.inicio, 1e-9)
+
+    def avancar(self, lidas: int, gravadas: int):
+        self.lidas += lidas
+        self.gravadas += gravadas
+        print(
+            f'  {self.entidade}: {self.ja_carregadas + self.lidas} linhas '
+            f'(+{lidas}, {gravadas} gravadas) | {self.taxa:.0f} linhas/s',
+            flush=True,
+        )
+
+    def resumo(self):
+        print(
+            f'{self.entidade}: {self.lidas} linhas lidas, {self.gravadas} gravadas, '
+            f'{self.lidas - self.gravadas} ignoradas em {perf_counter() - self.inicio:.1f}s '
+            f'({self.taxa:.0f} linhas/s)'
+        )
+
+
+async def copy_rows(conn, tabela: str, colunas: tuple[str, ...], registros: list[dict]):
+    """Envia os registros para a tabela com `COPY FROM STDIN` (protocolo de cópia do psycopg)."""
+    raw = await conn.get_raw_connection()
+    async with raw.driver_connection.cursor() as cursor:
+        async with cursor.copy(f'COPY {tabela} ({", ".join(colunas)}) FROM STDIN') as copy:
+            for registro in registros:
+                await copy.write_row([registro.get(coluna) for coluna in colunas])
+
+
+async def carregar_lote_postgres(conn, entidade: str, registros: list[dict]) -> int:
+    """Grava um lote em uma transação: COPY para a staging, merge e ajuste da identidade."""
+    tabela, staging = TABELAS[entidade]
+    async with conn.begin():
+        # ON COMMIT DELETE ROWS: a staging é esvaziada a cada lote confirmado
+        await conn.execute(
+            text(f'CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {tabela}) ON COMMIT DELETE ROWS')
+        )
+        await copy_rows(conn, staging, COLUNAS[entidade], registros)
+        gravadas = (await conn.execute(text(MERGE_SQL[entidade]))).rowcount
+
+        if entidade in SETVAL_SQL:
+            await conn.execute(text(SETVAL_SQL[entidade]))
+
+        associacoes = [item for registro in registros for item in associacoes_do_registro(registro)]
+        if entidade == 'colecoes' and associacoes:
+            _, staging_associacoes = TABELAS['associacoes']
+            await conn.execute(
+                text(
+                    f'CREATE TEMP TABLE IF NOT EXISTS {staging_associacoes} (LIKE genero_colecao) '
+                    'ON COMMIT DELETE ROWS'
+                )
+            )
+            await copy_rows(conn, staging_associacoes, COLUNAS['associacoes'], associacoes)
+            await conn.execute(text(MERGE_SQL['associacoes']))
+    return gravadas
+
+
+def operacoes_mongo(entidade: str, registros: list[dict]) -> list[UpdateOne]:
+    """Upserts do lote: recarregar o mesmo arquivo atualiza os documentos em vez de duplicá-los."""
+    if entidade == 'generos':
+        return [
+            UpdateOne(
+                {'_id': mongo_id(registro['id_genero'])},
+                {'$set': {'nome': registro['nome'], 'surgiu_em': registro['surgiu_em']}},
+                upsert=True,
+            )
+            for registro in registros
+        ]
+
+    if entidade == 'colecoes':
+        operacoes = []
+        for registro in registros:
+            campos = {
+                'titulo': registro['titulo'],
+                'tipo': registro['tipo'],
+                'duracao': int(registro['duracao']),
+                'caminho_capa': registro['caminho_capa'],
+                'data_lancamento': registro['data_lancamento'],
+            }
+            update = {'$set': campos, '$setOnInsert': {'generos_ids': []}}
+            if registro.get('generos_ids') is not None:
+                campos['generos_ids'] = [str(mongo_id(id_genero)) for id_genero in registro['generos_ids']]
+                del update['$setOnInsert']
+            operacoes.append(UpdateOne({'_id': mongo_id(registro['id_colecao'])}, update, upsert=True))
+        return operacoes
+
+    # Associações: sem upsert, então as que apontam para uma coleção inexistente são ignoradas
+    return [
+        UpdateOne(
+            {'_id': mongo_id(registro['id_colecao'])},
+            {'$addToSet': {'generos_ids': str(mongo_id(registro['id_genero']))}},
+        )
+        for registro in registros
+    ]
+
+
+async def carregar_lote_mongo(db, entidade: str, registros: list[dict]) -> int:
+    """Grava um lote com `bulk_write(ordered=False)`; falhas (ex.: nome duplicado) não abortam o lote."""
+    collection = db['colecoes' if entidade == 'associacoes' else entidade]
+    try:
+        result = await collection.bulk_write(operacoes_mongo(entidade, registros), ordered=False)
+        detalhes = result.bulk_api_result
+    except BulkWriteError as e:
+        detalhes = e.details
+    return detalhes['nUpserted'] + detalhes['nMatched']
+
+
+def chave_checkpoint(backend: str, entidade: str, nome: str) -> str:
+    """Chave do progresso de uma fonte no checkpoint."""
+    return f'{backend}:{entidade}:{nome}'
+
+
+async def catalogo_vazio(backend: str) -> bool:
+    """Se o backend ainda não tem nenhum gênero nem coleção."""
+    if backend == 'postgres':
+        async with async_engine.connect() as conn:
+            existe = await conn.scalar(
+                text('SELECT EXISTS (SELECT 1 FROM genero) OR EXISTS (SELECT 1 FROM colecao)')
+            )
+        return not existe
+
+    db = connect_mongo()[DB_NAME]
+    try:
+        return not (await db.generos.find_one({}, {'_id': 1}) or await db.colecoes.find_one({}, {'_id': 1}))
+    finally:
+        close_mongo()
+
+
+def fontes_de_arquivos(arquivos: dict[str, Path]) -> dict:
+    """Fontes de `carregar` para os arquivos informados (por entidade)."""
+    return {
+        entidade: (str(caminho.resolve()), partial(ler_registros, caminho))
+        for entidade, caminho in arquivos.items()
+        if caminho
+    }
+
+
+async def carregar(backend: str, fontes: dict, lote: int, checkpoint: Checkpoint):
+    """Carrega as fontes informadas (por entidade) no backend, na ordem de ENTIDADES.
+
+    Cada fonte é um par (nome, função que produz os registros), como em `fontes_de_arquivos`; os
+    registros são lidos em lotes de `lote`, a partir do último registro confirmado no checkpoint.
+    """
+
+    async def carregar_fontes(carregar_lote):
+        for entidade in ENTIDADES:
+            if entidade not in fontes:
+                continue
+
+            nome, ler = fontes[entidade]
+            chave = chave_checkpoint(backend, entidade, nome)
+            ja_carregadas = checkpoint.get(chave)
+            print(
+                f'{entidade}: {nome}' + (f' (retomando após {ja_carregadas} linhas)' if ja_carregadas else '')
+            )
+
+            progresso = Progresso(entidade, ja_carregadas)
+            registros = islice(ler(), ja_carregadas, None)
+            while registros_lote := list(islice(registros, lote)):
+                gravadas = await carregar_lote(entidade, registros_lote)
+                checkpoint.salvar(chave, ja_carregadas + progresso.lidas + len(registros_lote))
+                progresso.avancar(len(registros_lote), gravadas)
+            progresso.resumo()
+
+    if backend == 'postgres':
+        async with async_engine.connect() as conn:
+            await carregar_fontes(partial(carregar_lote_postgres, conn))
+        await async_engine.dispose()
+    else:
+        db = connect_mongo()[DB_NAME]
+        try:
+            await carregar_fontes(partial(carregar_lote_mongo, db))
+            if settings.MONGODB_GENEROS_EMBUTIDOS:
+                # Os upserts gravam só `generos_ids`; os snapshots são montados de uma vez ao final
+                print('Atualizando os snapshots de gêneros embutidos nas coleções')
+                await backfill(db)
+        finally:
+            close_mongo()
@@ -0,0 +1,179 @@
+"""Tarefas administrativas do Rato Player.
+
+Exemplos:
+
+    python -m rato_player.cli indices
+    python -m rato_player.cli carregar postgres --generos generos.csv --colecoes colecoes.ndjson
+    python -m rato_player.cli embutidos verificar
+    python -m rato_player.cli gerar postgres --colecoes 1000000 --semente 42
+"""
+
+import argparse
+import asyncio
+from functools import partial
+from pathlib import Path
+
+from rato_player.carga import (
+    ENTIDADES,
+    Checkpoint,
+    carregar,
+    catalogo_vazio,
+    chave_checkpoint,
+    fontes_de_arquivos,
+)
+from rato_player.databases.mongo import DB_NAME, close_mongo, connect_mongo, ensure_indexes
+from rato_player.embutidos import backfill, verificar
+from rato_player.gerador import gerar_colecoes, gerar_generos
+
+
+async def criar_indices(args):
+    """Cria (ou confirma) os índices do MongoDB."""
+    client = connect_mongo()
+    try:
+        indices = await ensure_indexes(client[DB_NAME])
+    finally:
+        close_mongo()
+
+    for colecao, nomes in indices.items():
+        print(f'{colecao}: {", ".join(nomes)}')
+
+
+async def carregar_arquivos(args):
+    """Carrega arquivos CSV/NDJSON de gêneros, coleções e associações (ver rato_player.carga)."""
+    arquivos = {entidade: getattr(args, entidade) for entidade in ENTIDADES}
+    if not any(arquivos.values()):
+        raise SystemExit('Informe ao menos um arquivo: --generos, --colecoes ou --associacoes.')
+
+    await carregar(
+        args.backend,
+        fontes_de_arquivos(arquivos),
+        args.lote,
+        Checkpoint(args.checkpoint, reiniciar=args.reiniciar),
+    )
+
+
+async def gerar_catalogo(args):
+    """Gera um catálogo sintético (ver rato_player.gerador) e o grava pela carga em massa."""
+    if args.generos < 1:
+        raise SystemExit('Informe ao menos um gênero (--generos).')
+
+    # O nome de cada fonte identifica a geração no checkpoint: a mesma geração interrompida é retomada
+    parametros = f'semente={args.semente}'
+    fontes = {
+        'generos': (
+            f'gerador:generos:{args.generos}:{parametros}',
+            partial(gerar_generos, args.generos, args.semente),
+        ),
+        'colecoes': (
+            f'gerador:colecoes:{args.colecoes}:{args.generos}:{parametros}:zipf={args.zipf}',
+            partial(gerar_colecoes, args.colecoes, args.generos, args.semente, args.zipf),
+        ),
+    }
+    checkpoint = Checkpoint(args.checkpoint, reiniciar=args.reiniciar)
+
+    # Os IDs gerados começam em 1 e a carga grava por cima dos IDs existentes: só um catálogo vazio
+    # (ou uma geração interrompida, retomada pelo checkpoint) é gravado sem --sobrescrever
+    retomando = any(
+        checkpoint.get(chave_checkpoint(args.backend, entidade, nome))
+        for entidade, (nome, _) in fontes.items()
+    )
+    if not (args.sobrescrever or retomando or await catalogo_vazio(args.backend)):
+        raise SystemExit(
+            f'O {args.backend} já tem gêneros ou coleções, que seriam sobrescritos pelos IDs gerados '
+            '(a partir de 1). Use um banco vazio ou --sobrescrever.'
+        )
+
+    await carregar(args.backend, fontes, args.lote, checkpoint)
+
+
+async def snapshots_embutidos(args):
+    """Verifica (e, com `backfill`, corrige) os snapshots de gêneros embutidos nas coleções do MongoDB."""
+    db = connect_mongo()[DB_NAME]
+    try:
+        divergentes, amostra = await verificar(db)
+        print(
+            f'{divergentes} coleções com snapshots divergentes'
+            + (f': {", ".join(amostra)}' if amostra else '')
+        )
+
+        if args.acao == 'backfill' and divergentes:
+            await backfill(db)
+            divergentes, _ = await verificar(db)
+            print(f'Backfill concluído; {divergentes} coleções ainda divergentes')
+    finally:
+        close_mongo()
+
+    if divergentes:
+        raise SystemExit(1)
+
+
+COMANDOS = {
+    'indices': criar_indices,
+    'carregar': carregar_arquivos,
+    'embutidos': snapshots_embutidos,
+    'gerar': gerar_catalogo,
+}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog='rato_player.cli', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    subparsers.add_parser('indices', help='cria os índices do MongoDB (idempotente)')
+
+    carga = subparsers.add_parser('carregar', help='carga em massa a partir de arquivos CSV ou NDJSON')
+    carga.add_argument('backend', choices=['postgres', 'mongo'])
+    carga.add_argument('--generos', type=Path, help='id_genero, nome, surgiu_em')
+    carga.add_argument(
+        '--colecoes',
+        type=Path,
+        help='id_colecao, titulo, tipo, duracao, caminho_capa, data_lancamento (e generos_ids, em NDJSON)',
+    )
+    carga.add_argument('--associacoes', type=Path, help='id_genero, id_colecao')
+    carga.add_argument('--lote', type=int, default=50_000, help='linhas por lote/transação (padrão: 50000)')
+    carga.add_argument(
+        '--checkpoint', type=Path, default=Path('carga.checkpoint.json'), help='arquivo de progresso da carga'
+    )
+    carga.add_argument(
+        '--reiniciar', action='store_true', help='ignora o checkpoint e carrega desde o início'
+    )
+
+    embutidos = subparsers.add_parser(
+        'embutidos', help='verifica ou regrava os snapshots de gêneros nas coleções do MongoDB'
+    )
+    embutidos.add_argument(
+        'acao',
+        choices=['verificar', 'backfill'],
+        help='verificar: lista as divergências (status 1 se houver); backfill: regrava as divergentes',
+    )
+
+    gerar = subparsers.add_parser(
+        'gerar', help='gera um catálogo sintético determinístico e o grava pela carga em massa'
+    )
+    gerar.add_argument('backend', choices=['postgres', 'mongo'])
+    gerar.add_argument('--colecoes', type=int, default=1_000_000, help='coleções (padrão: 1000000)')
+    gerar.add_argument('--generos', type=int, default=2000, help='gêneros (padrão: 2000)')
+    gerar.add_argument('--semente', type=int, default=0, help='a mesma semente gera os mesmos dados')
+    gerar.add_argument(
+        '--zipf', type=float, default=1.1, help='expoente da popularidade dos gêneros (padrão: 1.1)'
+    )
+    gerar.add_argument(
+        '--lote', type=int, default=50_000, help='registros por lote/transação (padrão: 50000)'
+    )
+    gerar.add_argument(
+        '--checkpoint', type=Path, default=Path('carga.checkpoint.json'), help='arquivo de progresso da carga'
+    )
+    gerar.add_argument('--reiniciar', action='store_true', help='ignora o checkpoint e grava desde o início')
+    gerar.add_argument(
+        '--sobrescrever',
+        action='store_true',
+        help='grava mesmo em um banco com dados, substituindo os registros com os mesmos IDs',
+    )
+
+    args = parser.parse_args(argv)
+    asyncio.run(COMANDOS[args.comando](args))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,144 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+import logging
+from http import HTTPStatus
+from time import monotonic
 
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.collation import Collation
+from pymongo.errors import ConnectionFailure, PyMongoError, ServerSelectionTimeoutError
+
+from rato_player.metricas import ouvintes_mongo
 from rato_player.settings import Settings
 
 settings = Settings()
 
+logger = logging.getLogger(__name__)
+
 # URL para conexão local do MongoDB
 MONGODB_URL = f'mongodb://{settings.MONGODB_USER}:{settings.MONGODB_PASSWORD}@{settings.MONGODB_HOST}:{settings.MONGODB_PORT}/'
 
 DB_NAME = settings.MONGODB_DB_NAME
 
+# Collation das buscas por prefixo: ignora maiúsculas e acentos (nível primário)
+COLLATION_BUSCA = Collation(locale='pt', strength=1)
+
+# Índices de cada coleção, criados por `ensure_indexes`. O nome fixo de cada índice torna a
+# criação idempotente; para alterar a definição de um índice existente é preciso removê-lo antes.
+MONGO_INDEXES = {
+    'generos': [
+        IndexModel([('nome', ASCENDING)], name='nome_unico', unique=True),
+        IndexModel([('nome', ASCENDING)], name='nome_busca', collation=COLLATION_BUSCA),
+        IndexModel([('nome', TEXT)], name='nome_texto', default_language='none'),
+    ],
+    'colecoes': [
+        # O `_id` após `generos_ids` entrega as coleções de um gênero já ordenadas: o $lookup de
+        # `generos_pipeline` para no $limit, sem ordenar em memória todas as coleções do gênero
+        IndexModel([('generos_ids', ASCENDING), ('_id', ASCENDING)], name='generos_ids_id'),
+        IndexModel([('tipo', ASCENDING), ('data_lancamento', ASCENDING)], name='tipo_data_lancamento'),
+        IndexModel([('titulo', ASCENDING)], name='titulo_busca', collation=COLLATION_BUSCA),
+        IndexModel([('titulo', TEXT)], name='titulo_texto', default_language='none'),
+    ],
+}
+
+# Cliente único do processo (criado no lifespan da aplicação), último resultado do ping,
+# reaproveitado por MONGODB_HEALTH_TTL segundos, se os índices já foram garantidos e quando
+# foi a última tentativa de criá-los
+mongo_state = {
+    'client': None,
+    'ok': False,
+    'verificado_em': None,
+    'indices': False,
+    'indices_tentado_em': None,
+}
+
+
+def connect_mongo() -> AsyncIOMotorClient:
+    """Cria o cliente compartilhado do MongoDB (e o seu pool de conexões)."""
+    if mongo_state['client'] is None:
+        mongo_state['client'] = AsyncIOMotorClient(
+            MONGODB_URL,
+            serverSelectionTimeoutMS=5000,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+            event_listeners=ouvintes_mongo(),
+        )
+    return mongo_state['client']
+
+
+def close_mongo():
+    """Fecha o cliente compartilhado do MongoDB."""
+    if mongo_state['client'] is not None:
+        mongo_state['client'].close()
+    mongo_state.update(client=None, ok=False, verificado_em=None, indices=False, indices_tentado_em=None)
+
+
+async def ping_mongo(force: bool = False) -> bool:
+    """Testa a conexão com o MongoDB, usando o resultado em cache enquanto ele for recente."""
+    verificado_em = mongo_state['verificado_em']
+    if not force and verificado_em is not None and monotonic() - verificado_em < settings.MONGODB_HEALTH_TTL:
+        return mongo_state['ok']
+
+    try:
+        await connect_mongo().admin.command('ping')
+        ok = True
+    except (ConnectionFailure, ServerSelectionTimeoutError):
+        ok = False
+
+    mongo_state.update(ok=ok, verificado_em=monotonic())
+    return ok
+
+
+async def get_mongo() -> AsyncIOMotorDatabase:
+    if mongo_state['client'] is None or (not mongo_state['ok'] and not await ping_mongo()):
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='O MongoDB está indisponível no momento.',
+        )
+
+    db = mongo_state['client'][DB_NAME]
+    # O MongoDB pode ter ficado disponível só depois da inicialização; sem os índices as leituras
+    # continuam funcionando, e as escritas de gêneros consultam `mongo_state['indices']`
+    await garantir_indices(db)
+    return db
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase, somente_unicos: bool = False) -> dict[str, list[str]]:
+    """Cria os índices de MONGO_INDEXES que ainda não existem e retorna os nomes por coleção.
+
+    Com `somente_unicos`, cria apenas os índices únicos, dos quais as rotas dependem para rejeitar
+    nomes repetidos.
+    """
+    criados = {}
+    for nome, indexes in MONGO_INDEXES.items():
+        selecionados = [index for index in indexes if index.document.get('unique') or not somente_unicos]
+        if selecionados:
+            criados[nome] = await db[nome].create_indexes(selecionados)
+    return criados
+
+
+async def garantir_indices(db: AsyncIOMotorDatabase) -> bool:
+    """Garante os índices uma vez por cliente: todos, com MONGODB_CREATE_INDEXES, ou só os únicos.
 
-async def get_mongo():
-    client: AsyncIOMotorClient = None
-    if client is None:
-        try:
-            client = AsyncIOMotorClient(MONGODB_URL, serverSelectionTimeoutMS=5000)
-            # Testa a conexão
-            await client.admin.command('ping')
-        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-            raise e
+    Os índices únicos são criados mesmo com MONGODB_CREATE_INDEXES=false, pois sem eles as escritas
+    aceitariam nomes repetidos. Se não puderem ser criados (ex.: já há nomes repetidos), a falha é
+    registrada no log e a aplicação segue; uma nova tentativa é feita a cada MONGODB_HEALTH_TTL
+    segundos. Retorna se os índices estão garantidos.
+    """
+    if mongo_state['indices']:
+        return True
+    tentado_em = mongo_state['indices_tentado_em']
+    if tentado_em is not None and monotonic() - tentado_em < settings.MONGODB_HEALTH_TTL:
+        return False
 
-    return client[DB_NAME]
+    mongo_state['indices_tentado_em'] = monotonic()
+    try:
+        await ensure_indexes(db, somente_unicos=not settings.MONGODB_CREATE_INDEXES)
+    except PyMongoError:
+        logger.warning(
+            'Não foi possível criar os índices do MongoDB; nomes de gêneros serão conferidos por consulta.',
+            exc_info=True,
+        )
+        return False
+    mongo_state['indices'] = True
+    return True
@@ -1,6 +1,12 @@
+from contextlib import asynccontextmanager
+
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
+from rato_player.metricas import instrumentar_engine, pool_medido
 from rato_player.settings import Settings
 
 settings = Settings()
@@ -11,9 +17,99 @@ POSTGRES_URL = (
     f'{settings.POSTGRES_PORT}/{settings.POSTGRES_DB_NAME}'
 )
 
-engine = create_engine(POSTGRES_URL)
+POOL_OPTIONS = {
+    'pool_size': settings.POSTGRES_POOL_SIZE,
+    'max_overflow': settings.POSTGRES_MAX_OVERFLOW,
+}
+
+engine = create_engine(POSTGRES_URL, poolclass=pool_medido(QueuePool), **POOL_OPTIONS)
+
+# Mesmo driver (psycopg 3), no modo assíncrono
+async_engine = create_async_engine(POSTGRES_URL, poolclass=pool_medido(AsyncAdaptedQueuePool), **POOL_OPTIONS)
+
+# Comandos SQL nas métricas (os eventos do engine assíncrono são os do engine síncrono que ele envolve)
+instrumentar_engine(engine)
+instrumentar_engine(async_engine.sync_engine)
+
+SyncSessionLocal = sessionmaker(engine, expire_on_commit=False)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+class SyncSessionAdapter:
+    """Expõe uma Session síncrona com a mesma interface (aguardável) da AsyncSession.
+
+    Cada operação no banco roda no threadpool do AnyIO, como nas antigas rotas `def`,
+    permitindo comparar os dois caminhos (POSTGRES_ASYNC=true/false) sob a mesma carga.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, *args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        result = await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+        return SyncStreamResult(result)
+
+    async def get(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, *args, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def refresh(self, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, *args, **kwargs)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+class SyncStreamResult:
+    """Equivalente ao AsyncResult de `AsyncSession.stream`: busca cada partição no threadpool."""
+
+    def __init__(self, result):
+        self.result = result
+
+    async def partitions(self):
+        partitions = self.result.partitions()
+        while (partition := await run_in_threadpool(next, partitions, None)) is not None:
+            yield partition
+
+
+async def get_postgres():
+    if settings.POSTGRES_ASYNC:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        session = SyncSessionAdapter(SyncSessionLocal())
+        try:
+            yield session
+        finally:
+            await session.close()
 
 
-def get_postgres():
-    with Session(engine) as session:
-        yield session
+# Para quem precisa da sessão fora da injeção de dependências, como o gerador de uma StreamingResponse,
+# que só roda depois que as dependências da rota já foram encerradas
+open_postgres = asynccontextmanager(get_postgres)
@@ -0,0 +1,95 @@
+from rato_player.schemas import GeneroBasic
+from rato_player.settings import Settings
+
+settings = Settings()
+
+# Com MONGODB_GENEROS_EMBUTIDOS, cada documento de `colecoes` guarda, além de `generos_ids` (que continua
+# sendo a lista de referência, indexada e na ordem de associação), um snapshot `{_id, nome, surgiu_em}` de
+# cada gênero em `generos`. As leituras de coleções usam os snapshots; as rotas de gêneros os propagam
+# a cada alteração. `verificar` e `backfill` comparam e corrigem os snapshots a partir de `generos`.
+
+# Campos do gênero copiados para o snapshot (além do `_id`)
+CAMPOS_SNAPSHOT = ('nome', 'surgiu_em')
+
+
+def snapshot(genero: dict) -> dict:
+    """Snapshot de um documento de gênero, como embutido nas coleções."""
+    return {'_id': genero['_id'], **{campo: genero[campo] for campo in CAMPOS_SNAPSHOT}}
+
+
+def propagacao(update_data: dict) -> dict:
+    """`$set` que copia os campos alterados de um gênero para os seus snapshots (filtro de array `g`)."""
+    return {
+        f'generos.$[g].{campo}': valor for campo, valor in update_data.items() if campo in CAMPOS_SNAPSHOT
+    }
+
+
+def generos_embutidos(colecoes) -> dict:
+    """{id: GeneroBasic} dos snapshots embutidos nos documentos de coleção informados."""
+    # As datas estão gravadas como strings ISO, por isso os snapshots são validados
+    return {
+        str(genero['_id']): GeneroBasic(
+            id_genero=str(genero['_id']), nome=genero['nome'], surgiu_em=genero['surgiu_em']
+        )
+        for colecao in colecoes
+        for genero in colecao['generos']
+    }
+
+
+# Snapshots esperados de cada coleção: os gêneros atuais de `generos_ids`, buscados pelo `_id` (indexado).
+# Um ID que não é ObjectId vira null (em vez de abortar a agregação inteira, como faria `$toObjectId`)
+ESPERADOS_PIPELINE = [
+    {
+        '$addFields': {
+            'generos_oids': {
+                '$map': {
+                    'input': {'$ifNull': ['$generos_ids', []]},
+                    'in': {'$convert': {'input': '$$this', 'to': 'objectId', 'onError': None}},
+                }
+            }
+        }
+    },
+    {'$lookup': {'from': 'generos', 'localField': 'generos_oids', 'foreignField': '_id', 'as': 'esperados'}},
+    {
+        '$addFields': {
+            'esperados': {
+                '$map': {
+                    'input': '$esperados',
+                    'in': {'_id': '$$this._id', 'nome': '$$this.nome', 'surgiu_em': '$$this.surgiu_em'},
+                }
+            }
+        }
+    },
+    # Divergentes: IDs inválidos em `generos_ids` ou snapshots ausentes, a mais, a menos ou desatualizados
+    # (a ordem não importa)
+    {
+        '$match': {
+            '$expr': {
+                '$or': [
+                    {'$in': [None, '$generos_oids']},
+                    {'$not': {'$setEquals': [{'$ifNull': ['$generos', []]}, '$esperados']}},
+                ]
+            }
+        }
+    },
+]
+
+
+async def verificar(db, amostra: int = 10) -> tuple[int, list[str]]:
+    """Conta as coleções com snapshots divergentes de `generos` e retorna os IDs das primeiras `amostra`."""
+    total, ids = 0, []
+    async for colecao in db.colecoes.aggregate([*ESPERADOS_PIPELINE, {'$project': {'_id': 1}}]):
+        total += 1
+        if len(ids) < amostra:
+            ids.append(str(colecao['_id']))
+    return total, ids
+
+
+async def backfill(db):
+    """Regrava os snapshots das coleções divergentes, no próprio servidor, com um único `$merge`."""
+    pipeline = [
+        *ESPERADOS_PIPELINE,
+        {'$project': {'generos': '$esperados'}},
+        {'$merge': {'into': 'colecoes', 'on': '_id', 'whenMatched': 'merge', 'whenNotMatched': 'discard'}},
+    ]
+    await db.colecoes.aggregate(pipeline).to_list(length=None)
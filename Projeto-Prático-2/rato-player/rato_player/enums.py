@@ -6,3 +6,15 @@ class TipoColecaoEnum(str, Enum):
     EP = 'EP'
     Single = 'Single'
     Compilacao = 'Compilacao'
+
+
+class ModoBuscaEnum(str, Enum):
+    contem = 'contem'
+    prefixo = 'prefixo'
+    relevancia = 'relevancia'
+
+
+class StatusBulkEnum(str, Enum):
+    criado = 'criado'
+    conflito = 'conflito'
+    erro = 'erro'
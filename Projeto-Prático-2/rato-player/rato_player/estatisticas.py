@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+from sqlalchemy import column, func, select, table, text
+from sqlalchemy.dialects.postgresql import insert
+
+from rato_player.databases.mongo import DB_NAME, mongo_state, ping_mongo
+from rato_player.databases.postgres import async_engine
+from rato_player.models import estatisticas_atualizacao
+from rato_player.settings import Settings
+
+settings = Settings()
+
+logger = logging.getLogger(__name__)
+
+
+def _visao(nome: str, chave: str):
+    return table(nome, column(chave), column('colecoes'), column('duracao_total'), column('duracao_media'))
+
+
+# Visões materializadas (migração 0004) de cada agrupamento, com a chave do grupo na primeira coluna
+VISOES_POSTGRES = {
+    'generos': _visao('estatisticas_genero', 'id_genero'),
+    'tipos': _visao('estatisticas_tipo', 'tipo'),
+    'anos': _visao('estatisticas_ano', 'ano'),
+}
+
+# Escritas nas tabelas de que as visões dependem, segundo os contadores do servidor (pg_stat). Os contadores
+# chegam com até cerca de 1 s de atraso: uma escrita que ainda não apareceu é vista na rodada seguinte
+ESCRITAS_POSTGRES = text(
+    'SELECT coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0)::bigint FROM pg_stat_user_tables '
+    "WHERE relname IN ('colecao', 'genero_colecao')"
+)
+
+# Chave do advisory lock que impede dois processos de atualizarem as visões ao mesmo tempo
+LOCK_ESTATISTICAS = 20_022
+
+# Contadores de escrita na última atualização feita por este processo, por backend
+ultimas_escritas = {'postgres': None, 'mongo': None}
+
+
+async def atualizar_estatisticas_postgres(forcar: bool = False) -> bool:
+    """Atualiza as visões materializadas com REFRESH ... CONCURRENTLY (as leituras não esperam).
+
+    Sem `forcar`, só atualiza se houve escritas desde a última atualização deste processo e se nenhum
+    outro processo estiver atualizando. Retorna se atualizou.
+    """
+    async with async_engine.begin() as conn:
+        escritas = await conn.scalar(ESCRITAS_POSTGRES)
+        if not forcar and escritas == ultimas_escritas['postgres']:
+            return False
+
+        if forcar:
+            await conn.execute(select(func.pg_advisory_xact_lock(LOCK_ESTATISTICAS)))
+        elif not await conn.scalar(select(func.pg_try_advisory_xact_lock(LOCK_ESTATISTICAS))):
+            return False
+
+        for visao in VISOES_POSTGRES.values():
+            await conn.execute(text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {visao.name}'))
+
+        stmt = insert(estatisticas_atualizacao).values([
+            {'visao': visao.name, 'atualizada_em': func.now()} for visao in VISOES_POSTGRES.values()
+        ])
+        await conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[estatisticas_atualizacao.c.visao],
+                set_={'atualizada_em': stmt.excluded.atualizada_em},
+            )
+        )
+
+    ultimas_escritas['postgres'] = escritas
+    return True
+
+
+def _resumo(grupo) -> dict:
+    return {
+        '$group': {
+            '_id': grupo,
+            'colecoes': {'$sum': 1},
+            'duracao_total': {'$sum': '$duracao'},
+            'duracao_media': {'$avg': '$duracao'},
+        }
+    }
+
+
+# Resumos de cada agrupamento, calculados sobre `colecoes` e gravados em `estatisticas_{agrupamento}`
+RESUMOS_MONGO = {
+    'generos': [{'$unwind': '$generos_ids'}, _resumo('$generos_ids')],
+    'tipos': [_resumo('$tipo')],
+    'anos': [_resumo({'$toInt': {'$substrBytes': ['$data_lancamento', 0, 4]}})],  # datas em strings ISO
+}
+
+# Tempo máximo que um processo reserva para atualizar os resumos (ver `atualizar_estatisticas_mongo`)
+RESERVA_MONGO = timedelta(minutes=10)
+
+
+async def escritas_mongo(db) -> int:
+    """Operações de escrita em `colecoes` desde o início do servidor ($collStats), somadas entre os shards."""
+    estatisticas = await db.colecoes.aggregate([{'$collStats': {'latencyStats': {}}}]).to_list(length=None)
+    return sum(estatistica['latencyStats']['writes']['ops'] for estatistica in estatisticas)
+
+
+async def atualizar_estatisticas_mongo(db, forcar: bool = False) -> bool:
+    """Recalcula os resumos no servidor e os grava com $merge, removendo os grupos que deixaram de existir.
+
+    Como no PostgreSQL, sem `forcar` só atualiza se houve escritas desde a última atualização deste
+    processo; uma reserva em `estatisticas_atualizacao` impede dois processos de atualizarem ao mesmo
+    tempo (um removeria os grupos gravados pelo outro). Retorna se atualizou.
+    """
+    escritas = await escritas_mongo(db)
+    if not forcar and escritas == ultimas_escritas['mongo']:
+        return False
+
+    agora = datetime.now(UTC)
+    try:
+        await db.estatisticas_atualizacao.update_one(
+            {'_id': 'reserva', 'ate': {'$lt': agora}}, {'$set': {'ate': agora + RESERVA_MONGO}}, upsert=True
+        )
+    except DuplicateKeyError:
+        return False  # reservado por outro processo
+
+    try:
+        for agrupamento, estagios in RESUMOS_MONGO.items():
+            destino = f'estatisticas_{agrupamento}'
+            merge = {'into': destino, 'on': '_id', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}
+            pipeline = [*estagios, {'$set': {'atualizada_em': agora}}, {'$merge': merge}]
+            await db.colecoes.aggregate(pipeline).to_list(length=None)
+            await db[destino].delete_many({'atualizada_em': {'$lt': agora}})
+            await db.estatisticas_atualizacao.update_one(
+                {'_id': agrupamento}, {'$set': {'atualizada_em': agora}}, upsert=True
+            )
+    finally:
+        await db.estatisticas_atualizacao.update_one({'_id': 'reserva'}, {'$set': {'ate': agora}})
+
+    ultimas_escritas['mongo'] = escritas
+    return True
+
+
+async def atualizar_estatisticas():
+    """Atualiza as estatísticas de cada backend disponível; um backend fora do ar fica para a próxima vez."""
+    try:
+        await atualizar_estatisticas_postgres()
+    except Exception:
+        logger.warning('Não foi possível atualizar as estatísticas do PostgreSQL.', exc_info=True)
+
+    if await ping_mongo():
+        try:
+            await atualizar_estatisticas_mongo(mongo_state['client'][DB_NAME])
+        except Exception:
+            logger.warning('Não foi possível atualizar as estatísticas do MongoDB.', exc_info=True)
+
+
+async def atualizar_estatisticas_periodicamente():
+    """Tarefa do lifespan: atualiza as estatísticas a cada ESTATISTICAS_INTERVALO segundos."""
+    while True:
+        await atualizar_estatisticas()
+        await asyncio.sleep(settings.ESTATISTICAS_INTERVALO)
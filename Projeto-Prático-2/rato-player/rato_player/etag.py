@@ -0,0 +1,48 @@
+from hashlib import blake2b
+from http import HTTPStatus
+from typing import Annotated, NamedTuple, Optional
+
+from fastapi import Header, Response
+from pydantic import BaseModel
+
+from rato_player.settings import Settings
+
+settings = Settings()
+
+# Cabeçalho enviado pelos clientes com o ETag da versão que já possuem
+IfNoneMatch = Annotated[Optional[str], Header()]
+
+
+class JSONRepresentation(NamedTuple):
+    """Modelo de resposta já serializado, com o ETag calculado a partir do próprio corpo."""
+
+    model: BaseModel
+    body: bytes
+    etag: str
+
+
+def represent(model: BaseModel) -> JSONRepresentation:
+    """Serializa o modelo uma única vez e calcula o seu ETag forte (hash do JSON)."""
+    body = model.model_dump_json().encode()
+    return JSONRepresentation(model, body, f'"{blake2b(body, digest_size=16).hexdigest()}"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara o If-None-Match com o ETag (comparação fraca, como pede a RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+
+def conditional_response(representation: JSONRepresentation, if_none_match: Optional[str]) -> Response:
+    """Responde 304 Not Modified se o cliente já tem esta versão; senão, o JSON com ETag e Cache-Control."""
+    headers = {'ETag': representation.etag, 'Cache-Control': settings.HTTP_CACHE_CONTROL}
+    if etag_matches(if_none_match, representation.etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    return Response(representation.body, media_type='application/json', headers=headers)
+
+
+def json_response(model: BaseModel, if_none_match: Optional[str]) -> Response:
+    return conditional_response(represent(model), if_none_match)
@@ -0,0 +1,29 @@
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def ndjson(models) -> bytes:
+    """Serializa os modelos como NDJSON: um objeto JSON por linha.
+
+    Os modelos vêm de `model_construct`, sem validação. No MongoDB datas e enums já estão
+    gravados como strings, que saem como estão; por isso os avisos de tipo são desligados.
+    """
+    return b''.join(model.model_dump_json(warnings=False).encode() + b'\n' for model in models)
+
+
+def ndjson_response(lotes) -> StreamingResponse:
+    """Responde com os lotes de NDJSON à medida que o gerador os produz, sem montar o corpo inteiro."""
+    return StreamingResponse(lotes, media_type=NDJSON_MEDIA_TYPE)
+
+
+async def mongo_batches(cursor, tamanho: int):
+    """Agrupa os documentos de um cursor do Motor em listas de até `tamanho`."""
+    lote = []
+    async for documento in cursor:
+        lote.append(documento)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
@@ -0,0 +1,127 @@
+"""Gerador determinístico de catálogos sintéticos (gêneros, coleções e associações) para testes de volume.
+
+A mesma semente produz sempre os mesmos registros, no formato da carga em massa (`rato_player.carga`):
+as coleções trazem os seus gêneros em `generos_ids`, e os IDs são sequenciais a partir de 1 nos dois
+backends (no MongoDB viram os ObjectIds determinísticos de `carga.mongo_id`). As distribuições imitam
+um catálogo real:
+
+- popularidade dos gêneros segundo uma lei de Zipf (poucos gêneros em muitas coleções, a maioria em poucas);
+- datas de lançamento de 1950 a 2025, cada vez mais frequentes nas décadas recentes;
+- tipos em proporções de catálogo (mais álbuns e singles) e `duracao` log-normal com mediana por tipo;
+- títulos e nomes com acentos e palavras de outras escritas (cirílico, grego, japonês, coreano, árabe).
+"""
+
+import math
+import random
+from bisect import bisect
+from datetime import date, timedelta
+from itertools import accumulate, product
+
+from rato_player.enums import TipoColecaoEnum
+
+# Peso no sorteio e (mediana, dispersão) da duração log-normal, em segundos, de cada tipo
+TIPOS = {
+    TipoColecaoEnum.Album: (45, (2700, 0.35)),
+    TipoColecaoEnum.Single: (30, (210, 0.3)),
+    TipoColecaoEnum.EP: (17, (1200, 0.35)),
+    TipoColecaoEnum.Compilacao: (8, (4200, 0.45)),
+}
+
+# Quantidade de gêneros por coleção (1 a 4) e o peso de cada quantidade
+GENEROS_POR_COLECAO = (1, 2, 3, 4)
+PESOS_GENEROS_POR_COLECAO = (50, 30, 15, 5)
+
+# Período das datas de lançamento (fixo, para que a mesma semente gere as mesmas datas em qualquer dia)
+DATA_INICIAL = date(1950, 1, 1)
+DATA_FINAL = date(2025, 12, 31)
+MEIA_VIDA_ANOS = 12  # a cada 12 anos para trás, metade dos lançamentos
+
+# Nomes de gêneros: cada raiz sozinha e com cada qualificador
+RAIZES_GENERO = (
+    'Samba|Forró|Baião|Choro|Frevo|Maracatu|Bossa Nova|MPB|Axé|Sertanejo|Rock|Jazz|Blues|Fado|Tango|'
+    'Cumbia|Reggaetón|K-Pop|J-Pop|Enka|Chanson|Schlager|Rebetiko|Qawwali|Highlife|Afrobeat|Zouk|'
+    'Kizomba|Música Caipira|Techno|Soul|Funk|Hip-Hop|Metal|Punk|Folk|Ópera|Câmara|Танго|Ρεμπέτικο|民謡|'
+    '트로트'
+).split('|')
+QUALIFICADORES_GENERO = (
+    'Progressivo|Psicodélico|Alternativo|Eletrônico|Experimental|Tradicional|Contemporâneo|'
+    'Instrumental|Lo-fi|Acústico|Universitário|de Raiz|Sinfônico|Industrial|Melódico|Noturno|Tropical|'
+    'Mínimo|Pós-moderno'
+).split('|')
+PALAVRAS_TITULO = (
+    'Coração|Saudade|Sertão|Canção|Ilusão|Manhã|Luar|Estrela|Caminho|Memória|Tempestade|Verão|Inverno|'
+    'Cidade|Mar|Rio|Noite|Fogo|Vento|Silêncio|Açúcar|Maçã|Ímpeto|Órbita|Úmido|Pássaro|Árvore|Mañana|'
+    'Niño|Cœur|Été|Straße|Über|Blue|Dream|Night|Gold|Echo|Звезда|Ночь|Любовь|Θάλασσα|Φως|夜明け|桜|東京|사랑|'
+    '바다|قمر|حلم|Ø|Ñandú'
+).split('|')
+COMPLEMENTOS_TITULO = ('(Ao Vivo)', '(Deluxe)', '(Remasterizado)', '(Acústico)', 'Vol. 2', 'Vol. 3', 'II')
+CHANCE_COMPLEMENTO = 0.1
+
+
+def _rng(semente: int, fluxo: str) -> random.Random:
+    # Um gerador por entidade: mudar a quantidade de gêneros não altera os títulos das coleções
+    return random.Random(f'{semente}:{fluxo}')
+
+
+def gerar_generos(quantidade: int, semente: int = 0):
+    """Gêneros de 1 a `quantidade`, com nomes únicos (raiz e qualificador, numerados quando se repetem)."""
+    rng = _rng(semente, 'generos')
+    nomes = [
+        f'{raiz} {qualificador}'.strip()
+        for raiz, qualificador in product(RAIZES_GENERO, ('', *QUALIFICADORES_GENERO))
+    ]
+    rng.shuffle(nomes)
+
+    for i in range(quantidade):
+        rodada, indice = divmod(i, len(nomes))
+        yield {
+            'id_genero': i + 1,
+            'nome': nomes[indice] + (f' {rodada + 1}' if rodada else ''),
+            'surgiu_em': (
+                date(rng.randint(1900, 2020), 1, 1) + timedelta(days=rng.randrange(365))
+            ).isoformat(),
+        }
+
+
+def _popularidade_zipf(quantidade: int, expoente: float, rng) -> tuple[list[int], list[float]]:
+    """IDs dos gêneros em ordem de popularidade (sorteada) e os pesos acumulados de Zipf de cada posição."""
+    ids = list(range(1, quantidade + 1))
+    rng.shuffle(ids)
+    return ids, list(accumulate(1 / posicao**expoente for posicao in range(1, quantidade + 1)))
+
+
+def gerar_colecoes(quantidade: int, generos: int, semente: int = 0, zipf: float = 1.1):
+    """Coleções de 1 a `quantidade`, cada uma com 1 a 4 dos `generos` gêneros em `generos_ids`."""
+    rng = _rng(semente, 'colecoes')
+    ids_generos, acumulados = _popularidade_zipf(generos, zipf, rng)
+    total_zipf = acumulados[-1]
+
+    tipos = list(TIPOS)
+    pesos_tipos = list(accumulate(peso for peso, _ in TIPOS.values()))
+    dias = (DATA_FINAL - DATA_INICIAL).days
+    taxa_idade = math.log(2) / (MEIA_VIDA_ANOS * 365)
+
+    for i in range(1, quantidade + 1):
+        tipo = tipos[bisect(pesos_tipos, rng.random() * pesos_tipos[-1])]
+        mediana, dispersao = TIPOS[tipo][1]
+
+        # Lançamentos mais frequentes nas décadas recentes (idade exponencial); as idades além de
+        # DATA_INICIAL recomeçam de DATA_FINAL, em vez de se acumularem em um único dia
+        idade = int(rng.expovariate(taxa_idade)) % (dias + 1)
+
+        palavras = rng.sample(PALAVRAS_TITULO, rng.randint(1, 4))
+        if rng.random() < CHANCE_COMPLEMENTO:
+            palavras.append(rng.choice(COMPLEMENTOS_TITULO))
+
+        n_generos = rng.choices(GENEROS_POR_COLECAO, PESOS_GENEROS_POR_COLECAO)[0]
+        sorteados = (ids_generos[bisect(acumulados, rng.random() * total_zipf)] for _ in range(n_generos))
+
+        yield {
+            'id_colecao': i,
+            'titulo': ' '.join(palavras),
+            'tipo': tipo.value,
+            'duracao': max(30, round(rng.lognormvariate(0, dispersao) * mediana)),
+            'caminho_capa': f'/capas/{i:08d}.jpg',
+            'data_lancamento': (DATA_FINAL - timedelta(days=idade)).isoformat(),
+            'generos_ids': list(dict.fromkeys(sorteados)),  # sem repetições, na ordem sorteada
+        }
@@ -0,0 +1,243 @@
+"""Métricas Prometheus da API, expostas em `GET /metrics` (com METRICAS=true).
+
+- HTTP: latência por rota (o template, ex.: `/postgres/colecoes/{id_colecao}`) e requisições em andamento;
+- PostgreSQL: duração de cada comando SQL e, por requisição, quantos comandos e quanto tempo no banco
+  (eventos `before/after_cursor_execute` dos dois engines);
+- MongoDB: o mesmo para os comandos (CommandListener no cliente Motor);
+- espera por uma conexão do pool, nos dois drivers.
+
+Os números por requisição são somados em um acumulador que o middleware guarda em um contextvar. Os
+eventos do SQLAlchemy (inclusive os do engine síncrono, no threadpool) e os do PyMongo (nas threads do
+Motor) rodam em cópias do contexto da requisição e, por isso, somam no acumulador dela.
+"""
+
+from contextvars import ContextVar
+from time import perf_counter
+
+from prometheus_client import Gauge, Histogram
+from pymongo import monitoring
+from sqlalchemy import event
+
+from rato_player.settings import Settings
+
+settings = Settings()
+
+# Quantidades de comandos por requisição (as latências usam os buckets padrão do prometheus_client)
+BUCKETS_COMANDOS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+HTTP_DURACAO = Histogram(
+    'rato_http_requisicao_duracao_segundos', 'Latência das requisições HTTP', ['metodo', 'rota', 'status']
+)
+HTTP_EM_ANDAMENTO = Gauge('rato_http_requisicoes_em_andamento', 'Requisições HTTP em andamento', ['metodo'])
+
+SQL_DURACAO = Histogram('rato_sql_comando_duracao_segundos', 'Duração de cada comando SQL', ['operacao'])
+SQL_COMANDOS = Histogram(
+    'rato_sql_comandos_por_requisicao', 'Comandos SQL por requisição', ['rota'], buckets=BUCKETS_COMANDOS
+)
+SQL_TEMPO = Histogram(
+    'rato_sql_tempo_por_requisicao_segundos', 'Tempo em comandos SQL por requisição', ['rota']
+)
+
+MONGO_DURACAO = Histogram(
+    'rato_mongo_comando_duracao_segundos', 'Duração de cada comando MongoDB', ['comando']
+)
+MONGO_COMANDOS = Histogram(
+    'rato_mongo_comandos_por_requisicao',
+    'Comandos MongoDB por requisição',
+    ['rota'],
+    buckets=BUCKETS_COMANDOS,
+)
+MONGO_TEMPO = Histogram(
+    'rato_mongo_tempo_por_requisicao_segundos', 'Tempo em comandos MongoDB por requisição', ['rota']
+)
+
+POOL_ESPERA = Histogram('rato_pool_espera_segundos', 'Espera por uma conexão do pool', ['driver'])
+
+# Primeira palavra dos comandos SQL usada como rótulo; as demais viram OUTRO (mantém poucas séries)
+OPERACOES_SQL = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REFRESH', 'BEGIN', 'COMMIT', 'ROLLBACK'}
+
+# Rótulo das requisições que não chegaram a uma rota (404, métodos não permitidos)
+ROTA_DESCONHECIDA = 'desconhecida'
+
+
+class ConsumoBanco:
+    """Comandos e tempo gastos nos bancos durante uma requisição."""
+
+    __slots__ = ('mongo_comandos', 'mongo_tempo', 'sql_comandos', 'sql_tempo')
+
+    def __init__(self):
+        self.sql_comandos = self.mongo_comandos = 0
+        self.sql_tempo = self.mongo_tempo = 0.0
+
+
+consumo_requisicao: ContextVar[ConsumoBanco | None] = ContextVar('consumo_requisicao', default=None)
+
+
+class MetricasMiddleware:
+    """Middleware ASGI: mede cada requisição HTTP e publica o consumo dos bancos por rota.
+
+    A rota só é conhecida depois do roteamento (`scope['route']`), por isso as requisições em
+    andamento são contadas por método.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # se a aplicação falhar antes de responder
+
+        async def enviar(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        metodo = scope['method']
+        consumo = ConsumoBanco()
+        token = consumo_requisicao.set(consumo)
+        em_andamento = HTTP_EM_ANDAMENTO.labels(metodo)
+        em_andamento.inc()
+        inicio = perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = perf_counter() - inicio
+            em_andamento.dec()
+            consumo_requisicao.reset(token)
+
+            rota = scope['route'].path if 'route' in scope else ROTA_DESCONHECIDA
+            HTTP_DURACAO.labels(metodo, rota, str(status)).observe(duracao)
+            # Só as requisições que usaram o banco entram na distribuição de cada um
+            if consumo.sql_comandos:
+                SQL_COMANDOS.labels(rota).observe(consumo.sql_comandos)
+                SQL_TEMPO.labels(rota).observe(consumo.sql_tempo)
+            if consumo.mongo_comandos:
+                MONGO_COMANDOS.labels(rota).observe(consumo.mongo_comandos)
+                MONGO_TEMPO.labels(rota).observe(consumo.mongo_tempo)
+
+
+def _antes_sql(conn, *args):
+    conn.info.setdefault('metricas_inicio', []).append(perf_counter())
+
+
+def _depois_sql(conn, cursor, statement, *args):
+    inicios = conn.info.get('metricas_inicio')
+    if not inicios:  # descartado por _erro_sql
+        return
+    duracao = perf_counter() - inicios.pop()
+    operacao = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ''
+    SQL_DURACAO.labels(operacao if operacao in OPERACOES_SQL else 'OUTRO').observe(duracao)
+
+    if (consumo := consumo_requisicao.get()) is not None:
+        consumo.sql_comandos += 1
+        consumo.sql_tempo += duracao
+
+
+def _erro_sql(contexto):
+    # O comando que falhou não chega ao after_cursor_execute. Uma conexão executa um comando por vez,
+    # então os inícios pendentes são todos dele (o ExceptionContext não informa o cursor)
+    if contexto.connection is not None:
+        contexto.connection.info.pop('metricas_inicio', None)
+
+
+def instrumentar_engine(engine):
+    """Registra os eventos de cursor de um engine síncrono (para o assíncrono, `async_engine.sync_engine`)."""
+    if not settings.METRICAS:
+        return
+    event.listen(engine, 'before_cursor_execute', _antes_sql)
+    event.listen(engine, 'after_cursor_execute', _depois_sql)
+    event.listen(engine, 'handle_error', _erro_sql)
+
+
+def pool_medido(classe):
+    """Subclasse de um pool do SQLAlchemy que mede a espera por uma conexão.
+
+    O SQLAlchemy não tem evento antes do checkout, então a medida envolve o `_do_get` do pool. Inclui
+    a abertura de uma conexão nova, quando o pool ainda não está cheio, como no PyMongo.
+    """
+    if not settings.METRICAS:
+        return classe
+
+    class PoolMedido(classe):
+        def _do_get(self):
+            inicio = perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                POOL_ESPERA.labels('postgres').observe(perf_counter() - inicio)
+
+    PoolMedido.__name__ = PoolMedido.__qualname__ = f'{classe.__name__}Medido'
+    return PoolMedido
+
+
+class ComandosMongo(monitoring.CommandListener):
+    """Duração de cada comando do PyMongo, somada também ao consumo da requisição."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.registrar(event)
+
+    def failed(self, event):
+        self.registrar(event)
+
+    @staticmethod
+    def registrar(event):
+        duracao = event.duration_micros / 1_000_000
+        MONGO_DURACAO.labels(event.command_name).observe(duracao)
+
+        if (consumo := consumo_requisicao.get()) is not None:
+            consumo.mongo_comandos += 1
+            consumo.mongo_tempo += duracao
+
+
+class PoolMongo(monitoring.ConnectionPoolListener):
+    """Espera por uma conexão do pool do PyMongo (`duration` dos eventos de checkout, PyMongo 4.7+)."""
+
+    @staticmethod
+    def connection_checked_out(event):
+        if event.duration is not None:
+            POOL_ESPERA.labels('mongo').observe(event.duration)
+
+    @staticmethod
+    def connection_check_out_failed(event):
+        if event.duration is not None:
+            POOL_ESPERA.labels('mongo').observe(event.duration)
+
+    # Os demais eventos do pool não são medidos
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+def ouvintes_mongo() -> list:
+    """Listeners do PyMongo para o cliente Motor (`event_listeners`)."""
+    return [ComandosMongo(), PoolMongo()] if settings.METRICAS else []
@@ -1,17 +1,63 @@
 from datetime import date
 
-from sqlalchemy import Column, Date, Enum, ForeignKey, Integer, String, Table
+from sqlalchemy import (
+    DDL,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Identity,
+    Index,
+    Integer,
+    String,
+    Table,
+    event,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
 from rato_player.enums import TipoColecaoEnum
 
 table_registry = registry()
 
+# Busca textual de títulos: pg_trgm + unaccent. O unaccent() não é IMMUTABLE, por isso é
+# embrulhado em f_unaccent() para poder ser usado em um índice de expressão.
+event.listen(
+    table_registry.metadata,
+    'before_create',
+    DDL(
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm;'
+        'CREATE EXTENSION IF NOT EXISTS unaccent;'
+        'CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text '
+        'LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT '
+        "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;"
+    ).execute_if(dialect='postgresql'),
+)
+
+
+def normalizar_texto(valor):
+    """Expressão SQL usada nas buscas textuais (e nos seus índices): minúsculas e sem acentos."""
+    return func.f_unaccent(func.lower(valor), type_=String)
+
+
 genero_colecao = Table(
     'genero_colecao',
     table_registry.metadata,
     Column('id_genero', ForeignKey('genero.id_genero'), primary_key=True),
     Column('id_colecao', ForeignKey('colecao.id_colecao'), primary_key=True),
+    # A PK (id_genero, id_colecao) não atende às buscas pelos gêneros de uma coleção
+    Index('idx_genero_colecao_id_colecao', 'id_colecao'),
+)
+
+
+# Momento da última atualização de cada visão materializada de estatísticas (as visões em si são
+# criadas pela migração 0004 e consultadas em `rato_player.estatisticas`)
+estatisticas_atualizacao = Table(
+    'estatisticas_atualizacao',
+    table_registry.metadata,
+    Column('visao', String(60), primary_key=True),
+    Column('atualizada_em', DateTime(timezone=True), nullable=False),
 )
 
 
@@ -19,22 +65,52 @@ genero_colecao = Table(
 class Genero:
     __tablename__ = 'genero'
 
-    id_genero: Mapped[int] = mapped_column(Integer, init=False, primary_key=True, autoincrement=True)
+    id_genero: Mapped[int] = mapped_column(Integer, Identity(always=True), init=False, primary_key=True)
     nome: Mapped[str] = mapped_column(String(60), unique=True, nullable=False)
     surgiu_em: Mapped[date] = mapped_column(Date, nullable=False)
 
-    colecoes = relationship('Colecao', secondary=genero_colecao, back_populates='generos')
+    colecoes = relationship('Colecao', secondary=genero_colecao, back_populates='generos', lazy='raise')
+
+    __table_args__ = (
+        Index('idx_genero_surgiu_em', 'surgiu_em'),
+        Index(
+            'idx_genero_nome_normalizado_trgm',
+            normalizar_texto(nome).label('nome_normalizado'),
+            postgresql_using='gin',
+            postgresql_ops={'nome_normalizado': 'gin_trgm_ops'},
+        ),
+    )
 
 
 @table_registry.mapped_as_dataclass
 class Colecao:
     __tablename__ = 'colecao'
 
-    id_colecao: Mapped[int] = mapped_column(Integer, init=False, primary_key=True, autoincrement=True)
+    id_colecao: Mapped[int] = mapped_column(Integer, Identity(always=True), init=False, primary_key=True)
     caminho_capa: Mapped[str] = mapped_column(String(500), unique=False, nullable=False)
     duracao: Mapped[int] = mapped_column(Integer, nullable=False)
     data_lancamento: Mapped[date] = mapped_column(Date, nullable=False)
     titulo: Mapped[str] = mapped_column(String(90), nullable=False)
-    tipo: Mapped[TipoColecaoEnum] = mapped_column(Enum(TipoColecaoEnum), nullable=False)
+    tipo: Mapped[TipoColecaoEnum] = mapped_column(
+        Enum(TipoColecaoEnum, name='tipo_colecao_enum'), nullable=False
+    )
+
+    generos = relationship('Genero', secondary=genero_colecao, back_populates='colecoes', lazy='raise')
 
-    generos = relationship('Genero', secondary=genero_colecao, back_populates='colecoes')
+    __table_args__ = (
+        Index('idx_colecao_tipo_data_lancamento', 'tipo', 'data_lancamento'),
+        # Busca por substring (ILIKE '%x%')
+        Index(
+            'idx_colecao_titulo_trgm',
+            'titulo',
+            postgresql_using='gin',
+            postgresql_ops={'titulo': 'gin_trgm_ops'},
+        ),
+        # Buscas por prefixo e por relevância, sem acentos e sem diferenciar maiúsculas
+        Index(
+            'idx_colecao_titulo_normalizado_trgm',
+            normalizar_texto(titulo).label('titulo_normalizado'),
+            postgresql_using='gin',
+            postgresql_ops={'titulo_normalizado': 'gin_trgm_ops'},
+        ),
+    )
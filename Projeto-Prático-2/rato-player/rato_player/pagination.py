@@ -0,0 +1,92 @@
+import base64
+import binascii
+import json
+from http import HTTPStatus
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from rato_player.schemas import FilterPage
+
+
+def encode_cursor(last_id: int | str) -> str:
+    """Gera o cursor opaco que aponta para o item seguinte a `last_id`."""
+    payload = json.dumps({'id': last_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, id_type: type) -> int | str:
+    """Lê um cursor gerado por `encode_cursor`, validando o tipo do ID (int no PostgreSQL, str no MongoDB)."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        last_id = json.loads(payload)['id']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        last_id = None
+
+    if not isinstance(last_id, id_type) or isinstance(last_id, bool):
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail='Cursor inválido.',
+        )
+    return last_id
+
+
+def next_cursor(ids: list, pagination: FilterPage) -> str | None:
+    """Retorna o cursor da próxima página, ou None se esta página não veio completa."""
+    if len(ids) < pagination.limit:
+        return None
+    return encode_cursor(ids[-1])
+
+
+def paginate(stmt, id_column, pagination: FilterPage):
+    """Ordena a consulta pelo ID e aplica a página: por cursor (`after`) ou por `offset`."""
+    stmt = stmt.order_by(id_column)
+    if pagination.after:
+        stmt = stmt.where(id_column > decode_cursor(pagination.after, int))
+    else:
+        stmt = stmt.offset(pagination.offset)
+    return stmt.limit(pagination.limit)
+
+
+def reject_cursor(pagination: FilterPage):
+    """As buscas ordenadas por relevância não têm chave estável para o cursor, apenas `offset`."""
+    if pagination.after:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail='A busca por relevância não suporta cursor; use offset.',
+        )
+
+
+def paginate_by_rank(stmt, rank, id_column, pagination: FilterPage):
+    """Ordena a consulta pela relevância (`rank`, desempatando pelo ID) e aplica a página por `offset`."""
+    reject_cursor(pagination)
+    return stmt.order_by(rank, id_column).offset(pagination.offset).limit(pagination.limit)
+
+
+def mongo_page_stages(pagination: FilterPage) -> list[dict]:
+    """Estágios de agregação equivalentes a `paginate`, ordenando pelo `_id`."""
+    stages = []
+    if pagination.after:
+        last_id = decode_cursor(pagination.after, str)
+        if not ObjectId.is_valid(last_id):
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                detail='Cursor inválido.',
+            )
+        stages.append({'$match': {'_id': {'$gt': ObjectId(last_id)}}})
+
+    stages.append({'$sort': {'_id': 1}})
+    if not pagination.after and pagination.offset:
+        stages.append({'$skip': pagination.offset})
+    stages.append({'$limit': pagination.limit})
+    return stages
+
+
+def mongo_rank_stages(pagination: FilterPage) -> list[dict]:
+    """Estágios equivalentes a `paginate_by_rank` para uma busca `$text`, ordenando pela pontuação."""
+    reject_cursor(pagination)
+    stages = [{'$sort': {'score': {'$meta': 'textScore'}, '_id': 1}}]
+    if pagination.offset:
+        stages.append({'$skip': pagination.offset})
+    stages.append({'$limit': pagination.limit})
+    return stages
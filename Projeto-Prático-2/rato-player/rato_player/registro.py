@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from time import monotonic
+
+from bson import ObjectId
+from sqlalchemy import select
+
+from rato_player.databases.mongo import DB_NAME, mongo_state, ping_mongo
+from rato_player.databases.postgres import open_postgres
+from rato_player.models import Genero
+from rato_player.schemas import GeneroBasic
+from rato_player.settings import Settings
+
+settings = Settings()
+
+logger = logging.getLogger(__name__)
+
+
+class RegistroGeneros:
+    """Todos os gêneros de um backend em memória, como GeneroBasic indexados pelo ID.
+
+    As rotas de coleções resolvem `generos_ids` por aqui, sem consultar os gêneros a cada leitura.
+    É carregado por inteiro no lifespan (e recarregado a cada REGISTRO_GENEROS_RECARGA segundos,
+    o que alcança as escritas feitas por outros processos) e atualizado pelas rotas de gêneros.
+    A `versao` muda a cada escrita: uma leitura do banco que começou antes de uma escrita não
+    grava no registro o que leu (ver `registrar` e `carregar`), como em EntityCache.
+    Só é acessado pelo event loop, por isso dispensa locks.
+    """
+
+    def __init__(self, nome: str, ativo: bool):
+        self.nome = nome
+        self.ativo = ativo
+        self.carregado = False
+        self.carregado_em = None
+        self.versao = 0
+        self._generos: dict = {}
+        self.hits = self.misses = self.cargas = self.cargas_descartadas = 0
+
+    def carregar(self, generos, versao: int) -> bool:
+        """Substitui o conteúdo pelos gêneros lidos quando o registro estava na `versao` informada."""
+        if not self.ativo or versao != self.versao:
+            self.cargas_descartadas += 1
+            return False
+
+        self._generos = {genero.id_genero: genero for genero in generos}
+        self.carregado = True
+        self.carregado_em = monotonic()
+        self.versao += 1
+        self.cargas += 1
+        return True
+
+    def registrar(self, generos, versao: int):
+        """Acrescenta gêneros lidos do banco quando o registro estava na `versao` informada."""
+        if not self.ativo or versao != self.versao:
+            return
+
+        for genero in generos:
+            self._generos[genero.id_genero] = genero
+
+    def atualizar(self, *generos: GeneroBasic):
+        """Grava gêneros criados ou alterados pelas rotas de gêneros."""
+        self.versao += 1
+        if self.ativo:
+            for genero in generos:
+                self._generos[genero.id_genero] = genero
+
+    def remover(self, *ids):
+        self.versao += 1
+        for id_genero in ids:
+            self._generos.pop(id_genero, None)
+
+    async def resolver(self, ids, buscar) -> dict:
+        """Retorna {id: GeneroBasic} dos IDs informados (os inexistentes ficam de fora).
+
+        Os que não estão em memória (todos, se o registro estiver desativado ou ainda não carregado)
+        vêm de uma única chamada a `buscar(ids)` e são registrados.
+        """
+        ids = set(ids)
+        generos = {id_genero: self._generos[id_genero] for id_genero in ids if id_genero in self._generos}
+        self.hits += len(generos)
+
+        faltando = ids.difference(generos)
+        if faltando:
+            self.misses += len(faltando)
+            versao = self.versao
+            encontrados = await buscar(faltando)
+            self.registrar(encontrados, versao)
+            generos.update((genero.id_genero, genero) for genero in encontrados)
+
+        return generos
+
+    def stats(self) -> dict:
+        consultas = self.hits + self.misses
+        return {
+            'ativo': self.ativo,
+            'carregado': self.carregado,
+            'idade': monotonic() - self.carregado_em if self.carregado_em is not None else None,
+            'versao': self.versao,
+            'generos': len(self._generos),
+            'hits': self.hits,
+            'misses': self.misses,
+            'cargas': self.cargas,
+            'cargas_descartadas': self.cargas_descartadas,
+            'hit_rate': self.hits / consultas if consultas else 0.0,
+        }
+
+
+async def buscar_generos_postgres(session, ids=None) -> list[GeneroBasic]:
+    """Lê os gêneros informados (ou todos, sem `ids`) do PostgreSQL."""
+    # `model_construct`: os tipos já vêm certos do banco
+    stmt = select(Genero.id_genero, Genero.nome, Genero.surgiu_em)
+    if ids is not None:
+        linhas = await session.execute(stmt.where(Genero.id_genero.in_(ids)))
+        return [GeneroBasic.model_construct(**linha._mapping) for linha in linhas]
+
+    # Carga completa: lida em partições, devolvendo o event loop às requisições entre uma e outra
+    result = await session.stream(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    return [
+        GeneroBasic.model_construct(**linha._mapping)
+        async for linhas in result.partitions()
+        for linha in linhas
+    ]
+
+
+async def buscar_generos_mongo(db, ids=None) -> list[GeneroBasic]:
+    """Lê os gêneros informados (ou todos, sem `ids`) do MongoDB; IDs inválidos são ignorados."""
+    filtro = {}
+    if ids is not None:
+        filtro = {'_id': {'$in': [ObjectId(gid) for gid in ids if ObjectId.is_valid(gid)]}}
+
+    # As datas estão gravadas como strings ISO, por isso os documentos são validados
+    return [
+        GeneroBasic(id_genero=str(genero['_id']), nome=genero['nome'], surgiu_em=genero['surgiu_em'])
+        async for genero in db.generos.find(filtro, {'nome': 1, 'surgiu_em': 1})
+    ]
+
+
+postgres_generos_registro = RegistroGeneros('postgres_generos', settings.REGISTRO_GENEROS)
+mongo_generos_registro = RegistroGeneros('mongo_generos', settings.REGISTRO_GENEROS)
+
+REGISTROS = {registro.nome: registro for registro in (postgres_generos_registro, mongo_generos_registro)}
+
+
+async def carregar_registros():
+    """Carrega o registro de cada backend disponível; um backend fora do ar fica para a próxima recarga."""
+    if not settings.REGISTRO_GENEROS:
+        return
+
+    try:
+        versao = postgres_generos_registro.versao
+        async with open_postgres() as session:
+            postgres_generos_registro.carregar(await buscar_generos_postgres(session), versao)
+    except Exception:
+        logger.warning('Não foi possível carregar os gêneros do PostgreSQL em memória.', exc_info=True)
+
+    if await ping_mongo():
+        try:
+            versao = mongo_generos_registro.versao
+            generos = await buscar_generos_mongo(mongo_state['client'][DB_NAME])
+            mongo_generos_registro.carregar(generos, versao)
+        except Exception:
+            logger.warning('Não foi possível carregar os gêneros do MongoDB em memória.', exc_info=True)
+
+
+async def recarregar_registros():
+    """Tarefa do lifespan: recarrega os registros a cada REGISTRO_GENEROS_RECARGA segundos."""
+    while True:
+        await asyncio.sleep(settings.REGISTRO_GENEROS_RECARGA)
+        await carregar_registros()
@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+
+from rato_player.cache import CACHES
+from rato_player.registro import REGISTROS
+from rato_player.schemas import Mensagem
+
+router = APIRouter(prefix='/cache', tags=['Cache'])
+
+
+@router.get(
+    '/',
+    summary='Estatísticas do cache de entidades',
+    description='Retorna, para cada cache (backend e entidade), os contadores de hits, misses e evictions.',
+    response_model=dict,
+)
+async def read_cache_stats():
+    return {nome: cache.stats() for nome, cache in CACHES.items()}
+
+
+@router.get(
+    '/registros',
+    summary='Estado do registro de gêneros em memória',
+    description=(
+        'Retorna, para cada backend, quantos gêneros estão em memória, a versão e a idade da última carga, '
+        'e quantas resoluções foram atendidas pela memória (hits) ou pelo banco (misses).'
+    ),
+    response_model=dict,
+)
+async def read_registros_stats():
+    return {nome: registro.stats() for nome, registro in REGISTROS.items()}
+
+
+@router.delete(
+    '/',
+    summary='Esvaziar o cache de entidades',
+    description='Remove todas as entradas e zera os contadores (útil entre rodadas de benchmark).',
+    response_model=Mensagem,
+)
+async def clear_cache():
+    for cache in CACHES.values():
+        cache.clear()
+
+    return Mensagem(mensagem='Cache esvaziado com sucesso.')
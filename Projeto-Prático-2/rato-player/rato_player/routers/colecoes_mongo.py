@@ -2,10 +2,31 @@ from http import HTTPStatus
 from typing import Annotated
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Query
-
-from rato_player.databases.mongo import get_mongo
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from rato_player.bulk import bulk_result, chunked, mongo_insert_chunk
+from rato_player.busca import (
+    chave_facetas,
+    facetas_mongo,
+    filtro_texto_mongo,
+    montar_facetas,
+    resolver_prefixo_mongo,
+)
+from rato_player.cache import contem_colecao, mongo_colecoes_cache, mongo_facetas_cache, mongo_generos_cache
+from rato_player.databases.mongo import COLLATION_BUSCA, get_mongo
+from rato_player.embutidos import generos_embutidos, snapshot
+from rato_player.enums import ModoBuscaEnum
+from rato_player.etag import IfNoneMatch, conditional_response, json_response, represent
+from rato_player.export import mongo_batches, ndjson, ndjson_response
+from rato_player.pagination import mongo_page_stages, mongo_rank_stages, next_cursor
+from rato_player.registro import buscar_generos_mongo, mongo_generos_registro
 from rato_player.schemas import (
+    BulkResult,
+    ColecaoExport,
+    ColecaoFacetas,
     ColecaoList,
     ColecaoPublic,
     ColecaoSchema,
@@ -14,9 +35,13 @@ from rato_player.schemas import (
     FilterPage,
     Mensagem,
 )
+from rato_player.settings import Settings
+
+settings = Settings()
 
 router = APIRouter(prefix='/mongo/colecoes', tags=['Coleções - MongoDB'])
 
+MongoDatabase = Annotated[AsyncIOMotorDatabase, Depends(get_mongo)]
 Pagination = Annotated[FilterPage, Query()]
 
 
@@ -30,37 +55,122 @@ def validate_object_id(obj_id: str) -> ObjectId:
     return ObjectId(obj_id)
 
 
+def invalidar_colecao(id_colecao: str):
+    """Remove do cache a coleção e os gêneros que a exibem."""
+    mongo_colecoes_cache.invalidate(id_colecao)
+    mongo_generos_cache.invalidate_where(contem_colecao(id_colecao))
+
+
+# Campos de cada coleção nas leituras; os gêneros de `generos_ids` vêm dos snapshots embutidos
+# (MONGODB_GENEROS_EMBUTIDOS) ou do registro em memória
+COLECAO_PROJECAO = {
+    '$project': {
+        'titulo': 1,
+        'tipo': 1,
+        'duracao': 1,
+        'caminho_capa': 1,
+        'data_lancamento': 1,
+        'generos_ids': 1,
+        'generos': 1,
+    }
+}
+
+
+def colecoes_pipeline(filter_query: dict, page_stages: list[dict] = ()) -> list[dict]:
+    """Monta a agregação ($match/$sort/$limit/$project) de uma página de coleções."""
+    return [{'$match': filter_query}, *page_stages, COLECAO_PROJECAO]
+
+
+def colecao_to_public(colecao: dict, generos: dict) -> ColecaoPublic:
+    """Converte um documento de coleção em ColecaoPublic, com os gêneros de `generos` ({id: GeneroBasic})."""
+    return ColecaoPublic(
+        id_colecao=str(colecao['_id']),
+        titulo=colecao['titulo'],
+        tipo=colecao['tipo'],
+        duracao=colecao['duracao'],
+        caminho_capa=colecao['caminho_capa'],
+        data_lancamento=colecao['data_lancamento'],
+        generos=[generos[gid] for gid in colecao.get('generos_ids', []) if gid in generos],
+    )
+
+
+async def resolver_generos(colecoes: list[dict], db) -> dict:
+    """{id: GeneroBasic} dos `generos_ids` das coleções: pelos snapshots embutidos ou, nos documentos
+    sem snapshots (ou com o modo desligado), pelo registro em memória.
+    """
+    generos, sem_snapshots = {}, colecoes
+    if settings.MONGODB_GENEROS_EMBUTIDOS:
+        generos = generos_embutidos(colecao for colecao in colecoes if 'generos' in colecao)
+        sem_snapshots = [colecao for colecao in colecoes if 'generos' not in colecao]
+
+    generos.update(
+        await mongo_generos_registro.resolver(
+            (gid for colecao in sem_snapshots for gid in colecao.get('generos_ids', [])),
+            lambda ids: buscar_generos_mongo(db, ids),
+        )
+    )
+    return generos
+
+
+async def colecoes_to_public(colecoes: list[dict], db) -> list[ColecaoPublic]:
+    """Converte documentos de coleção em ColecaoPublic, resolvendo os seus gêneros."""
+    generos = await resolver_generos(colecoes, db)
+    return [colecao_to_public(colecao, generos) for colecao in colecoes]
+
+
 @router.post(
     '/',
     status_code=HTTPStatus.CREATED,
     summary='Criar uma nova coleção',
     response_model=ColecaoPublic,
 )
-async def create_colecao(colecao_schema: ColecaoSchema):
+async def create_colecao(colecao_schema: ColecaoSchema, db: MongoDatabase):
     try:
-        db = await get_mongo()
-        collection = db.colecoes
-
-        # Converte para dict e insere
+        # Converte para dict e insere; o `_id` gerado é preenchido no próprio dict
         colecao_dict = colecao_schema.model_dump()
         colecao_dict['data_lancamento'] = colecao_dict['data_lancamento'].isoformat()
         colecao_dict['tipo'] = colecao_dict['tipo'].value
         colecao_dict['generos_ids'] = []  # Inicializa com lista vazia
+        if settings.MONGODB_GENEROS_EMBUTIDOS:
+            colecao_dict['generos'] = []
 
-        result = await collection.insert_one(colecao_dict)
-
-        # Busca o documento inserido
-        created_colecao = await collection.find_one({'_id': result.inserted_id})
+        await db.colecoes.insert_one(colecao_dict)
 
-        return ColecaoPublic(
-            id_colecao=str(created_colecao['_id']),
-            titulo=created_colecao['titulo'],
-            tipo=created_colecao['tipo'],
-            duracao=created_colecao['duracao'],
-            caminho_capa=created_colecao['caminho_capa'],
-            data_lancamento=created_colecao['data_lancamento'],
-            generos=[],
+        return colecao_to_public(colecao_dict, {})
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail=f'Erro interno: {str(e)}',
         )
+
+
+@router.post(
+    '/bulk',
+    summary='Criar coleções em lote',
+    description='Cria várias coleções com `insert_many(ordered=False)` por lote (`BULK_CHUNK_SIZE`).',
+    response_model=BulkResult,
+)
+async def create_colecoes_bulk(colecoes_schema: list[ColecaoSchema], db: MongoDatabase):
+    try:
+        resultados = []
+        for inicio, lote in chunked(colecoes_schema, settings.BULK_CHUNK_SIZE):
+            # `mode='json'` já converte a data para ISO e o tipo para o seu valor, como em create_colecao
+            documentos = [{**colecao.model_dump(mode='json'), 'generos_ids': []} for colecao in lote]
+            if settings.MONGODB_GENEROS_EMBUTIDOS:
+                for documento in documentos:
+                    documento['generos'] = []
+            resultados.extend(
+                await mongo_insert_chunk(
+                    db.colecoes,
+                    documentos,
+                    inicio,
+                    lambda documento: f'A coleção "{documento["titulo"]}" já existe.',
+                )
+            )
+
+        return bulk_result(resultados)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -74,47 +184,20 @@ async def create_colecao(colecao_schema: ColecaoSchema):
     description='Retorna todas as coleções cadastradas no MongoDB (com suporte a paginação).',
     response_model=ColecaoList,
 )
-async def read_colecoes(pagination: Pagination):
+async def read_colecoes(pagination: Pagination, db: MongoDatabase, if_none_match: IfNoneMatch = None):
     try:
-        db = await get_mongo()
-        colecoes_collection = db.colecoes
-        generos_collection = db.generos
-
-        cursor = colecoes_collection.find().skip(pagination.offset).limit(pagination.limit)
+        cursor = db.colecoes.aggregate(colecoes_pipeline({}, mongo_page_stages(pagination)))
         colecoes = await cursor.to_list(length=pagination.limit)
 
-        colecoes_response = []
-        for colecao in colecoes:
-            # Buscar gêneros associados a esta coleção
-            generos_ids = colecao.get('generos_ids', [])
-            generos_data = []
-
-            if generos_ids:
-                generos_cursor = generos_collection.find({
-                    '_id': {'$in': [ObjectId(gid) for gid in generos_ids if ObjectId.is_valid(gid)]}
-                })
-                generos = await generos_cursor.to_list(length=None)
-
-                for genero in generos:
-                    generos_data.append({
-                        'id_genero': str(genero['_id']),
-                        'nome': genero['nome'],
-                        'surgiu_em': genero['surgiu_em'],
-                    })
-
-            colecoes_response.append(
-                ColecaoPublic(
-                    id_colecao=str(colecao['_id']),
-                    titulo=colecao['titulo'],
-                    tipo=colecao['tipo'],
-                    duracao=colecao['duracao'],
-                    caminho_capa=colecao['caminho_capa'],
-                    data_lancamento=colecao['data_lancamento'],
-                    generos=generos_data,
-                )
-            )
-
-        return ColecaoList(colecoes=colecoes_response)
+        return json_response(
+            ColecaoList(
+                colecoes=await colecoes_to_public(colecoes, db),
+                next_cursor=next_cursor([str(colecao['_id']) for colecao in colecoes], pagination),
+            ),
+            if_none_match,
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -122,6 +205,31 @@ async def read_colecoes(pagination: Pagination):
         )
 
 
+def filtro_busca(filters: ColecaoSearchFilters) -> tuple[dict, list[dict]]:
+    """Filtro ($match) e estágios de paginação da busca de coleções."""
+    filter_query = {}
+
+    if filters.titulo:
+        filter_query.update(filtro_texto_mongo('titulo', filters.titulo, filters.modo))
+
+    if filters.tipo:
+        filter_query['tipo'] = filters.tipo.value
+
+    if filters.data_inicio and filters.data_fim:
+        filter_query['data_lancamento'] = {
+            '$gte': filters.data_inicio.isoformat(),
+            '$lte': filters.data_fim.isoformat(),
+        }
+    elif filters.data_inicio:
+        filter_query['data_lancamento'] = {'$gte': filters.data_inicio.isoformat()}
+    elif filters.data_fim:
+        filter_query['data_lancamento'] = {'$lte': filters.data_fim.isoformat()}
+
+    if filters.titulo and filters.modo == ModoBuscaEnum.relevancia:
+        return filter_query, mongo_rank_stages(filters)
+    return filter_query, mongo_page_stages(filters)
+
+
 @router.get(
     '/buscar',
     summary='Buscar coleções por nome e/ou período de lançamento',
@@ -130,8 +238,14 @@ async def read_colecoes(pagination: Pagination):
     com suporte a paginação. Também é possível filtrar opcionalmente pelo
     **tipo de coleção** e/ou por período de data de lançamento.
 
+    O `modo` define como o título é comparado: `contem` (padrão, substring),
+    `prefixo` (início do título, ignorando acentos e maiúsculas) ou
+    `relevancia` (índice de texto, por palavras, da maior à menor pontuação;
+    paginação apenas por `offset`).
+
     Exemplos:
     - `/colecoes/buscar?titulo=rock`
+    - `/colecoes/buscar?titulo=kind%20of&modo=prefixo`
     - `/colecoes/buscar?titulo=rock&tipo=CD`
     - `/colecoes/buscar?titulo=rock&data_inicio=2020-01-01&data_fim=2022-12-31`
     """,
@@ -139,66 +253,102 @@ async def read_colecoes(pagination: Pagination):
 )
 async def search_colecoes(
     filters: Annotated[ColecaoSearchFilters, Query()],
+    db: MongoDatabase,
+    if_none_match: IfNoneMatch = None,
 ):
     try:
-        db = await get_mongo()
-        colecoes_collection = db.colecoes
-        generos_collection = db.generos
-
-        # Constrói o filtro de busca
-        filter_query = {}
+        filter_query, page_stages = filtro_busca(filters)
+        modo = filters.modo if filters.titulo else ModoBuscaEnum.contem
+        if modo == ModoBuscaEnum.prefixo:
+            filter_query = await resolver_prefixo_mongo(db.colecoes, filter_query, page_stages)
+            page_stages = [{'$sort': {'_id': 1}}]
 
-        if filters.titulo:
-            filter_query['titulo'] = {'$regex': filters.titulo, '$options': 'i'}
+        cursor = db.colecoes.aggregate(colecoes_pipeline(filter_query, page_stages))
+        colecoes = await cursor.to_list(length=filters.limit)
 
-        if filters.tipo:
-            filter_query['tipo'] = filters.tipo.value
+        return json_response(
+            ColecaoList(
+                colecoes=await colecoes_to_public(colecoes, db),
+                next_cursor=None
+                if modo == ModoBuscaEnum.relevancia
+                else next_cursor([str(colecao['_id']) for colecao in colecoes], filters),
+            ),
+            if_none_match,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail=f'Erro interno: {str(e)}',
+        )
 
-        if filters.data_inicio and filters.data_fim:
-            filter_query['data_lancamento'] = {
-                '$gte': filters.data_inicio.isoformat(),
-                '$lte': filters.data_fim.isoformat(),
-            }
-        elif filters.data_inicio:
-            filter_query['data_lancamento'] = {'$gte': filters.data_inicio.isoformat()}
-        elif filters.data_fim:
-            filter_query['data_lancamento'] = {'$lte': filters.data_fim.isoformat()}
 
-        cursor = colecoes_collection.find(filter_query).skip(filters.offset).limit(filters.limit)
-        colecoes = await cursor.to_list(length=filters.limit)
+@router.get(
+    '/buscar/facetas',
+    summary='Buscar coleções com contagens por tipo, década e gênero',
+    description="""
+    Mesmos filtros e página de `/colecoes/buscar`, mais as **facetas** de todas as
+    coleções encontradas: o total e as contagens por tipo, por década de lançamento
+    e pelos `FACETAS_MAX_GENEROS` gêneros mais frequentes.
 
-        colecoes_response = []
-        for colecao in colecoes:
-            # Buscar gêneros associados a esta coleção
-            generos_ids = colecao.get('generos_ids', [])
-            generos_data = []
-
-            if generos_ids:
-                generos_cursor = generos_collection.find({
-                    '_id': {'$in': [ObjectId(gid) for gid in generos_ids if ObjectId.is_valid(gid)]}
-                })
-                generos = await generos_cursor.to_list(length=None)
-
-                for genero in generos:
-                    generos_data.append({
-                        'id_genero': str(genero['_id']),
-                        'nome': genero['nome'],
-                        'surgiu_em': genero['surgiu_em'],
-                    })
-
-            colecoes_response.append(
-                ColecaoPublic(
-                    id_colecao=str(colecao['_id']),
-                    titulo=colecao['titulo'],
-                    tipo=colecao['tipo'],
-                    duracao=colecao['duracao'],
-                    caminho_capa=colecao['caminho_capa'],
-                    data_lancamento=colecao['data_lancamento'],
-                    generos=generos_data,
-                )
+    A página e as facetas saem de uma única agregação (`$facet`). As facetas
+    ficam em cache por filtro durante `CACHE_FACETAS_TTL` segundos, e nesse
+    intervalo só a página é consultada.
+    """,
+    response_model=ColecaoFacetas,
+)
+async def search_colecoes_facetas(
+    filters: Annotated[ColecaoSearchFilters, Query()],
+    db: MongoDatabase,
+    if_none_match: IfNoneMatch = None,
+):
+    try:
+        filter_query, page_stages = filtro_busca(filters)
+        modo = filters.modo if filters.titulo else ModoBuscaEnum.contem
+        # Aqui não há $lookup, então a busca por prefixo usa a collation na agregação inteira
+        collation = COLLATION_BUSCA if modo == ModoBuscaEnum.prefixo else None
+
+        chave = chave_facetas(filters)
+        versao = mongo_facetas_cache.versao
+        facetas = mongo_facetas_cache.get(chave)
+        if facetas is not None:
+            cursor = db.colecoes.aggregate(colecoes_pipeline(filter_query, page_stages), collation=collation)
+            colecoes = await cursor.to_list(length=filters.limit)
+        else:
+            pipeline = [
+                {'$match': filter_query},
+                {'$facet': {'colecoes': [*page_stages, COLECAO_PROJECAO], **facetas_mongo()}},
+            ]
+            (resultado,) = await db.colecoes.aggregate(pipeline, collation=collation).to_list(length=1)
+            colecoes = resultado['colecoes']
+
+            nomes = await mongo_generos_registro.resolver(
+                (genero['_id'] for genero in resultado['generos']),
+                lambda ids: buscar_generos_mongo(db, ids),
             )
-
-        return ColecaoList(colecoes=colecoes_response)
+            facetas = montar_facetas(
+                total=resultado['total'][0]['quantidade'] if resultado['total'] else 0,
+                nomes=nomes,
+                **{
+                    faceta: [(contagem['_id'], contagem['quantidade']) for contagem in resultado[faceta]]
+                    for faceta in ('tipos', 'decadas', 'generos')
+                },
+            )
+            mongo_facetas_cache.set(chave, facetas, versao)
+
+        return json_response(
+            ColecaoFacetas(
+                colecoes=await colecoes_to_public(colecoes, db),
+                next_cursor=None
+                if modo == ModoBuscaEnum.relevancia
+                else next_cursor([str(colecao['_id']) for colecao in colecoes], filters),
+                facetas=facetas,
+            ),
+            if_none_match,
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -206,53 +356,62 @@ async def search_colecoes(
         )
 
 
+async def exportar_colecoes(db):
+    """Percorre todas as coleções com um cursor, produzindo um lote de NDJSON por `batch_size` documentos."""
+    cursor = db.colecoes.find(
+        {},
+        {'titulo': 1, 'tipo': 1, 'duracao': 1, 'caminho_capa': 1, 'data_lancamento': 1, 'generos_ids': 1},
+        sort=[('_id', 1)],
+        batch_size=settings.EXPORT_BATCH_SIZE,
+    )
+    async for documentos in mongo_batches(cursor, settings.EXPORT_BATCH_SIZE):
+        yield ndjson(
+            ColecaoExport.model_construct(id_colecao=str(documento.pop('_id')), **documento)
+            for documento in documentos
+        )
+
+
+@router.get(
+    '/export',
+    summary='Exportar todas as coleções (NDJSON)',
+    description=(
+        'Retorna todas as coleções, uma por linha (`application/x-ndjson`), com os IDs dos seus gêneros. '
+        'Os documentos são lidos de um cursor em lotes de `EXPORT_BATCH_SIZE` e enviados à medida '
+        'que chegam, com uso de memória constante.'
+    ),
+    response_class=StreamingResponse,
+)
+async def export_colecoes(db: MongoDatabase):
+    return ndjson_response(exportar_colecoes(db))
+
+
 @router.get(
     '/{id_colecao}',
     summary='Buscar coleção por ID',
     description='Retorna uma coleção específica pelo seu identificador único.',
     response_model=ColecaoPublic,
 )
-async def read_colecao_by_id(id_colecao: str):
+async def read_colecao_by_id(id_colecao: str, db: MongoDatabase, if_none_match: IfNoneMatch = None):
     try:
         obj_id = validate_object_id(id_colecao)
 
-        db = await get_mongo()
-        colecoes_collection = db.colecoes
-        generos_collection = db.generos
+        representation = mongo_colecoes_cache.get(str(obj_id))
+        if representation is not None:
+            return conditional_response(representation, if_none_match)
 
-        colecao = await colecoes_collection.find_one({'_id': obj_id})
-        if not colecao:
+        versao = mongo_colecoes_cache.versao
+        colecoes = await db.colecoes.aggregate(colecoes_pipeline({'_id': obj_id})).to_list(length=1)
+        if not colecoes:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f'A coleção de ID {id_colecao} não foi encontrada.',
             )
 
-        # Buscar gêneros associados a esta coleção
-        generos_ids = colecao.get('generos_ids', [])
-        generos_data = []
-
-        if generos_ids:
-            generos_cursor = generos_collection.find({
-                '_id': {'$in': [ObjectId(gid) for gid in generos_ids if ObjectId.is_valid(gid)]}
-            })
-            generos = await generos_cursor.to_list(length=None)
-
-            for genero in generos:
-                generos_data.append({
-                    'id_genero': str(genero['_id']),
-                    'nome': genero['nome'],
-                    'surgiu_em': genero['surgiu_em'],
-                })
-
-        return ColecaoPublic(
-            id_colecao=str(colecao['_id']),
-            titulo=colecao['titulo'],
-            tipo=colecao['tipo'],
-            duracao=colecao['duracao'],
-            caminho_capa=colecao['caminho_capa'],
-            data_lancamento=colecao['data_lancamento'],
-            generos=generos_data,
-        )
+        (colecao,) = await colecoes_to_public(colecoes, db)
+        representation = represent(colecao)
+        mongo_colecoes_cache.set(str(obj_id), representation, versao)
+
+        return conditional_response(representation, if_none_match)
     except HTTPException:
         raise
     except Exception as e:
@@ -268,40 +427,27 @@ async def read_colecao_by_id(id_colecao: str):
     description='Substitui todos os campos da coleção especificada pelo corpo enviado.',
     response_model=ColecaoPublic,
 )
-async def update_colecao(id_colecao: str, colecao_schema: ColecaoSchema):
+async def update_colecao(id_colecao: str, colecao_schema: ColecaoSchema, db: MongoDatabase):
     try:
         obj_id = validate_object_id(id_colecao)
 
-        db = await get_mongo()
-        collection = db.colecoes
+        update_data = colecao_schema.model_dump()
+        update_data['data_lancamento'] = update_data['data_lancamento'].isoformat()
+        update_data['tipo'] = update_data['tipo'].value
 
-        # Verifica se a coleção existe
-        colecao = await collection.find_one({'_id': obj_id})
-        if not colecao:
+        # Atualiza e devolve o documento já alterado em uma única operação
+        updated_colecao = await db.colecoes.find_one_and_update(
+            {'_id': obj_id}, {'$set': update_data}, return_document=ReturnDocument.AFTER
+        )
+        if not updated_colecao:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f'A coleção de ID {id_colecao} não foi encontrada.',
             )
+        invalidar_colecao(str(obj_id))
 
-        # Atualiza o documento
-        update_data = colecao_schema.model_dump()
-        update_data['data_lancamento'] = update_data['data_lancamento'].isoformat()
-        update_data['tipo'] = update_data['tipo'].value
-
-        await collection.update_one({'_id': obj_id}, {'$set': update_data})
-
-        # Busca o documento atualizado
-        updated_colecao = await collection.find_one({'_id': obj_id})
-
-        return ColecaoPublic(
-            id_colecao=str(updated_colecao['_id']),
-            titulo=updated_colecao['titulo'],
-            tipo=updated_colecao['tipo'],
-            duracao=updated_colecao['duracao'],
-            caminho_capa=updated_colecao['caminho_capa'],
-            data_lancamento=updated_colecao['data_lancamento'],
-            generos=[],
-        )
+        (colecao,) = await colecoes_to_public([updated_colecao], db)
+        return colecao
     except HTTPException:
         raise
     except Exception as e:
@@ -317,57 +463,38 @@ async def update_colecao(id_colecao: str, colecao_schema: ColecaoSchema):
     description='Atualiza apenas os campos enviados no corpo da requisição.',
     response_model=ColecaoPublic,
 )
-async def patch_colecao(id_colecao: str, colecao_schema: ColecaoUpdateSchema):
+async def patch_colecao(id_colecao: str, colecao_schema: ColecaoUpdateSchema, db: MongoDatabase):
     try:
         obj_id = validate_object_id(id_colecao)
 
-        db = await get_mongo()
-        collection = db.colecoes
-
-        # Verifica se a coleção existe
-        colecao = await collection.find_one({'_id': obj_id})
-        if not colecao:
-            raise HTTPException(
-                status_code=HTTPStatus.NOT_FOUND,
-                detail=f'A coleção de ID {id_colecao} não foi encontrada.',
-            )
-
         # Prepara dados para atualização (apenas campos não nulos)
         update_data = colecao_schema.model_dump(exclude_unset=True)
 
-        if not update_data:
-            # Se não há dados para atualizar, retorna a coleção atual
-            return ColecaoPublic(
-                id_colecao=str(colecao['_id']),
-                titulo=colecao['titulo'],
-                tipo=colecao['tipo'],
-                duracao=colecao['duracao'],
-                caminho_capa=colecao['caminho_capa'],
-                data_lancamento=colecao['data_lancamento'],
-                generos=[],
-            )
-
         # Converte campos especiais se presentes
         if 'data_lancamento' in update_data:
             update_data['data_lancamento'] = update_data['data_lancamento'].isoformat()
         if 'tipo' in update_data:
             update_data['tipo'] = update_data['tipo'].value
 
-        # Atualiza o documento
-        await collection.update_one({'_id': obj_id}, {'$set': update_data})
+        if update_data:
+            # Atualiza e devolve o documento já alterado em uma única operação
+            colecao = await db.colecoes.find_one_and_update(
+                {'_id': obj_id}, {'$set': update_data}, return_document=ReturnDocument.AFTER
+            )
+        else:
+            # Se não há dados para atualizar, retorna a coleção atual
+            colecao = await db.colecoes.find_one({'_id': obj_id})
 
-        # Busca o documento atualizado
-        updated_colecao = await collection.find_one({'_id': obj_id})
+        if not colecao:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail=f'A coleção de ID {id_colecao} não foi encontrada.',
+            )
+        if update_data:
+            invalidar_colecao(str(obj_id))
 
-        return ColecaoPublic(
-            id_colecao=str(updated_colecao['_id']),
-            titulo=updated_colecao['titulo'],
-            tipo=updated_colecao['tipo'],
-            duracao=updated_colecao['duracao'],
-            caminho_capa=updated_colecao['caminho_capa'],
-            data_lancamento=updated_colecao['data_lancamento'],
-            generos=[],
-        )
+        (colecao,) = await colecoes_to_public([colecao], db)
+        return colecao
     except HTTPException:
         raise
     except Exception as e:
@@ -383,23 +510,18 @@ async def patch_colecao(id_colecao: str, colecao_schema: ColecaoUpdateSchema):
     description='Remove uma coleção pelo seu identificador único.',
     response_model=Mensagem,
 )
-async def delete_colecao(id_colecao: str):
+async def delete_colecao(id_colecao: str, db: MongoDatabase):
     try:
         obj_id = validate_object_id(id_colecao)
 
-        db = await get_mongo()
-        collection = db.colecoes
-
-        # Verifica se a coleção existe
-        colecao = await collection.find_one({'_id': obj_id})
-        if not colecao:
+        # Remove a coleção; `deleted_count` dispensa a consulta prévia de existência
+        result = await db.colecoes.delete_one({'_id': obj_id})
+        if not result.deleted_count:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f'A coleção de ID {id_colecao} não foi encontrada.',
             )
-
-        # Remove a coleção
-        await collection.delete_one({'_id': obj_id})
+        invalidar_colecao(str(obj_id))
 
         return Mensagem(mensagem='Coleção deletada com sucesso.')
     except HTTPException:
@@ -417,17 +539,16 @@ async def delete_colecao(id_colecao: str):
     description='Adiciona um gênero a uma coleção específica.',
     response_model=Mensagem,
 )
-async def add_genero_to_colecao(id_colecao: str, id_genero: str):
+async def add_genero_to_colecao(id_colecao: str, id_genero: str, db: MongoDatabase):
     try:
         colecao_obj_id = validate_object_id(id_colecao)
         genero_obj_id = validate_object_id(id_genero)
 
-        db = await get_mongo()
         colecoes_collection = db.colecoes
         generos_collection = db.generos
 
         # Buscar a coleção
-        colecao = await colecoes_collection.find_one({'_id': colecao_obj_id})
+        colecao = await colecoes_collection.find_one({'_id': colecao_obj_id}, {'titulo': 1, 'generos_ids': 1})
         if not colecao:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
@@ -450,10 +571,16 @@ async def add_genero_to_colecao(id_colecao: str, id_genero: str):
                 detail=(f'O gênero "{genero["nome"]}" já está associado à coleção "{colecao["titulo"]}".'),
             )
 
-        # Adicionar o gênero à coleção
+        # Adicionar o gênero à coleção (e o seu snapshot, no modo embutido; o filtro impede um snapshot
+        # repetido se outra requisição associou o mesmo gênero nesse meio-tempo)
+        update = {'$addToSet': {'generos_ids': id_genero}}
+        if settings.MONGODB_GENEROS_EMBUTIDOS:
+            update['$push'] = {'generos': snapshot(genero)}
         await colecoes_collection.update_one(
-            {'_id': colecao_obj_id}, {'$addToSet': {'generos_ids': id_genero}}
+            {'_id': colecao_obj_id, 'generos_ids': {'$ne': id_genero}}, update
         )
+        mongo_colecoes_cache.invalidate(str(colecao_obj_id))
+        mongo_generos_cache.invalidate(str(genero_obj_id))
 
         return Mensagem(
             mensagem=(f'Gênero "{genero["nome"]}" associado à coleção "{colecao["titulo"]}" com sucesso.')
@@ -473,17 +600,16 @@ async def add_genero_to_colecao(id_colecao: str, id_genero: str):
     description='Remove um gênero de uma coleção específica.',
     response_model=Mensagem,
 )
-async def remove_genero_from_colecao(id_colecao: str, id_genero: str):
+async def remove_genero_from_colecao(id_colecao: str, id_genero: str, db: MongoDatabase):
     try:
         colecao_obj_id = validate_object_id(id_colecao)
         genero_obj_id = validate_object_id(id_genero)
 
-        db = await get_mongo()
         colecoes_collection = db.colecoes
         generos_collection = db.generos
 
         # Buscar a coleção
-        colecao = await colecoes_collection.find_one({'_id': colecao_obj_id})
+        colecao = await colecoes_collection.find_one({'_id': colecao_obj_id}, {'titulo': 1, 'generos_ids': 1})
         if not colecao:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
@@ -506,8 +632,12 @@ async def remove_genero_from_colecao(id_colecao: str, id_genero: str):
                 detail=(f'O gênero "{genero["nome"]}" não está associado à coleção "{colecao["titulo"]}".'),
             )
 
-        # Remover o gênero da coleção
-        await colecoes_collection.update_one({'_id': colecao_obj_id}, {'$pull': {'generos_ids': id_genero}})
+        # Remover o gênero (e o seu snapshot) da coleção
+        await colecoes_collection.update_one(
+            {'_id': colecao_obj_id}, {'$pull': {'generos_ids': id_genero, 'generos': {'_id': genero_obj_id}}}
+        )
+        mongo_colecoes_cache.invalidate(str(colecao_obj_id))
+        mongo_generos_cache.invalidate(str(genero_obj_id))
 
         return Mensagem(
             mensagem=(f'Gênero "{genero["nome"]}" desassociado da coleção "{colecao["titulo"]}" com sucesso.')
@@ -527,42 +657,24 @@ async def remove_genero_from_colecao(id_colecao: str, id_genero: str):
     description='Retorna todos os gêneros associados a uma coleção específica.',
     response_model=dict,
 )
-async def get_generos_from_colecao(id_colecao: str):
+async def get_generos_from_colecao(id_colecao: str, db: MongoDatabase):
     try:
         obj_id = validate_object_id(id_colecao)
 
-        db = await get_mongo()
-        colecoes_collection = db.colecoes
-        generos_collection = db.generos
-
-        # Buscar a coleção
-        colecao = await colecoes_collection.find_one({'_id': obj_id})
+        # Buscar a coleção; os gêneros associados vêm dos snapshots ou do registro em memória
+        colecao = await db.colecoes.find_one({'_id': obj_id}, {'titulo': 1, 'generos_ids': 1, 'generos': 1})
         if not colecao:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f'A coleção de ID {id_colecao} não foi encontrada.',
             )
 
-        # Buscar gêneros associados
         generos_ids = colecao.get('generos_ids', [])
-        generos_data = []
-
-        if generos_ids:
-            generos_cursor = generos_collection.find({
-                '_id': {'$in': [ObjectId(gid) for gid in generos_ids if ObjectId.is_valid(gid)]}
-            })
-            generos = await generos_cursor.to_list(length=None)
-
-            for genero in generos:
-                generos_data.append({
-                    'id_genero': str(genero['_id']),
-                    'nome': genero['nome'],
-                    'surgiu_em': genero['surgiu_em'],
-                })
+        generos = await resolver_generos([colecao], db)
 
         return {
             'colecao': {'id_colecao': str(colecao['_id']), 'titulo': colecao['titulo']},
-            'generos': generos_data,
+            'generos': [generos[gid].model_dump() for gid in generos_ids if gid in generos],
         }
     except HTTPException:
         raise
@@ -579,50 +691,55 @@ async def get_generos_from_colecao(id_colecao: str):
     description='Substitui todos os gêneros de uma coleção pelos IDs fornecidos.',
     response_model=Mensagem,
 )
-async def set_generos_to_colecao(id_colecao: str, generos_ids: list[str]):
+async def set_generos_to_colecao(id_colecao: str, generos_ids: list[str], db: MongoDatabase):
     try:
         obj_id = validate_object_id(id_colecao)
 
-        db = await get_mongo()
         colecoes_collection = db.colecoes
         generos_collection = db.generos
 
+        # Validar todos os IDs de gêneros; repetidos no corpo não mudam o resultado
+        invalidos = [gid for gid in generos_ids if not ObjectId.is_valid(gid)]
+        if invalidos:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=f'ID de gênero inválido: {invalidos[0]}',
+            )
+        generos_ids = list(dict.fromkeys(str(ObjectId(gid)) for gid in generos_ids))
+
         # Buscar a coleção
-        colecao = await colecoes_collection.find_one({'_id': obj_id})
+        colecao = await colecoes_collection.find_one({'_id': obj_id}, {'titulo': 1, 'generos_ids': 1})
         if not colecao:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f'A coleção de ID {id_colecao} não foi encontrada.',
             )
 
-        # Validar todos os IDs de gêneros
-        generos_obj_ids = []
-        for gid in generos_ids:
-            try:
-                generos_obj_ids.append(validate_object_id(gid))
-            except HTTPException:
-                raise HTTPException(
-                    status_code=HTTPStatus.BAD_REQUEST,
-                    detail=f'ID de gênero inválido: {gid}',
-                )
-
         # Buscar todos os gêneros pelos IDs
-        generos_cursor = generos_collection.find({'_id': {'$in': generos_obj_ids}})
-        generos = await generos_cursor.to_list(length=None)
+        generos_cursor = generos_collection.find(
+            {'_id': {'$in': [ObjectId(gid) for gid in generos_ids]}}, {'nome': 1, 'surgiu_em': 1}
+        )
+        generos = {str(g['_id']): g async for g in generos_cursor}
 
         # Verificar se todos os gêneros foram encontrados
-        if len(generos) != len(generos_ids):
-            generos_encontrados = [str(g['_id']) for g in generos]
-            generos_nao_encontrados = [gid for gid in generos_ids if gid not in generos_encontrados]
+        generos_nao_encontrados = [gid for gid in generos_ids if gid not in generos]
+        if generos_nao_encontrados:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f'Gêneros não encontrados: {generos_nao_encontrados}',
             )
 
-        # Substituir todos os gêneros da coleção
-        await colecoes_collection.update_one({'_id': obj_id}, {'$set': {'generos_ids': generos_ids}})
-
-        generos_nomes = [g['nome'] for g in generos]
+        # Gravar só se a lista mudou; o cache só perde a coleção e os gêneros que entraram ou saíram
+        atuais = colecao.get('generos_ids', [])
+        if atuais != generos_ids:
+            update_data = {'generos_ids': generos_ids}
+            if settings.MONGODB_GENEROS_EMBUTIDOS:
+                update_data['generos'] = [snapshot(generos[gid]) for gid in generos_ids]
+            await colecoes_collection.update_one({'_id': obj_id}, {'$set': update_data})
+            mongo_colecoes_cache.invalidate(str(obj_id))
+            mongo_generos_cache.invalidate(*set(atuais).symmetric_difference(generos_ids))
+
+        generos_nomes = [generos[gid]['nome'] for gid in generos_ids]
         return Mensagem(
             mensagem=(f'Gêneros da coleção "{colecao["titulo"]}" definidos como: {", ".join(generos_nomes)}')
         )
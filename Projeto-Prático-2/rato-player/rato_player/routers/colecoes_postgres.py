@@ -1,48 +1,205 @@
 from http import HTTPStatus
+from operator import attrgetter
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, select
-from sqlalchemy.orm import Session, selectinload
-
-from rato_player.databases.postgres import get_postgres
-from rato_player.models import Colecao, Genero
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Integer, and_, delete, exists, func, literal, literal_column, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from rato_player.bulk import bulk_result, chunked, postgres_insert_chunk
+from rato_player.busca import (
+    chave_facetas,
+    facetas_postgres,
+    filtro_texto_postgres,
+    montar_facetas,
+    ordem_relevancia_postgres,
+)
+from rato_player.cache import (
+    contem_colecao,
+    postgres_colecoes_cache,
+    postgres_facetas_cache,
+    postgres_generos_cache,
+)
+from rato_player.databases.postgres import get_postgres, open_postgres
+from rato_player.enums import ModoBuscaEnum, StatusBulkEnum
+from rato_player.etag import IfNoneMatch, conditional_response, json_response, represent
+from rato_player.export import ndjson, ndjson_response
+from rato_player.models import Colecao, Genero, genero_colecao
+from rato_player.pagination import next_cursor, paginate, paginate_by_rank
+from rato_player.registro import buscar_generos_postgres, postgres_generos_registro
 from rato_player.schemas import (
+    AssociacaoSchema,
+    BulkItemResult,
+    BulkResult,
+    ColecaoExport,
+    ColecaoFacetas,
     ColecaoList,
     ColecaoPublic,
     ColecaoSchema,
     ColecaoSearchFilters,
     ColecaoUpdateSchema,
+    Facetas,
     FilterPage,
     Mensagem,
 )
+from rato_player.settings import Settings
+
+settings = Settings()
 
 router = APIRouter(prefix='/postgres/colecoes', tags=['Coleções - Postgres'])
 
-SessionPostgres = Annotated[Session, Depends(get_postgres)]
+SessionPostgres = Annotated[AsyncSession, Depends(get_postgres)]
 Pagination = Annotated[FilterPage, Query()]
 
 
+def invalidar_colecao(id_colecao: int):
+    """Remove do cache a coleção e os gêneros que a exibem."""
+    postgres_colecoes_cache.invalidate(id_colecao)
+    postgres_generos_cache.invalidate_where(contem_colecao(id_colecao))
+
+
+# Gêneros da coleção em JSON, calculados no próprio RETURNING das escritas: a resposta sai do
+# mesmo comando, sem o SELECT/refresh que o ORM faria depois
+GENEROS_JSON = (
+    select(
+        func.coalesce(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_object(
+                        'id_genero', Genero.id_genero, 'nome', Genero.nome, 'surgiu_em', Genero.surgiu_em
+                    ),
+                    Genero.id_genero,
+                )
+            ),
+            literal_column("'[]'::json"),
+        )
+    )
+    .select_from(genero_colecao.join(Genero))
+    .where(genero_colecao.c.id_colecao == Colecao.id_colecao)
+    .correlate(Colecao)
+    .scalar_subquery()
+    .label('generos')
+)
+
+COLECAO_COLUNAS = (
+    Colecao.id_colecao,
+    Colecao.titulo,
+    Colecao.tipo,
+    Colecao.duracao,
+    Colecao.caminho_capa,
+    Colecao.data_lancamento,
+)
+
+COLECAO_RETURNING = (*COLECAO_COLUNAS, GENEROS_JSON)
+
+# IDs dos gêneros de cada coleção, na mesma linha da coleção; os gêneros em si vêm do registro em memória
+GENEROS_IDS = (
+    select(func.array_agg(aggregate_order_by(genero_colecao.c.id_genero, genero_colecao.c.id_genero)))
+    .where(genero_colecao.c.id_colecao == Colecao.id_colecao)
+    .correlate(Colecao)
+    .scalar_subquery()
+    .label('generos_ids')
+)
+
+
+async def colecoes_to_public(linhas, session) -> list[ColecaoPublic]:
+    """Converte linhas de (COLECAO_COLUNAS, GENEROS_IDS) em ColecaoPublic, com os gêneros do registro."""
+    generos = await postgres_generos_registro.resolver(
+        (id_genero for linha in linhas for id_genero in linha.generos_ids or ()),
+        lambda ids: buscar_generos_postgres(session, ids),
+    )
+    return [
+        ColecaoPublic(
+            id_colecao=linha.id_colecao,
+            titulo=linha.titulo,
+            tipo=linha.tipo,
+            duracao=linha.duracao,
+            caminho_capa=linha.caminho_capa,
+            data_lancamento=linha.data_lancamento,
+            generos=[generos[id_genero] for id_genero in linha.generos_ids or () if id_genero in generos],
+        )
+        for linha in linhas
+    ]
+
+
+def associacao_stmt(id_colecao: int, id_genero: int, escrita):
+    """Aplica `escrita` (INSERT/DELETE em genero_colecao) e, no mesmo comando, devolve o título da
+    coleção, o nome do gênero (None se não existirem) e se a associação foi alterada."""
+    alterada = escrita.returning(genero_colecao.c.id_genero).cte('alterada')
+    return select(
+        select(Colecao.titulo).where(Colecao.id_colecao == id_colecao).scalar_subquery().label('titulo'),
+        select(Genero.nome).where(Genero.id_genero == id_genero).scalar_subquery().label('nome'),
+        exists(alterada.select()).label('alterada'),
+    )
+
+
+async def executar_associacao(id_colecao: int, id_genero: int, escrita, session):
+    """Executa `associacao_stmt` e traduz coleção ou gênero inexistente em 404."""
+    resultado = (await session.execute(associacao_stmt(id_colecao, id_genero, escrita))).one()
+
+    if resultado.titulo is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f'A coleção de ID {id_colecao} não foi encontrada.',
+        )
+    if resultado.nome is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f'O gênero de ID {id_genero} não foi encontrado.',
+        )
+
+    return resultado
+
+
 @router.post(
     '/',
     status_code=HTTPStatus.CREATED,
     summary='Criar uma nova coleção',
     response_model=ColecaoPublic,
 )
-def create_colecao(colecao_schema: ColecaoSchema, session: SessionPostgres):
-    colecao = Colecao(
-        titulo=colecao_schema.titulo,
-        tipo=colecao_schema.tipo,
-        duracao=colecao_schema.duracao,
-        caminho_capa=colecao_schema.caminho_capa,
-        data_lancamento=colecao_schema.data_lancamento,
-    )
+async def create_colecao(colecao_schema: ColecaoSchema, session: SessionPostgres):
+    colecao = (
+        await session.execute(
+            insert(Colecao).values(**colecao_schema.model_dump()).returning(*COLECAO_COLUNAS)
+        )
+    ).one()
+    await session.commit()
+
+    return ColecaoPublic.model_validate({**colecao._mapping, 'generos': []})
 
-    session.add(colecao)
-    session.commit()
-    session.refresh(colecao)
 
-    return colecao
+@router.post(
+    '/bulk',
+    summary='Criar coleções em lote',
+    description=(
+        'Cria várias coleções com um INSERT de várias linhas por lote (`BULK_CHUNK_SIZE`); se o lote '
+        'falhar, os itens são gravados um a um e os inválidos são reportados como erro.'
+    ),
+    response_model=BulkResult,
+)
+async def create_colecoes_bulk(colecoes_schema: list[ColecaoSchema], session: SessionPostgres):
+    async def inserir(colecoes: list[ColecaoSchema]):
+        # `sort_by_parameter_order` garante que os IDs voltam na mesma ordem dos itens do lote
+        return (
+            await session.scalars(
+                insert(Colecao).returning(Colecao.id_colecao, sort_by_parameter_order=True),
+                [colecao.model_dump() for colecao in colecoes],
+            )
+        ).all()
+
+    resultados = []
+    for inicio, lote in chunked(colecoes_schema, settings.BULK_CHUNK_SIZE):
+        partes, erros = await postgres_insert_chunk(session, inserir, lote, inicio)
+        resultados.extend(erros)
+        resultados.extend(
+            BulkItemResult(indice=indice, status=StatusBulkEnum.criado, id=id_colecao)
+            for inicio_parte, _, ids in partes
+            for indice, id_colecao in enumerate(ids, start=inicio_parte)
+        )
+
+    return bulk_result(sorted(resultados, key=attrgetter('indice')))
 
 
 @router.get(
@@ -51,15 +208,56 @@ def create_colecao(colecao_schema: ColecaoSchema, session: SessionPostgres):
     description='Retorna todas as coleções cadastradas (com suporte a paginação).',
     response_model=ColecaoList,
 )
-def read_colecoes(session: SessionPostgres, pagination: Pagination):
-    colecoes = session.scalars(
-        select(Colecao)
-        .options(selectinload(Colecao.generos))
-        .offset(pagination.offset)
-        .limit(pagination.limit)
+async def read_colecoes(session: SessionPostgres, pagination: Pagination, if_none_match: IfNoneMatch = None):
+    linhas = (
+        await session.execute(paginate(select(*COLECAO_COLUNAS, GENEROS_IDS), Colecao.id_colecao, pagination))
     ).all()
 
-    return {'colecoes': colecoes}
+    return json_response(
+        ColecaoList(
+            colecoes=await colecoes_to_public(linhas, session),
+            next_cursor=next_cursor([linha.id_colecao for linha in linhas], pagination),
+        ),
+        if_none_match,
+    )
+
+
+def condicoes_busca(filters: ColecaoSearchFilters) -> list:
+    """Condições (WHERE) da busca de coleções."""
+    condicoes = []
+    if filters.titulo:
+        condicoes.append(filtro_texto_postgres(Colecao.titulo, filters.titulo, filters.modo))
+    if filters.tipo:
+        condicoes.append(Colecao.tipo == filters.tipo)
+    if filters.data_inicio:
+        condicoes.append(Colecao.data_lancamento >= filters.data_inicio)
+    if filters.data_fim:
+        condicoes.append(Colecao.data_lancamento <= filters.data_fim)
+    return condicoes
+
+
+def ordem_busca(filters: ColecaoSearchFilters):
+    """Ordenação do modo `relevancia`."""
+    return ordem_relevancia_postgres(Colecao.titulo, filters.titulo)
+
+
+def busca_stmt(filters: ColecaoSearchFilters):
+    """Consulta de uma página da busca de coleções e se ela é ordenada por relevância (sem cursor)."""
+    stmt = select(*COLECAO_COLUNAS, GENEROS_IDS).where(*condicoes_busca(filters))
+    por_relevancia = bool(filters.titulo) and filters.modo == ModoBuscaEnum.relevancia
+
+    if por_relevancia:
+        return paginate_by_rank(stmt, ordem_busca(filters), Colecao.id_colecao, filters), True
+    return paginate(stmt, Colecao.id_colecao, filters), False
+
+
+async def facetas_to_public(facetas: dict, session) -> Facetas:
+    """Converte o JSON de `facetas_postgres` em Facetas, com os nomes dos gêneros do registro."""
+    nomes = await postgres_generos_registro.resolver(
+        (id_genero for id_genero, _ in facetas['generos']),
+        lambda ids: buscar_generos_postgres(session, ids),
+    )
+    return montar_facetas(**facetas, nomes=nomes)
 
 
 @router.get(
@@ -70,42 +268,125 @@ def read_colecoes(session: SessionPostgres, pagination: Pagination):
     com suporte a paginação. Também é possível filtrar opcionalmente pelo
     **tipo de coleção** e/ou por período de data de lançamento.
 
+    O `modo` define como o título é comparado: `contem` (padrão, substring),
+    `prefixo` (início do título) ou `relevancia` (similaridade de trigramas,
+    do mais ao menos parecido; paginação apenas por `offset`). Os modos
+    `prefixo` e `relevancia` ignoram acentos e maiúsculas.
+
     Exemplos:
     - `/colecoes/buscar?titulo=rock`
+    - `/colecoes/buscar?titulo=sertao&modo=relevancia`
+    - `/colecoes/buscar?titulo=kind%20of&modo=prefixo`
     - `/colecoes/buscar?titulo=rock&tipo=CD`
     - `/colecoes/buscar?titulo=rock&data_inicio=2020-01-01&data_fim=2022-12-31`
     """,
     response_model=ColecaoList,
 )
-def search_colecoes(
+async def search_colecoes(
     session: SessionPostgres,
     filters: Annotated[ColecaoSearchFilters, Query()],
+    if_none_match: IfNoneMatch = None,
 ):
-    stmt = select(Colecao)
+    stmt, por_relevancia = busca_stmt(filters)
+    linhas = (await session.execute(stmt)).all()
+
+    return json_response(
+        ColecaoList(
+            colecoes=await colecoes_to_public(linhas, session),
+            next_cursor=None
+            if por_relevancia
+            else next_cursor([linha.id_colecao for linha in linhas], filters),
+        ),
+        if_none_match,
+    )
 
-    if filters.titulo:
-        stmt = stmt.where(Colecao.titulo.ilike(f'%{filters.titulo}%'))
 
-    if filters.tipo:
-        stmt = stmt.where(Colecao.tipo == filters.tipo)
+@router.get(
+    '/buscar/facetas',
+    summary='Buscar coleções com contagens por tipo, década e gênero',
+    description="""
+    Mesmos filtros e página de `/colecoes/buscar`, mais as **facetas** de todas as
+    coleções encontradas: o total e as contagens por tipo, por década de lançamento
+    e pelos `FACETAS_MAX_GENEROS` gêneros mais frequentes.
 
-    if filters.data_inicio and filters.data_fim:
-        stmt = stmt.where(
-            and_(
-                Colecao.data_lancamento >= filters.data_inicio,
-                Colecao.data_lancamento <= filters.data_fim,
+    A página e as facetas saem de uma única consulta (GROUPING SETS). As facetas
+    ficam em cache por filtro durante `CACHE_FACETAS_TTL` segundos, e nesse
+    intervalo só a página é consultada.
+    """,
+    response_model=ColecaoFacetas,
+)
+async def search_colecoes_facetas(
+    session: SessionPostgres,
+    filters: Annotated[ColecaoSearchFilters, Query()],
+    if_none_match: IfNoneMatch = None,
+):
+    stmt, por_relevancia = busca_stmt(filters)
+
+    chave = chave_facetas(filters)
+    versao = postgres_facetas_cache.versao
+    facetas = postgres_facetas_cache.get(chave)
+    if facetas is not None:
+        linhas = (await session.execute(stmt)).all()
+    else:
+        # Uma linha de facetas com a página ao lado (LEFT JOIN: a linha vem mesmo sem resultados);
+        # `posicao` preserva a ordem da página
+        ordem = (ordem_busca(filters), Colecao.id_colecao) if por_relevancia else Colecao.id_colecao
+        pagina = stmt.add_columns(func.row_number().over(order_by=ordem).label('posicao')).subquery('pagina')
+        consulta = facetas_postgres(condicoes_busca(filters)).subquery('facetas')
+        resultado = (
+            await session.execute(
+                select(consulta.c.facetas, *pagina.c)
+                .select_from(consulta.outerjoin(pagina, true()))
+                .order_by(pagina.c.posicao)
             )
-        )
-    elif filters.data_inicio:
-        stmt = stmt.where(Colecao.data_lancamento >= filters.data_inicio)
-    elif filters.data_fim:
-        stmt = stmt.where(Colecao.data_lancamento <= filters.data_fim)
+        ).all()
+        linhas = [linha for linha in resultado if linha.id_colecao is not None]
+
+        facetas = await facetas_to_public(resultado[0].facetas, session)
+        postgres_facetas_cache.set(chave, facetas, versao)
+
+    return json_response(
+        ColecaoFacetas(
+            colecoes=await colecoes_to_public(linhas, session),
+            next_cursor=None
+            if por_relevancia
+            else next_cursor([linha.id_colecao for linha in linhas], filters),
+            facetas=facetas,
+        ),
+        if_none_match,
+    )
+
+
+async def exportar_colecoes():
+    """Percorre todas as coleções com um cursor no servidor, produzindo um lote de NDJSON por partição."""
+    stmt = (
+        select(*COLECAO_COLUNAS, GENEROS_IDS)
+        .order_by(Colecao.id_colecao)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
 
-    stmt = stmt.offset(filters.offset).limit(filters.limit)
+    async with open_postgres() as session:
+        result = await session.stream(stmt)
+        async for linhas in result.partitions():
+            # `model_construct`: os dados vêm do banco e só precisam ser serializados
+            yield ndjson(
+                ColecaoExport.model_construct(**{**linha._mapping, 'generos_ids': linha.generos_ids or []})
+                for linha in linhas
+            )
 
-    colecoes = session.execute(stmt.options(selectinload(Colecao.generos))).scalars().all()
 
-    return {'colecoes': colecoes}
+@router.get(
+    '/export',
+    summary='Exportar todas as coleções (NDJSON)',
+    description=(
+        'Retorna todas as coleções, uma por linha (`application/x-ndjson`), com os IDs dos seus gêneros. '
+        'As linhas são lidas de um cursor no servidor em lotes de `EXPORT_BATCH_SIZE` e enviadas à medida '
+        'que chegam, com uso de memória constante.'
+    ),
+    response_class=StreamingResponse,
+)
+async def export_colecoes():
+    return ndjson_response(exportar_colecoes())
 
 
 @router.get(
@@ -114,18 +395,27 @@ def search_colecoes(
     description='Retorna uma coleção específica pelo seu identificador único.',
     response_model=ColecaoPublic,
 )
-def read_colecao_by_id(id_colecao: int, session: SessionPostgres):
-    colecao = session.scalar(
-        select(Colecao).options(selectinload(Colecao.generos)).where(Colecao.id_colecao == id_colecao)
-    )
+async def read_colecao_by_id(id_colecao: int, session: SessionPostgres, if_none_match: IfNoneMatch = None):
+    representation = postgres_colecoes_cache.get(id_colecao)
+    if representation is not None:
+        return conditional_response(representation, if_none_match)
 
-    if not colecao:
+    versao = postgres_colecoes_cache.versao
+    linha = (
+        await session.execute(select(*COLECAO_COLUNAS, GENEROS_IDS).where(Colecao.id_colecao == id_colecao))
+    ).one_or_none()
+
+    if not linha:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=f'A coleção de ID {id_colecao} não foi encontrada.',
         )
 
-    return colecao
+    (colecao,) = await colecoes_to_public([linha], session)
+    representation = represent(colecao)
+    postgres_colecoes_cache.set(id_colecao, representation, versao)
+
+    return conditional_response(representation, if_none_match)
 
 
 @router.put(
@@ -134,8 +424,17 @@ def read_colecao_by_id(id_colecao: int, session: SessionPostgres):
     description='Substitui todos os campos da coleção especificada pelo corpo enviado.',
     response_model=ColecaoPublic,
 )
-def update_colecao(id_colecao: int, colecao_schema: ColecaoSchema, session: SessionPostgres):
-    colecao = session.scalar(select(Colecao).where(Colecao.id_colecao == id_colecao))
+async def update_colecao(id_colecao: int, colecao_schema: ColecaoSchema, session: SessionPostgres):
+    # UPDATE ... RETURNING: nenhuma linha devolvida significa que a coleção não existe
+    colecao = (
+        await session.execute(
+            update(Colecao)
+            .where(Colecao.id_colecao == id_colecao)
+            .values(**colecao_schema.model_dump())
+            .returning(*COLECAO_RETURNING)
+            .execution_options(synchronize_session=False)
+        )
+    ).one_or_none()
 
     if not colecao:
         raise HTTPException(
@@ -143,15 +442,10 @@ def update_colecao(id_colecao: int, colecao_schema: ColecaoSchema, session: Sess
             detail=f'A coleção de ID {id_colecao} não foi encontrada.',
         )
 
-    colecao_schema = colecao_schema.model_dump()
-    for key, value in colecao_schema.items():
-        setattr(colecao, key, value)
+    await session.commit()
+    invalidar_colecao(id_colecao)
 
-    session.add(colecao)
-    session.commit()
-    session.refresh(colecao)
-
-    return colecao
+    return ColecaoPublic.model_validate(colecao._mapping)
 
 
 @router.patch(
@@ -160,8 +454,22 @@ def update_colecao(id_colecao: int, colecao_schema: ColecaoSchema, session: Sess
     description='Atualiza apenas os campos enviados no corpo da requisição.',
     response_model=ColecaoPublic,
 )
-def patch_colecao(id_colecao: int, colecao_schema: ColecaoUpdateSchema, session: SessionPostgres):
-    colecao = session.scalar(select(Colecao).where(Colecao.id_colecao == id_colecao))
+async def patch_colecao(id_colecao: int, colecao_schema: ColecaoUpdateSchema, session: SessionPostgres):
+    update_data = colecao_schema.model_dump(exclude_unset=True)
+
+    if update_data:
+        stmt = (
+            update(Colecao)
+            .where(Colecao.id_colecao == id_colecao)
+            .values(**update_data)
+            .returning(*COLECAO_RETURNING)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        # Sem campos para atualizar, apenas devolve a coleção atual
+        stmt = select(*COLECAO_RETURNING).where(Colecao.id_colecao == id_colecao)
+
+    colecao = (await session.execute(stmt)).one_or_none()
 
     if not colecao:
         raise HTTPException(
@@ -169,15 +477,11 @@ def patch_colecao(id_colecao: int, colecao_schema: ColecaoUpdateSchema, session:
             detail=f'A coleção de ID {id_colecao} não foi encontrada.',
         )
 
-    colecao_schema = colecao_schema.model_dump(exclude_unset=True)
-    for key, value in colecao_schema.items():
-        setattr(colecao, key, value)
-
-    session.add(colecao)
-    session.commit()
-    session.refresh(colecao)
+    if update_data:
+        await session.commit()
+        invalidar_colecao(id_colecao)
 
-    return colecao
+    return ColecaoPublic.model_validate(colecao._mapping)
 
 
 @router.delete(
@@ -186,17 +490,25 @@ def patch_colecao(id_colecao: int, colecao_schema: ColecaoUpdateSchema, session:
     description='Remove uma coleção pelo seu identificador único.',
     response_model=Mensagem,
 )
-def delete_colecao(id_colecao: int, session: SessionPostgres):
-    colecao = session.scalar(select(Colecao).where(Colecao.id_colecao == id_colecao))
+async def delete_colecao(id_colecao: int, session: SessionPostgres):
+    # As associações saem em uma CTE do mesmo comando (o ORM as removia antes, linha a linha)
+    associacoes = delete(genero_colecao).where(genero_colecao.c.id_colecao == id_colecao).cte('associacoes')
+    deleted = await session.scalar(
+        delete(Colecao)
+        .where(Colecao.id_colecao == id_colecao)
+        .add_cte(associacoes)
+        .returning(Colecao.id_colecao)
+        .execution_options(synchronize_session=False)
+    )
 
-    if not colecao:
+    if deleted is None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=f'A coleção de ID {id_colecao} não foi encontrada.',
         )
 
-    session.delete(colecao)
-    session.commit()
+    await session.commit()
+    invalidar_colecao(id_colecao)
 
     return {'mensagem': 'Coleção deletada com sucesso.'}
 
@@ -207,35 +519,32 @@ def delete_colecao(id_colecao: int, session: SessionPostgres):
     description='Adiciona um gênero a uma coleção específica.',
     response_model=Mensagem,
 )
-def add_genero_to_colecao(id_colecao: int, id_genero: int, session: SessionPostgres):
-    # Buscar a coleção
-    colecao = session.scalar(select(Colecao).where(Colecao.id_colecao == id_colecao))
-    if not colecao:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail=f'A coleção de ID {id_colecao} não foi encontrada.',
-        )
-
-    # Buscar o gênero
-    genero = session.scalar(select(Genero).where(Genero.id_genero == id_genero))
-    if not genero:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail=f'O gênero de ID {id_genero} não foi encontrado.',
+async def add_genero_to_colecao(id_colecao: int, id_genero: int, session: SessionPostgres):
+    # O SELECT só produz a linha se a coleção e o gênero existirem, evitando a violação de FK;
+    # uma associação já existente não é inserida (ON CONFLICT DO NOTHING)
+    escrita = (
+        insert(genero_colecao)
+        .from_select(
+            ['id_genero', 'id_colecao'],
+            select(Genero.id_genero, Colecao.id_colecao)
+            .join(Colecao, Colecao.id_colecao == id_colecao)
+            .where(Genero.id_genero == id_genero),
         )
+        .on_conflict_do_nothing()
+    )
+    resultado = await executar_associacao(id_colecao, id_genero, escrita, session)
 
-    # Verificar se a associação já existe
-    if genero in colecao.generos:
+    if not resultado.alterada:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
-            detail=(f'O gênero "{genero.nome}" já está associado à coleção "{colecao.titulo}".'),
+            detail=(f'O gênero "{resultado.nome}" já está associado à coleção "{resultado.titulo}".'),
         )
 
-    # Adicionar o gênero à coleção
-    colecao.generos.append(genero)
-    session.commit()
+    await session.commit()
+    postgres_colecoes_cache.invalidate(id_colecao)
+    postgres_generos_cache.invalidate(id_genero)
 
-    return {'mensagem': (f'Gênero "{genero.nome}" associado à coleção "{colecao.titulo}" com sucesso.')}
+    return {'mensagem': (f'Gênero "{resultado.nome}" associado à coleção "{resultado.titulo}" com sucesso.')}
 
 
 @router.delete(
@@ -244,35 +553,118 @@ def add_genero_to_colecao(id_colecao: int, id_genero: int, session: SessionPostg
     description='Remove um gênero de uma coleção específica.',
     response_model=Mensagem,
 )
-def remove_genero_from_colecao(id_colecao: int, id_genero: int, session: SessionPostgres):
-    # Buscar a coleção
-    colecao = session.scalar(select(Colecao).where(Colecao.id_colecao == id_colecao))
-    if not colecao:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail=f'A coleção de ID {id_colecao} não foi encontrada.',
-        )
+async def remove_genero_from_colecao(id_colecao: int, id_genero: int, session: SessionPostgres):
+    escrita = delete(genero_colecao).where(
+        genero_colecao.c.id_genero == id_genero, genero_colecao.c.id_colecao == id_colecao
+    )
+    resultado = await executar_associacao(id_colecao, id_genero, escrita, session)
 
-    # Buscar o gênero
-    genero = session.scalar(select(Genero).where(Genero.id_genero == id_genero))
-    if not genero:
+    if not resultado.alterada:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
-            detail=f'O gênero de ID {id_genero} não foi encontrado.',
+            detail=(f'O gênero "{resultado.nome}" não está associado à coleção "{resultado.titulo}".'),
         )
 
-    # Verificar se a associação existe
-    if genero not in colecao.generos:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail=(f'O gênero "{genero.nome}" não está associado à coleção "{colecao.titulo}".'),
-        )
+    await session.commit()
+    postgres_colecoes_cache.invalidate(id_colecao)
+    postgres_generos_cache.invalidate(id_genero)
+
+    return {
+        'mensagem': (f'Gênero "{resultado.nome}" desassociado da coleção "{resultado.titulo}" com sucesso.')
+    }
 
-    # Remover o gênero da coleção
-    colecao.generos.remove(genero)
-    session.commit()
 
-    return {'mensagem': (f'Gênero "{genero.nome}" desassociado da coleção "{colecao.titulo}" com sucesso.')}
+@router.post(
+    '/associacoes',
+    summary='Associar gêneros a coleções em lote',
+    description=(
+        'Cria vários pares (coleção, gênero) com um único comando por lote (`BULK_CHUNK_SIZE`). '
+        'Pares já existentes são informados como conflito; coleções ou gêneros inexistentes, como erro.'
+    ),
+    response_model=BulkResult,
+)
+async def add_generos_to_colecoes_bulk(associacoes: list[AssociacaoSchema], session: SessionPostgres):
+    resultados = []
+    criadas = set()
+    for inicio, lote in chunked(associacoes, settings.BULK_CHUNK_SIZE):
+        # Os pares chegam como dois arrays e são desaninhados no servidor, com a posição de cada um
+        pares = (
+            select(
+                func.unnest(
+                    literal([a.id_colecao for a in lote], ARRAY(Integer)),
+                    literal([a.id_genero for a in lote], ARRAY(Integer)),
+                )
+                .table_valued('id_colecao', 'id_genero', with_ordinality='posicao')
+                .render_derived()
+            )
+        ).cte('pares')
+        inseridas = (
+            insert(genero_colecao)
+            .from_select(
+                ['id_genero', 'id_colecao'],
+                select(pares.c.id_genero, pares.c.id_colecao)
+                .distinct()
+                .join(Genero, Genero.id_genero == pares.c.id_genero)
+                .join(Colecao, Colecao.id_colecao == pares.c.id_colecao),
+            )
+            .on_conflict_do_nothing()
+            .returning(genero_colecao.c.id_genero, genero_colecao.c.id_colecao)
+            .cte('inseridas')
+        )
+        linhas = await session.execute(
+            select(
+                pares.c.id_colecao,
+                pares.c.id_genero,
+                inseridas.c.id_genero.is_not(None).label('inserida'),
+                Colecao.id_colecao.is_not(None).label('colecao_existe'),
+                Genero.id_genero.is_not(None).label('genero_existe'),
+            )
+            .select_from(pares)
+            .outerjoin(
+                inseridas,
+                and_(
+                    inseridas.c.id_genero == pares.c.id_genero, inseridas.c.id_colecao == pares.c.id_colecao
+                ),
+            )
+            .outerjoin(Colecao, Colecao.id_colecao == pares.c.id_colecao)
+            .outerjoin(Genero, Genero.id_genero == pares.c.id_genero)
+            .order_by(pares.c.posicao)
+        )
+        await session.commit()
+
+        for indice, linha in enumerate(linhas, start=inicio):
+            par = (linha.id_colecao, linha.id_genero)
+            if not linha.colecao_existe:
+                item = BulkItemResult(
+                    indice=indice,
+                    status=StatusBulkEnum.erro,
+                    detalhe=f'A coleção de ID {linha.id_colecao} não foi encontrada.',
+                )
+            elif not linha.genero_existe:
+                item = BulkItemResult(
+                    indice=indice,
+                    status=StatusBulkEnum.erro,
+                    detalhe=f'O gênero de ID {linha.id_genero} não foi encontrado.',
+                )
+            elif linha.inserida and par not in criadas:
+                # Um par repetido no corpo é inserido uma vez só; as repetições contam como conflito
+                criadas.add(par)
+                item = BulkItemResult(indice=indice, status=StatusBulkEnum.criado)
+            else:
+                item = BulkItemResult(
+                    indice=indice,
+                    status=StatusBulkEnum.conflito,
+                    detalhe=(
+                        f'O gênero de ID {linha.id_genero} já está associado '
+                        f'à coleção de ID {linha.id_colecao}.'
+                    ),
+                )
+            resultados.append(item)
+
+    postgres_colecoes_cache.invalidate(*{id_colecao for id_colecao, _ in criadas})
+    postgres_generos_cache.invalidate(*{id_genero for _, id_genero in criadas})
+
+    return bulk_result(resultados)
 
 
 @router.get(
@@ -281,25 +673,22 @@ def remove_genero_from_colecao(id_colecao: int, id_genero: int, session: Session
     description='Retorna todos os gêneros associados a uma coleção específica.',
     response_model=dict,
 )
-def get_generos_from_colecao(id_colecao: int, session: SessionPostgres):
-    # Buscar a coleção com os gêneros carregados
-    colecao = session.scalar(select(Colecao).where(Colecao.id_colecao == id_colecao))
-    if not colecao:
+async def get_generos_from_colecao(id_colecao: int, session: SessionPostgres):
+    # Buscar a coleção com os IDs dos gêneros; os gêneros vêm do registro em memória
+    linha = (
+        await session.execute(select(*COLECAO_COLUNAS, GENEROS_IDS).where(Colecao.id_colecao == id_colecao))
+    ).one_or_none()
+    if not linha:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=f'A coleção de ID {id_colecao} não foi encontrada.',
         )
 
+    (colecao,) = await colecoes_to_public([linha], session)
+
     return {
         'colecao': {'id_colecao': colecao.id_colecao, 'titulo': colecao.titulo},
-        'generos': [
-            {
-                'id_genero': genero.id_genero,
-                'nome': genero.nome,
-                'surgiu_em': genero.surgiu_em,
-            }
-            for genero in colecao.generos
-        ],
+        'generos': [genero.model_dump() for genero in colecao.generos],
     }
 
 
@@ -309,31 +698,65 @@ def get_generos_from_colecao(id_colecao: int, session: SessionPostgres):
     description='Substitui todos os gêneros de uma coleção pelos IDs fornecidos.',
     response_model=Mensagem,
 )
-def set_generos_to_colecao(id_colecao: int, generos_ids: list[int], session: SessionPostgres):
-    # Buscar a coleção
-    colecao = session.scalar(select(Colecao).where(Colecao.id_colecao == id_colecao))
-    if not colecao:
+async def set_generos_to_colecao(id_colecao: int, generos_ids: list[int], session: SessionPostgres):
+    # IDs repetidos no corpo não mudam o resultado
+    generos_ids = list(dict.fromkeys(generos_ids))
+
+    # Buscar a coleção, travando-a até o commit para que duas substituições simultâneas não se misturem
+    titulo = await session.scalar(
+        select(Colecao.titulo).where(Colecao.id_colecao == id_colecao).with_for_update()
+    )
+    if titulo is None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=f'A coleção de ID {id_colecao} não foi encontrada.',
         )
 
     # Buscar todos os gêneros pelos IDs
-    generos = session.scalars(select(Genero).where(Genero.id_genero.in_(generos_ids))).all()
+    generos = dict(
+        (
+            await session.execute(
+                select(Genero.id_genero, Genero.nome).where(Genero.id_genero.in_(generos_ids))
+            )
+        )
+        .tuples()
+        .all()
+    )
 
     # Verificar se todos os gêneros foram encontrados
-    if len(generos) != len(generos_ids):
-        generos_encontrados = [g.id_genero for g in generos]
-        generos_nao_encontrados = [id for id in generos_ids if id not in generos_encontrados]
+    generos_nao_encontrados = [id_genero for id_genero in generos_ids if id_genero not in generos]
+    if generos_nao_encontrados:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail=f'Gêneros não encontrados: {generos_nao_encontrados}',
         )
 
-    # Substituir todos os gêneros da coleção
-    colecao.generos.clear()
-    colecao.generos.extend(generos)
-    session.commit()
+    # Aplicar só a diferença entre as associações atuais e as pedidas
+    atuais = set(
+        await session.scalars(
+            select(genero_colecao.c.id_genero).where(genero_colecao.c.id_colecao == id_colecao)
+        )
+    )
+    removidos = atuais.difference(generos_ids)
+    adicionados = [id_genero for id_genero in generos_ids if id_genero not in atuais]
+
+    if removidos:
+        await session.execute(
+            delete(genero_colecao).where(
+                genero_colecao.c.id_colecao == id_colecao, genero_colecao.c.id_genero.in_(removidos)
+            )
+        )
+    if adicionados:
+        await session.execute(
+            insert(genero_colecao).values([
+                {'id_genero': id_genero, 'id_colecao': id_colecao} for id_genero in adicionados
+            ])
+        )
+    await session.commit()
+
+    if removidos or adicionados:
+        postgres_colecoes_cache.invalidate(id_colecao)
+        postgres_generos_cache.invalidate(*removidos, *adicionados)
 
-    generos_nomes = [g.nome for g in generos]
-    return {'mensagem': (f'Gêneros da coleção "{colecao.titulo}" definidos como: {", ".join(generos_nomes)}')}
+    generos_nomes = [generos[id_genero] for id_genero in generos_ids]
+    return {'mensagem': (f'Gêneros da coleção "{titulo}" definidos como: {", ".join(generos_nomes)}')}
@@ -0,0 +1,136 @@
+from datetime import UTC, datetime
+from http import HTTPStatus
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from rato_player.databases.mongo import get_mongo
+from rato_player.estatisticas import atualizar_estatisticas_mongo
+from rato_player.registro import buscar_generos_mongo, mongo_generos_registro
+from rato_player.schemas import EstatisticaItem, Estatisticas, Mensagem
+
+router = APIRouter(prefix='/mongo/estatisticas', tags=['Estatísticas - MongoDB'])
+
+MongoDatabase = Annotated[AsyncIOMotorDatabase, Depends(get_mongo)]
+
+
+async def ler_estatisticas(db, agrupamento: str, por_quantidade: bool = True) -> Estatisticas:
+    """Lê o resumo do agrupamento (`estatisticas_{agrupamento}`), com a data e a idade da sua atualização."""
+    atualizacao = await db.estatisticas_atualizacao.find_one({'_id': agrupamento})
+    if atualizacao is None:
+        return Estatisticas(itens=[])
+
+    ordem = [('colecoes', -1), ('_id', 1)] if por_quantidade else [('_id', 1)]
+    resumos = await db[f'estatisticas_{agrupamento}'].find().sort(ordem).to_list(length=None)
+
+    nomes = {}
+    if agrupamento == 'generos':
+        nomes = await mongo_generos_registro.resolver(
+            (resumo['_id'] for resumo in resumos), lambda ids: buscar_generos_mongo(db, ids)
+        )
+
+    # O MongoDB devolve as datas em UTC, sem fuso
+    atualizada_em = atualizacao['atualizada_em'].replace(tzinfo=UTC)
+    return Estatisticas(
+        atualizada_em=atualizada_em,
+        idade=(datetime.now(UTC) - atualizada_em).total_seconds(),
+        itens=[
+            EstatisticaItem(
+                valor=resumo['_id'],
+                nome=nomes[resumo['_id']].nome if resumo['_id'] in nomes else None,
+                colecoes=resumo['colecoes'],
+                duracao_total=resumo['duracao_total'],
+                duracao_media=resumo['duracao_media'],
+            )
+            for resumo in resumos
+        ],
+    )
+
+
+@router.get(
+    '/generos',
+    summary='Estatísticas por gênero',
+    description="""
+    Quantidade de coleções e duração total e média de cada gênero, da mais à menos
+    numerosa, lidas da coleção de resumo `estatisticas_generos`.
+
+    `atualizada_em` e `idade` (em segundos) informam quão desatualizados estão os números.
+    """,
+    response_model=Estatisticas,
+)
+async def read_estatisticas_generos(db: MongoDatabase):
+    try:
+        return await ler_estatisticas(db, 'generos')
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail=f'Erro interno: {str(e)}',
+        )
+
+
+@router.get(
+    '/tipos',
+    summary='Estatísticas por tipo de coleção',
+    description="""
+    Quantidade de coleções e duração total e média de cada tipo, lidas da coleção de
+    resumo `estatisticas_tipos`, com `atualizada_em` e `idade` (em segundos).
+    """,
+    response_model=Estatisticas,
+)
+async def read_estatisticas_tipos(db: MongoDatabase):
+    try:
+        return await ler_estatisticas(db, 'tipos')
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail=f'Erro interno: {str(e)}',
+        )
+
+
+@router.get(
+    '/anos',
+    summary='Estatísticas por ano de lançamento',
+    description="""
+    Quantidade de coleções e duração total e média de cada ano de lançamento, em ordem
+    cronológica, lidas da coleção de resumo `estatisticas_anos`, com `atualizada_em` e
+    `idade` (em segundos).
+    """,
+    response_model=Estatisticas,
+)
+async def read_estatisticas_anos(db: MongoDatabase):
+    try:
+        return await ler_estatisticas(db, 'anos', por_quantidade=False)
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail=f'Erro interno: {str(e)}',
+        )
+
+
+@router.post(
+    '/atualizar',
+    summary='Atualizar as estatísticas',
+    description="""
+    Recalcula os resumos agora (agregações com `$merge`), sem esperar a próxima
+    atualização periódica (`ESTATISTICAS_INTERVALO`). Responde 409 se outro processo
+    estiver atualizando.
+    """,
+    response_model=Mensagem,
+)
+async def atualizar_estatisticas(db: MongoDatabase):
+    try:
+        if not await atualizar_estatisticas_mongo(db, forcar=True):
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail='As estatísticas já estão sendo atualizadas por outro processo.',
+            )
+
+        return Mensagem(mensagem='Estatísticas atualizadas com sucesso.')
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail=f'Erro interno: {str(e)}',
+        )
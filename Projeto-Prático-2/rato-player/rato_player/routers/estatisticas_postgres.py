@@ -0,0 +1,121 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from rato_player.databases.postgres import get_postgres
+from rato_player.estatisticas import VISOES_POSTGRES, atualizar_estatisticas_postgres
+from rato_player.models import estatisticas_atualizacao
+from rato_player.registro import buscar_generos_postgres, postgres_generos_registro
+from rato_player.schemas import EstatisticaItem, Estatisticas, Mensagem
+
+router = APIRouter(prefix='/postgres/estatisticas', tags=['Estatísticas - Postgres'])
+
+SessionPostgres = Annotated[AsyncSession, Depends(get_postgres)]
+
+
+async def ler_estatisticas(session, agrupamento: str, por_quantidade: bool = True) -> Estatisticas:
+    """Lê a visão materializada do agrupamento, com a data e a idade da sua última atualização."""
+    visao = VISOES_POSTGRES[agrupamento]
+    chave = visao.c[0]
+
+    # A idade é calculada pelo relógio do banco, o mesmo que gravou `atualizada_em`; o LEFT JOIN
+    # traz a linha da atualização mesmo com a visão vazia
+    atualizacao = (
+        select(
+            estatisticas_atualizacao.c.atualizada_em,
+            func.extract('epoch', func.now() - estatisticas_atualizacao.c.atualizada_em).label('idade'),
+        )
+        .where(estatisticas_atualizacao.c.visao == visao.name)
+        .subquery('atualizacao')
+    )
+    ordem = (visao.c.colecoes.desc(), chave) if por_quantidade else (chave,)
+    linhas = (
+        await session.execute(
+            select(atualizacao, chave.label('valor'), *visao.c[1:])
+            .select_from(atualizacao.outerjoin(visao, true()))
+            .order_by(*ordem)
+        )
+    ).all()
+    if not linhas:
+        return Estatisticas(itens=[])
+
+    itens = [linha for linha in linhas if linha.colecoes is not None]
+    nomes = {}
+    if agrupamento == 'generos':
+        nomes = await postgres_generos_registro.resolver(
+            (linha.valor for linha in itens), lambda ids: buscar_generos_postgres(session, ids)
+        )
+
+    return Estatisticas(
+        atualizada_em=linhas[0].atualizada_em,
+        idade=float(linhas[0].idade),
+        itens=[
+            EstatisticaItem(
+                valor=linha.valor,
+                nome=nomes[linha.valor].nome if linha.valor in nomes else None,
+                colecoes=linha.colecoes,
+                duracao_total=linha.duracao_total,
+                duracao_media=linha.duracao_media,
+            )
+            for linha in itens
+        ],
+    )
+
+
+@router.get(
+    '/generos',
+    summary='Estatísticas por gênero',
+    description="""
+    Quantidade de coleções e duração total e média de cada gênero, da mais à menos
+    numerosa, lidas da visão materializada `estatisticas_genero`.
+
+    `atualizada_em` e `idade` (em segundos) informam quão desatualizados estão os números.
+    """,
+    response_model=Estatisticas,
+)
+async def read_estatisticas_generos(session: SessionPostgres):
+    return await ler_estatisticas(session, 'generos')
+
+
+@router.get(
+    '/tipos',
+    summary='Estatísticas por tipo de coleção',
+    description="""
+    Quantidade de coleções e duração total e média de cada tipo, lidas da visão
+    materializada `estatisticas_tipo`, com `atualizada_em` e `idade` (em segundos).
+    """,
+    response_model=Estatisticas,
+)
+async def read_estatisticas_tipos(session: SessionPostgres):
+    return await ler_estatisticas(session, 'tipos')
+
+
+@router.get(
+    '/anos',
+    summary='Estatísticas por ano de lançamento',
+    description="""
+    Quantidade de coleções e duração total e média de cada ano de lançamento, em ordem
+    cronológica, lidas da visão materializada `estatisticas_ano`, com `atualizada_em` e
+    `idade` (em segundos).
+    """,
+    response_model=Estatisticas,
+)
+async def read_estatisticas_anos(session: SessionPostgres):
+    return await ler_estatisticas(session, 'anos', por_quantidade=False)
+
+
+@router.post(
+    '/atualizar',
+    summary='Atualizar as estatísticas',
+    description="""
+    Atualiza as visões materializadas agora (`REFRESH MATERIALIZED VIEW CONCURRENTLY`),
+    sem esperar a próxima atualização periódica (`ESTATISTICAS_INTERVALO`). Se outro
+    processo estiver atualizando, espera que ele termine.
+    """,
+    response_model=Mensagem,
+)
+async def atualizar_estatisticas():
+    await atualizar_estatisticas_postgres(forcar=True)
+    return Mensagem(mensagem='Estatísticas atualizadas com sucesso.')
@@ -2,12 +2,27 @@ from http import HTTPStatus
 from typing import Annotated
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
-
-from rato_player.databases.mongo import get_mongo
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from rato_player.bulk import bulk_result, chunked, mongo_insert_chunk
+from rato_player.busca import filtro_texto_mongo, resolver_prefixo_mongo
+from rato_player.cache import contem_genero, mongo_colecoes_cache, mongo_generos_cache
+from rato_player.databases.mongo import get_mongo, mongo_state
+from rato_player.embutidos import propagacao
+from rato_player.enums import ModoBuscaEnum, StatusBulkEnum
+from rato_player.etag import IfNoneMatch, conditional_response, json_response, represent
+from rato_player.export import mongo_batches, ndjson, ndjson_response
+from rato_player.pagination import mongo_page_stages, mongo_rank_stages, next_cursor
+from rato_player.registro import mongo_generos_registro
 from rato_player.schemas import (
+    BulkResult,
     FilterPage,
+    GeneroBasic,
+    GeneroExport,
     GeneroList,
     GeneroPublic,
     GeneroSchema,
@@ -16,10 +31,13 @@ from rato_player.schemas import (
     GeneroWithColecoes,
     Mensagem,
 )
+from rato_player.settings import Settings
+
+settings = Settings()
 
 router = APIRouter(prefix='/mongo/generos', tags=['Gêneros - MongoDB'])
 
-MongoDatabase = Annotated[AsyncIOMotorDatabase, HTTPException]
+MongoDatabase = Annotated[AsyncIOMotorDatabase, Depends(get_mongo)]
 Pagination = Annotated[FilterPage, Query()]
 
 
@@ -33,40 +51,166 @@ def validate_object_id(obj_id: str) -> ObjectId:
     return ObjectId(obj_id)
 
 
+def nome_em_uso(erro: DuplicateKeyError) -> HTTPException:
+    """Converte o DuplicateKeyError de uma escrita em 409, com o valor repetido informado pelo servidor."""
+    valores = (erro.details or {}).get('keyValue') or {}
+    if 'nome' in valores:
+        detail = f'O nome "{valores["nome"]}" já está em uso.'
+    else:
+        detail = f'Os valores {valores} já estão em uso.' if valores else 'O gênero viola um índice único.'
+    return HTTPException(status_code=HTTPStatus.CONFLICT, detail=detail)
+
+
+async def conferir_nome(db, nome: str, obj_id: ObjectId | None = None):
+    """Sem o índice único de `nome` (ver `garantir_indices`), rejeita com 409 um nome de outro gênero.
+
+    Com o índice, não consulta nada: a escrita é rejeitada pelo próprio MongoDB (DuplicateKeyError).
+    """
+    if mongo_state['indices']:
+        return
+    filtro = {'nome': nome} if obj_id is None else {'nome': nome, '_id': {'$ne': obj_id}}
+    if await db.generos.find_one(filtro, {'_id': 1}):
+        raise HTTPException(status_code=HTTPStatus.CONFLICT, detail=f'O nome "{nome}" já está em uso.')
+
+
+def invalidar_genero(id_genero: str):
+    """Remove do cache o gênero e as coleções que o exibem."""
+    mongo_generos_cache.invalidate(id_genero)
+    mongo_colecoes_cache.invalidate_where(contem_genero(id_genero))
+
+
+def generos_pipeline(filter_query: dict, page_stages: list[dict] = ()) -> list[dict]:
+    """Monta a agregação de uma página de gêneros com as suas coleções, em um único $lookup.
+
+    Cada gênero traz no máximo MAX_COLECOES_POR_GENERO coleções, para que um gênero popular
+    não infle a resposta. O $lookup com `localField`/`foreignField` e `pipeline` exige MongoDB 5.0+.
+    """
+    return [
+        {'$match': filter_query},
+        *page_stages,
+        {'$addFields': {'id_str': {'$toString': '$_id'}}},
+        {
+            '$lookup': {
+                'from': 'colecoes',
+                'localField': 'id_str',
+                'foreignField': 'generos_ids',
+                'pipeline': [
+                    # Ordem por `_id`, como nas listagens: as coleções exibidas não variam entre chamadas
+                    {'$sort': {'_id': 1}},
+                    {'$limit': settings.MAX_COLECOES_POR_GENERO},
+                    {'$project': {'generos_ids': 0, 'generos': 0}},
+                ],
+                'as': 'colecoes',
+            }
+        },
+    ]
+
+
+def genero_to_public(genero: dict) -> GeneroPublic:
+    """Converte um documento resultante de `generos_pipeline` em GeneroPublic."""
+    return GeneroPublic(
+        id_genero=str(genero['_id']),
+        nome=genero['nome'],
+        surgiu_em=genero['surgiu_em'],
+        colecoes=[
+            {
+                'id_colecao': str(colecao['_id']),
+                'titulo': colecao['titulo'],
+                'tipo': colecao['tipo'],
+                'duracao': colecao['duracao'],
+                'caminho_capa': colecao['caminho_capa'],
+                'data_lancamento': colecao['data_lancamento'],
+            }
+            for colecao in genero.get('colecoes', [])
+        ],
+    )
+
+
+async def propagar_genero(db, obj_id: ObjectId, update_data: dict):
+    """Copia os campos alterados do gênero para os snapshots embutidos nas coleções, em um único
+    `update_many` (no modo MONGODB_GENEROS_EMBUTIDOS).
+    """
+    if settings.MONGODB_GENEROS_EMBUTIDOS and (campos := propagacao(update_data)):
+        # O filtro por `generos_ids` usa o índice; o filtro de array altera só o snapshot deste gênero
+        await db.colecoes.update_many(
+            {'generos_ids': str(obj_id)}, {'$set': campos}, array_filters=[{'g._id': obj_id}]
+        )
+
+
+def atualizar_registro(genero: GeneroPublic) -> GeneroPublic:
+    """Grava o gênero criado ou alterado no registro em memória e o devolve."""
+    mongo_generos_registro.atualizar(
+        GeneroBasic(id_genero=genero.id_genero, nome=genero.nome, surgiu_em=genero.surgiu_em)
+    )
+    return genero
+
+
 @router.post(
     '/',
     status_code=HTTPStatus.CREATED,
     summary='Criar um novo gênero',
     response_model=GeneroPublic,
 )
-async def create_genero(genero_schema: GeneroSchema):
+async def create_genero(genero_schema: GeneroSchema, db: MongoDatabase):
     try:
-        db = await get_mongo()
-        collection = db.generos
-
-        # Verifica se já existe um gênero com o mesmo nome
-        existing = await collection.find_one({'nome': genero_schema.nome})
-        if existing:
-            raise HTTPException(
-                status_code=HTTPStatus.CONFLICT,
-                detail=f'O nome "{genero_schema.nome}" já está em uso.',
-            )
-
-        # Converte para dict e insere
+        # Converte para dict e insere; o `_id` gerado é preenchido no próprio dict
         genero_dict = genero_schema.model_dump()
         genero_dict['surgiu_em'] = genero_dict['surgiu_em'].isoformat()
 
-        result = await collection.insert_one(genero_dict)
+        await conferir_nome(db, genero_dict['nome'])
+        await db.generos.insert_one(genero_dict)
 
-        # Busca o documento inserido
-        created_genero = await collection.find_one({'_id': result.inserted_id})
-
-        return GeneroPublic(
-            id_genero=str(created_genero['_id']),
-            nome=created_genero['nome'],
-            surgiu_em=created_genero['surgiu_em'],
-            colecoes=[],
+        return atualizar_registro(genero_to_public(genero_dict))
+    except DuplicateKeyError as e:
+        # O índice único de `nome` (garantido por `get_mongo`) rejeita nomes repetidos
+        raise nome_em_uso(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail=f'Erro interno: {str(e)}',
         )
+
+
+@router.post(
+    '/bulk',
+    summary='Criar gêneros em lote',
+    description=(
+        'Cria vários gêneros com `insert_many(ordered=False)` por lote (`BULK_CHUNK_SIZE`). '
+        'Nomes já em uso (ou repetidos na requisição) são reportados como conflito, sem abortar o lote. '
+        'Enquanto o índice único de `nome` não puder ser criado, responde 503.'
+    ),
+    response_model=BulkResult,
+)
+async def create_generos_bulk(generos_schema: list[GeneroSchema], db: MongoDatabase):
+    try:
+        # Os conflitos do lote vêm do índice único; sem ele, `insert_many` aceitaria nomes repetidos
+        if not mongo_state['indices']:
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='O índice único de nomes do MongoDB não existe; crie os gêneros um a um.',
+            )
+        resultados = []
+        for inicio, lote in chunked(generos_schema, settings.BULK_CHUNK_SIZE):
+            # `mode='json'` já converte as datas para ISO, como em create_genero
+            documentos = [genero.model_dump(mode='json') for genero in lote]
+            resultados_lote = await mongo_insert_chunk(
+                db.generos,
+                documentos,
+                inicio,
+                lambda documento: f'O nome "{documento["nome"]}" já está em uso.',
+            )
+            mongo_generos_registro.atualizar(
+                *(
+                    GeneroBasic(id_genero=item.id, **lote[item.indice - inicio].model_dump())
+                    for item in resultados_lote
+                    if item.status == StatusBulkEnum.criado
+                )
+            )
+            resultados.extend(resultados_lote)
+
+        return bulk_result(resultados)
     except HTTPException:
         raise
     except Exception as e:
@@ -82,42 +226,21 @@ async def create_genero(genero_schema: GeneroSchema):
     description='Retorna todos os gêneros cadastrados no MongoDB (com suporte a paginação).',
     response_model=GeneroList,
 )
-async def read_generos(pagination: Pagination):
+async def read_generos(pagination: Pagination, db: MongoDatabase, if_none_match: IfNoneMatch = None):
     """Lista todos os gêneros com suporte a paginação."""
     try:
-        db = await get_mongo()
-        collection = db.generos
-
-        cursor = collection.find().skip(pagination.offset).limit(pagination.limit)
+        cursor = db.generos.aggregate(generos_pipeline({}, mongo_page_stages(pagination)))
         generos = await cursor.to_list(length=pagination.limit)
 
-        generos_response = []
-        for genero in generos:
-            # Buscar coleções associadas a este gênero
-            colecoes_cursor = db.colecoes.find({'generos_ids': str(genero['_id'])})
-            colecoes = await colecoes_cursor.to_list(length=None)
-
-            colecoes_data = []
-            for colecao in colecoes:
-                colecoes_data.append({
-                    'id_colecao': str(colecao['_id']),
-                    'titulo': colecao['titulo'],
-                    'tipo': colecao['tipo'],
-                    'duracao': colecao['duracao'],
-                    'caminho_capa': colecao['caminho_capa'],
-                    'data_lancamento': colecao['data_lancamento'],
-                })
-
-            generos_response.append(
-                GeneroPublic(
-                    id_genero=str(genero['_id']),
-                    nome=genero['nome'],
-                    surgiu_em=genero['surgiu_em'],
-                    colecoes=colecoes_data,
-                )
-            )
-
-        return GeneroList(generos=generos_response)
+        return json_response(
+            GeneroList(
+                generos=[genero_to_public(genero) for genero in generos],
+                next_cursor=next_cursor([str(genero['_id']) for genero in generos], pagination),
+            ),
+            if_none_match,
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -133,22 +256,27 @@ async def read_generos(pagination: Pagination):
     com suporte a paginação. Também é possível filtrar opcionalmente pelo
     período de data de surgimento.
 
+    O `modo` define como o nome é comparado: `contem` (padrão, substring),
+    `prefixo` (início do nome, ignorando acentos e maiúsculas) ou
+    `relevancia` (índice de texto, por palavras, da maior à menor pontuação;
+    paginação apenas por `offset`).
+
     Exemplos:
     - `/generos/buscar?nome=rock`
+    - `/generos/buscar?nome=forro&modo=prefixo`
     - `/generos/buscar?nome=rock&data_inicio=2020-01-01&data_fim=2022-12-31`
     """,
     response_model=GeneroList,
 )
-async def search_generos(filters: Annotated[GeneroSearchFilters, Query()]):
+async def search_generos(
+    filters: Annotated[GeneroSearchFilters, Query()], db: MongoDatabase, if_none_match: IfNoneMatch = None
+):
     try:
-        db = await get_mongo()
-        collection = db.generos
-
         # Constrói o filtro de busca
         filter_query = {}
 
         if filters.nome:
-            filter_query['nome'] = {'$regex': filters.nome, '$options': 'i'}
+            filter_query.update(filtro_texto_mongo('nome', filters.nome, filters.modo))
 
         if filters.data_inicio and filters.data_fim:
             filter_query['surgiu_em'] = {
@@ -160,36 +288,29 @@ async def search_generos(filters: Annotated[GeneroSearchFilters, Query()]):
         elif filters.data_fim:
             filter_query['surgiu_em'] = {'$lte': filters.data_fim.isoformat()}
 
-        cursor = collection.find(filter_query).skip(filters.offset).limit(filters.limit)
-        generos = await cursor.to_list(length=filters.limit)
+        modo = filters.modo if filters.nome else ModoBuscaEnum.contem
+        if modo == ModoBuscaEnum.relevancia:
+            page_stages = mongo_rank_stages(filters)
+        else:
+            page_stages = mongo_page_stages(filters)
+            if modo == ModoBuscaEnum.prefixo:
+                filter_query = await resolver_prefixo_mongo(db.generos, filter_query, page_stages)
+                page_stages = [{'$sort': {'_id': 1}}]
 
-        generos_response = []
-        for genero in generos:
-            # Buscar coleções associadas a este gênero
-            colecoes_cursor = db.colecoes.find({'generos_ids': str(genero['_id'])})
-            colecoes = await colecoes_cursor.to_list(length=None)
-
-            colecoes_data = []
-            for colecao in colecoes:
-                colecoes_data.append({
-                    'id_colecao': str(colecao['_id']),
-                    'titulo': colecao['titulo'],
-                    'tipo': colecao['tipo'],
-                    'duracao': colecao['duracao'],
-                    'caminho_capa': colecao['caminho_capa'],
-                    'data_lancamento': colecao['data_lancamento'],
-                })
-
-            generos_response.append(
-                GeneroPublic(
-                    id_genero=str(genero['_id']),
-                    nome=genero['nome'],
-                    surgiu_em=genero['surgiu_em'],
-                    colecoes=colecoes_data,
-                )
-            )
+        cursor = db.generos.aggregate(generos_pipeline(filter_query, page_stages))
+        generos = await cursor.to_list(length=filters.limit)
 
-        return GeneroList(generos=generos_response)
+        return json_response(
+            GeneroList(
+                generos=[genero_to_public(genero) for genero in generos],
+                next_cursor=None
+                if modo == ModoBuscaEnum.relevancia
+                else next_cursor([str(genero['_id']) for genero in generos], filters),
+            ),
+            if_none_match,
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -197,48 +318,60 @@ async def search_generos(filters: Annotated[GeneroSearchFilters, Query()]):
         )
 
 
+async def exportar_generos(db):
+    """Percorre todos os gêneros com um cursor, produzindo um lote de NDJSON por `batch_size` documentos."""
+    cursor = db.generos.find(
+        {},
+        {'nome': 1, 'surgiu_em': 1},
+        sort=[('_id', 1)],
+        batch_size=settings.EXPORT_BATCH_SIZE,
+    )
+    async for documentos in mongo_batches(cursor, settings.EXPORT_BATCH_SIZE):
+        yield ndjson(
+            GeneroExport.model_construct(id_genero=str(documento.pop('_id')), **documento)
+            for documento in documentos
+        )
+
+
+@router.get(
+    '/export',
+    summary='Exportar todos os gêneros (NDJSON)',
+    description=(
+        'Retorna todos os gêneros, um por linha (`application/x-ndjson`). As associações com coleções '
+        'estão na exportação de coleções (`generos_ids`).'
+    ),
+    response_class=StreamingResponse,
+)
+async def export_generos(db: MongoDatabase):
+    return ndjson_response(exportar_generos(db))
+
+
 @router.get(
     '/{id_genero}',
     summary='Buscar gênero por ID',
     description='Retorna um gênero específico pelo seu identificador único.',
     response_model=GeneroPublic,
 )
-async def read_genero_by_id(id_genero: str):
+async def read_genero_by_id(id_genero: str, db: MongoDatabase, if_none_match: IfNoneMatch = None):
     try:
         obj_id = validate_object_id(id_genero)
 
-        db = await get_mongo()
-        generos_collection = db.generos
-        colecoes_collection = db.colecoes
+        representation = mongo_generos_cache.get(str(obj_id))
+        if representation is not None:
+            return conditional_response(representation, if_none_match)
 
-        genero = await generos_collection.find_one({'_id': obj_id})
-        if not genero:
+        versao = mongo_generos_cache.versao
+        generos = await db.generos.aggregate(generos_pipeline({'_id': obj_id})).to_list(length=1)
+        if not generos:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f'O gênero de ID {id_genero} não foi encontrado.',
             )
 
-        # Buscar coleções associadas a este gênero
-        colecoes_cursor = colecoes_collection.find({'generos_ids': id_genero})
-        colecoes = await colecoes_cursor.to_list(length=None)
+        representation = represent(genero_to_public(generos[0]))
+        mongo_generos_cache.set(str(obj_id), representation, versao)
 
-        colecoes_data = []
-        for colecao in colecoes:
-            colecoes_data.append({
-                'id_colecao': str(colecao['_id']),
-                'titulo': colecao['titulo'],
-                'tipo': colecao['tipo'],
-                'duracao': colecao['duracao'],
-                'caminho_capa': colecao['caminho_capa'],
-                'data_lancamento': colecao['data_lancamento'],
-            })
-
-        return GeneroPublic(
-            id_genero=str(genero['_id']),
-            nome=genero['nome'],
-            surgiu_em=genero['surgiu_em'],
-            colecoes=colecoes_data,
-        )
+        return conditional_response(representation, if_none_match)
     except HTTPException:
         raise
     except Exception as e:
@@ -254,45 +387,30 @@ async def read_genero_by_id(id_genero: str):
     description='Substitui todos os campos do gênero especificado pelo corpo enviado.',
     response_model=GeneroPublic,
 )
-async def update_genero(id_genero: str, genero_schema: GeneroSchema):
+async def update_genero(id_genero: str, genero_schema: GeneroSchema, db: MongoDatabase):
     try:
         obj_id = validate_object_id(id_genero)
 
-        db = await get_mongo()
-        collection = db.generos
+        update_data = genero_schema.model_dump()
+        update_data['surgiu_em'] = update_data['surgiu_em'].isoformat()
 
-        # Verifica se o gênero existe
-        genero = await collection.find_one({'_id': obj_id})
-        if not genero:
+        await conferir_nome(db, update_data['nome'], obj_id)
+        # Atualiza e devolve o documento já alterado em uma única operação; um nome em uso
+        # por outro gênero é rejeitado pelo índice único (DuplicateKeyError)
+        updated_genero = await db.generos.find_one_and_update(
+            {'_id': obj_id}, {'$set': update_data}, return_document=ReturnDocument.AFTER
+        )
+        if not updated_genero:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f'O gênero de ID {id_genero} não foi encontrado.',
             )
+        await propagar_genero(db, obj_id, update_data)
+        invalidar_genero(str(obj_id))
 
-        # Verifica se o novo nome não está em uso por outro gênero
-        if genero_schema.nome != genero['nome']:
-            existing = await collection.find_one({'nome': genero_schema.nome})
-            if existing:
-                raise HTTPException(
-                    status_code=HTTPStatus.CONFLICT,
-                    detail=f'O nome "{genero_schema.nome}" já está em uso.',
-                )
-
-        # Atualiza o documento
-        update_data = genero_schema.model_dump()
-        update_data['surgiu_em'] = update_data['surgiu_em'].isoformat()
-
-        await collection.update_one({'_id': obj_id}, {'$set': update_data})
-
-        # Busca o documento atualizado
-        updated_genero = await collection.find_one({'_id': obj_id})
-
-        return GeneroPublic(
-            id_genero=str(updated_genero['_id']),
-            nome=updated_genero['nome'],
-            surgiu_em=updated_genero['surgiu_em'],
-            colecoes=[],
-        )
+        return atualizar_registro(genero_to_public(updated_genero))
+    except DuplicateKeyError as e:
+        raise nome_em_uso(e)
     except HTTPException:
         raise
     except Exception as e:
@@ -308,58 +426,42 @@ async def update_genero(id_genero: str, genero_schema: GeneroSchema):
     description='Atualiza apenas os campos enviados no corpo da requisição.',
     response_model=GeneroPublic,
 )
-async def patch_genero(id_genero: str, genero_schema: GeneroUpdateSchema):
+async def patch_genero(id_genero: str, genero_schema: GeneroUpdateSchema, db: MongoDatabase):
     try:
         obj_id = validate_object_id(id_genero)
 
-        db = await get_mongo()
-        collection = db.generos
-
-        # Verifica se o gênero existe
-        genero = await collection.find_one({'_id': obj_id})
-        if not genero:
-            raise HTTPException(
-                status_code=HTTPStatus.NOT_FOUND,
-                detail=f'O gênero de ID {id_genero} não foi encontrado.',
-            )
-
         # Prepara dados para atualização (apenas campos não nulos)
         update_data = genero_schema.model_dump(exclude_unset=True)
 
-        if not update_data:
-            # Se não há dados para atualizar, retorna o gênero atual
-            return GeneroPublic(
-                id_genero=str(genero['_id']),
-                nome=genero['nome'],
-                surgiu_em=genero['surgiu_em'],
-                colecoes=[],
-            )
-
-        # Verifica conflito de nome se estiver sendo atualizado
-        if 'nome' in update_data and update_data['nome'] != genero['nome']:
-            existing = await collection.find_one({'nome': update_data['nome']})
-            if existing:
-                raise HTTPException(
-                    status_code=HTTPStatus.CONFLICT,
-                    detail=f'O nome "{update_data["nome"]}" já está em uso.',
-                )
-
         # Converte data se presente
         if 'surgiu_em' in update_data:
             update_data['surgiu_em'] = update_data['surgiu_em'].isoformat()
 
-        # Atualiza o documento
-        await collection.update_one({'_id': obj_id}, {'$set': update_data})
+        if 'nome' in update_data:
+            await conferir_nome(db, update_data['nome'], obj_id)
 
-        # Busca o documento atualizado
-        updated_genero = await collection.find_one({'_id': obj_id})
+        if update_data:
+            # Atualiza e devolve o documento já alterado em uma única operação
+            genero = await db.generos.find_one_and_update(
+                {'_id': obj_id}, {'$set': update_data}, return_document=ReturnDocument.AFTER
+            )
+        else:
+            # Se não há dados para atualizar, retorna o gênero atual
+            genero = await db.generos.find_one({'_id': obj_id})
 
-        return GeneroPublic(
-            id_genero=str(updated_genero['_id']),
-            nome=updated_genero['nome'],
-            surgiu_em=updated_genero['surgiu_em'],
-            colecoes=[],
-        )
+        if not genero:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail=f'O gênero de ID {id_genero} não foi encontrado.',
+            )
+        if update_data:
+            await propagar_genero(db, obj_id, update_data)
+            invalidar_genero(str(obj_id))
+            return atualizar_registro(genero_to_public(genero))
+
+        return genero_to_public(genero)
+    except DuplicateKeyError as e:
+        raise nome_em_uso(e)
     except HTTPException:
         raise
     except Exception as e:
@@ -375,29 +477,24 @@ async def patch_genero(id_genero: str, genero_schema: GeneroUpdateSchema):
     description='Remove um gênero pelo seu identificador único.',
     response_model=Mensagem,
 )
-async def delete_genero(id_genero: str):
+async def delete_genero(id_genero: str, db: MongoDatabase):
     try:
         obj_id = validate_object_id(id_genero)
 
-        db = await get_mongo()
-        generos_collection = db.generos
-        colecoes_collection = db.colecoes
-
-        # Verifica se o gênero existe
-        genero = await generos_collection.find_one({'_id': obj_id})
-        if not genero:
+        # Remove o gênero; `deleted_count` dispensa a consulta prévia de existência
+        result = await db.generos.delete_one({'_id': obj_id})
+        if not result.deleted_count:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f'O gênero de ID {id_genero} não foi encontrado.',
             )
 
-        # Remove o gênero de todas as coleções que o referenciam
-        await colecoes_collection.update_many(
-            {'generos_ids': id_genero}, {'$pull': {'generos_ids': id_genero}}
+        # Remove o gênero (e o seu snapshot) de todas as coleções que o referenciam
+        await db.colecoes.update_many(
+            {'generos_ids': id_genero}, {'$pull': {'generos_ids': id_genero, 'generos': {'_id': obj_id}}}
         )
-
-        # Remove o gênero
-        await generos_collection.delete_one({'_id': obj_id})
+        invalidar_genero(str(obj_id))
+        mongo_generos_registro.remover(str(obj_id))
 
         return Mensagem(mensagem='Gênero deletado com sucesso.')
     except HTTPException:
@@ -415,11 +512,10 @@ async def delete_genero(id_genero: str):
     description='Retorna todas as coleções associadas a um gênero específico.',
     response_model=GeneroWithColecoes,
 )
-async def get_colecoes_from_genero(id_genero: str):
+async def get_colecoes_from_genero(id_genero: str, db: MongoDatabase):
     try:
         obj_id = validate_object_id(id_genero)
 
-        db = await get_mongo()
         generos_collection = db.generos
         colecoes_collection = db.colecoes
 
@@ -1,14 +1,31 @@
 from http import HTTPStatus
+from operator import attrgetter
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, select
-from sqlalchemy.orm import Session
-
-from rato_player.databases.postgres import get_postgres
-from rato_player.models import Genero
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, delete, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from rato_player.bulk import bulk_result, chunked, postgres_insert_chunk
+from rato_player.busca import filtro_texto_postgres, ordem_relevancia_postgres
+from rato_player.cache import contem_genero, postgres_colecoes_cache, postgres_generos_cache
+from rato_player.databases.postgres import get_postgres, open_postgres
+from rato_player.enums import ModoBuscaEnum, StatusBulkEnum
+from rato_player.etag import IfNoneMatch, conditional_response, json_response, represent
+from rato_player.export import ndjson, ndjson_response
+from rato_player.models import Colecao, Genero, genero_colecao
+from rato_player.pagination import next_cursor, paginate, paginate_by_rank
+from rato_player.registro import postgres_generos_registro
 from rato_player.schemas import (
+    BulkItemResult,
+    BulkResult,
     FilterPage,
+    GeneroBasic,
+    GeneroExport,
     GeneroList,
     GeneroPublic,
     GeneroSchema,
@@ -17,12 +34,61 @@ from rato_player.schemas import (
     GeneroWithColecoes,
     Mensagem,
 )
+from rato_player.settings import Settings
+
+settings = Settings()
 
 router = APIRouter(prefix='/postgres/generos', tags=['Gêneros - Postgres'])
 
-SessionPostgres = Annotated[Session, Depends(get_postgres)]
+SessionPostgres = Annotated[AsyncSession, Depends(get_postgres)]
 Pagination = Annotated[FilterPage, Query()]
 
+# Nome (padrão do PostgreSQL) da restrição UNIQUE de `genero.nome`, na migração 0001 e no rato-player.sql
+RESTRICAO_NOME_UNICO = 'genero_nome_key'
+
+
+def invalidar_genero(id_genero: int):
+    """Remove do cache o gênero e as coleções que o exibem."""
+    postgres_generos_cache.invalidate(id_genero)
+    postgres_colecoes_cache.invalidate_where(contem_genero(id_genero))
+
+
+# Coleções do gênero em JSON, calculadas no próprio RETURNING das escritas: a resposta sai do
+# mesmo comando, sem o SELECT/refresh que o ORM faria depois
+COLECOES_JSON = (
+    select(
+        func.coalesce(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_object(
+                        'id_colecao',
+                        Colecao.id_colecao,
+                        'titulo',
+                        Colecao.titulo,
+                        'tipo',
+                        Colecao.tipo,
+                        'duracao',
+                        Colecao.duracao,
+                        'caminho_capa',
+                        Colecao.caminho_capa,
+                        'data_lancamento',
+                        Colecao.data_lancamento,
+                    ),
+                    Colecao.id_colecao,
+                )
+            ),
+            literal_column("'[]'::json"),
+        )
+    )
+    .select_from(genero_colecao.join(Colecao))
+    .where(genero_colecao.c.id_genero == Genero.id_genero)
+    .correlate(Genero)
+    .scalar_subquery()
+    .label('colecoes')
+)
+
+GENERO_RETURNING = (Genero.id_genero, Genero.nome, Genero.surgiu_em, COLECOES_JSON)
+
 
 @router.post(
     '/',
@@ -30,22 +96,80 @@ Pagination = Annotated[FilterPage, Query()]
     summary='Criar uma novo gênero',
     response_model=GeneroPublic,
 )
-def create_genero(genero_schema: GeneroSchema, session: SessionPostgres):
-    db_genero = session.scalar(select(Genero).where(Genero.nome == genero_schema.nome))
+async def create_genero(genero_schema: GeneroSchema, session: SessionPostgres):
+    # ON CONFLICT DO NOTHING não devolve linha quando o nome já existe: o 409 dispensa o SELECT prévio
+    genero = (
+        await session.execute(
+            insert(Genero)
+            .values(**genero_schema.model_dump())
+            .on_conflict_do_nothing(index_elements=[Genero.nome])
+            .returning(Genero.id_genero, Genero.nome, Genero.surgiu_em)
+        )
+    ).one_or_none()
 
-    if db_genero:
+    if not genero:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail=f'O nome "{genero_schema.nome}" já está em uso.',
         )
 
-    genero = Genero(nome=genero_schema.nome, surgiu_em=genero_schema.surgiu_em)
+    await session.commit()
+    postgres_generos_registro.atualizar(GeneroBasic.model_construct(**genero._mapping))
 
-    session.add(genero)
-    session.commit()
-    session.refresh(genero)
+    return GeneroPublic.model_validate({**genero._mapping, 'colecoes': []})
 
-    return genero
+
+@router.post(
+    '/bulk',
+    summary='Criar gêneros em lote',
+    description=(
+        'Cria vários gêneros com um INSERT de várias linhas por lote (`BULK_CHUNK_SIZE`). '
+        'Nomes já em uso (ou repetidos na requisição) são reportados como conflito, sem abortar o lote; '
+        'se o lote falhar, os itens são gravados um a um e os inválidos são reportados como erro.'
+    ),
+    response_model=BulkResult,
+)
+async def create_generos_bulk(generos_schema: list[GeneroSchema], session: SessionPostgres):
+    async def inserir(generos: list[GeneroSchema]):
+        # ON CONFLICT DO NOTHING omite do RETURNING as linhas cujo nome já existe
+        return (
+            await session.execute(
+                insert(Genero)
+                .values([genero.model_dump() for genero in generos])
+                .on_conflict_do_nothing(index_elements=[Genero.nome])
+                .returning(Genero.id_genero, Genero.nome, Genero.surgiu_em)
+            )
+        ).all()
+
+    resultados = []
+    for inicio, lote in chunked(generos_schema, settings.BULK_CHUNK_SIZE):
+        partes, erros = await postgres_insert_chunk(session, inserir, lote, inicio)
+        resultados.extend(erros)
+
+        for inicio_parte, generos, linhas in partes:
+            postgres_generos_registro.atualizar(
+                *(GeneroBasic.model_construct(**linha._mapping) for linha in linhas)
+            )
+
+            criados = {linha.nome: linha.id_genero for linha in linhas}
+
+            for indice, genero in enumerate(generos, start=inicio_parte):
+                # `pop`: a segunda ocorrência de um nome na mesma requisição também é conflito
+                id_genero = criados.pop(genero.nome, None)
+                if id_genero is None:
+                    resultados.append(
+                        BulkItemResult(
+                            indice=indice,
+                            status=StatusBulkEnum.conflito,
+                            detalhe=f'O nome "{genero.nome}" já está em uso.',
+                        )
+                    )
+                else:
+                    resultados.append(
+                        BulkItemResult(indice=indice, status=StatusBulkEnum.criado, id=id_genero)
+                    )
+
+    return bulk_result(sorted(resultados, key=attrgetter('indice')))
 
 
 @router.get(
@@ -54,10 +178,23 @@ def create_genero(genero_schema: GeneroSchema, session: SessionPostgres):
     description='Retorna todos os gêneros cadastrados (com suporte a paginação).',
     response_model=GeneroList,
 )
-def read_generos(session: SessionPostgres, pagination: Pagination):
-    generos = session.scalars(select(Genero).offset(pagination.offset).limit(pagination.limit)).all()
+async def read_generos(session: SessionPostgres, pagination: Pagination, if_none_match: IfNoneMatch = None):
+    generos = (
+        await session.scalars(
+            paginate(select(Genero), Genero.id_genero, pagination).options(selectinload(Genero.colecoes))
+        )
+    ).all()
 
-    return {'generos': generos}
+    return json_response(
+        GeneroList.model_validate(
+            {
+                'generos': generos,
+                'next_cursor': next_cursor([genero.id_genero for genero in generos], pagination),
+            },
+            from_attributes=True,
+        ),
+        if_none_match,
+    )
 
 
 @router.get(
@@ -68,20 +205,28 @@ def read_generos(session: SessionPostgres, pagination: Pagination):
     com suporte a paginação. Também é possível filtrar opcionalmente pelo
     período de data de surgimento.
 
+    O `modo` define como o nome é comparado: `contem` (padrão, substring),
+    `prefixo` (início do nome) ou `relevancia` (similaridade de trigramas,
+    do mais ao menos parecido; paginação apenas por `offset`). Os modos
+    `prefixo` e `relevancia` ignoram acentos e maiúsculas.
+
     Exemplos:
     - `/generos/buscar?nome=rock`
+    - `/generos/buscar?nome=forro&modo=prefixo`
     - `/generos/buscar?nome=rock&data_inicio=2020-01-01&data_fim=2022-12-31`
     """,
     response_model=GeneroList,
 )
-def search_generos(
+async def search_generos(
     session: SessionPostgres,
     filters: Annotated[GeneroSearchFilters, Query()],
+    if_none_match: IfNoneMatch = None,
 ):
     stmt = select(Genero)
+    por_relevancia = bool(filters.nome) and filters.modo == ModoBuscaEnum.relevancia
 
     if filters.nome:
-        stmt = stmt.where(Genero.nome.ilike(f'%{filters.nome}%'))
+        stmt = stmt.where(filtro_texto_postgres(Genero.nome, filters.nome, filters.modo))
 
     if filters.data_inicio and filters.data_fim:
         stmt = stmt.where(
@@ -95,11 +240,53 @@ def search_generos(
     elif filters.data_fim:
         stmt = stmt.where(Genero.surgiu_em <= filters.data_fim)
 
-    stmt = stmt.offset(filters.offset).limit(filters.limit)
+    if por_relevancia:
+        rank = ordem_relevancia_postgres(Genero.nome, filters.nome)
+        stmt = paginate_by_rank(stmt, rank, Genero.id_genero, filters)
+    else:
+        stmt = paginate(stmt, Genero.id_genero, filters)
+
+    generos = (await session.execute(stmt.options(selectinload(Genero.colecoes)))).scalars().all()
+
+    return json_response(
+        GeneroList.model_validate(
+            {
+                'generos': generos,
+                'next_cursor': None
+                if por_relevancia
+                else next_cursor([genero.id_genero for genero in generos], filters),
+            },
+            from_attributes=True,
+        ),
+        if_none_match,
+    )
+
+
+async def exportar_generos():
+    """Percorre todos os gêneros com um cursor no servidor, produzindo um lote de NDJSON por partição."""
+    stmt = (
+        select(Genero.id_genero, Genero.nome, Genero.surgiu_em)
+        .order_by(Genero.id_genero)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+
+    async with open_postgres() as session:
+        result = await session.stream(stmt)
+        async for linhas in result.partitions():
+            yield ndjson(GeneroExport.model_construct(**linha._mapping) for linha in linhas)
 
-    generos = session.execute(stmt).scalars().all()
 
-    return {'generos': generos}
+@router.get(
+    '/export',
+    summary='Exportar todos os gêneros (NDJSON)',
+    description=(
+        'Retorna todos os gêneros, um por linha (`application/x-ndjson`). As associações com coleções '
+        'estão na exportação de coleções (`generos_ids`).'
+    ),
+    response_class=StreamingResponse,
+)
+async def export_generos():
+    return ndjson_response(exportar_generos())
 
 
 @router.get(
@@ -108,8 +295,15 @@ def search_generos(
     description='Retorna um gênero específico pelo seu identificador único.',
     response_model=GeneroPublic,
 )
-def read_genero_by_id(id_genero: int, session: SessionPostgres):
-    db_genero = session.scalar(select(Genero).where(Genero.id_genero == id_genero))
+async def read_genero_by_id(id_genero: int, session: SessionPostgres, if_none_match: IfNoneMatch = None):
+    representation = postgres_generos_cache.get(id_genero)
+    if representation is not None:
+        return conditional_response(representation, if_none_match)
+
+    versao = postgres_generos_cache.versao
+    db_genero = await session.scalar(
+        select(Genero).options(selectinload(Genero.colecoes)).where(Genero.id_genero == id_genero)
+    )
 
     if not db_genero:
         raise HTTPException(
@@ -117,17 +311,37 @@ def read_genero_by_id(id_genero: int, session: SessionPostgres):
             detail=f'O gênero de ID {id_genero} não foi encontrado.',
         )
 
-    return db_genero
+    representation = represent(GeneroPublic.model_validate(db_genero, from_attributes=True))
+    postgres_generos_cache.set(id_genero, representation, versao)
 
+    return conditional_response(representation, if_none_match)
 
-@router.put(
-    '/{id_genero}',
-    summary='Atualizar gênero totalmente',
-    description='Substitui todos os campos do gênero especificado pelo corpo enviado.',
-    response_model=GeneroPublic,
-)
-def update_genero(id_genero: int, genero_schema: GeneroSchema, session: SessionPostgres):
-    genero = session.scalar(select(Genero).where(Genero.id_genero == id_genero))
+
+async def atualizar_genero(id_genero: int, update_data: dict, session) -> GeneroPublic:
+    """UPDATE ... RETURNING comum ao PUT e ao PATCH: 404 sem linha devolvida, 409 se o nome já existe."""
+    if update_data:
+        stmt = (
+            update(Genero)
+            .where(Genero.id_genero == id_genero)
+            .values(**update_data)
+            .returning(*GENERO_RETURNING)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        # Sem campos para atualizar, apenas devolve o gênero atual
+        stmt = select(*GENERO_RETURNING).where(Genero.id_genero == id_genero)
+
+    try:
+        genero = (await session.execute(stmt)).one_or_none()
+    except IntegrityError as e:
+        await session.rollback()
+        # Só a restrição de nome único vira 409; as demais são erros de verdade
+        if e.orig.diag.constraint_name != RESTRICAO_NOME_UNICO:
+            raise
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail=f'O nome "{update_data["nome"]}" já está em uso.',
+        )
 
     if not genero:
         raise HTTPException(
@@ -135,15 +349,26 @@ def update_genero(id_genero: int, genero_schema: GeneroSchema, session: SessionP
             detail=f'O gênero de ID {id_genero} não foi encontrado.',
         )
 
-    genero_schema = genero_schema.model_dump()
-    for key, value in genero_schema.items():
-        setattr(genero, key, value)
+    if update_data:
+        await session.commit()
+        invalidar_genero(id_genero)
+        postgres_generos_registro.atualizar(
+            GeneroBasic.model_construct(
+                id_genero=genero.id_genero, nome=genero.nome, surgiu_em=genero.surgiu_em
+            )
+        )
 
-    session.add(genero)
-    session.commit()
-    session.refresh(genero)
+    return GeneroPublic.model_validate(genero._mapping)
 
-    return genero
+
+@router.put(
+    '/{id_genero}',
+    summary='Atualizar gênero totalmente',
+    description='Substitui todos os campos do gênero especificado pelo corpo enviado.',
+    response_model=GeneroPublic,
+)
+async def update_genero(id_genero: int, genero_schema: GeneroSchema, session: SessionPostgres):
+    return await atualizar_genero(id_genero, genero_schema.model_dump(), session)
 
 
 @router.patch(
@@ -152,24 +377,8 @@ def update_genero(id_genero: int, genero_schema: GeneroSchema, session: SessionP
     description='Atualiza apenas os campos enviados no corpo da requisição.',
     response_model=GeneroPublic,
 )
-def patch_genero(id_genero: int, genero_schema: GeneroUpdateSchema, session: SessionPostgres):
-    genero = session.scalar(select(Genero).where(Genero.id_genero == id_genero))
-
-    if not genero:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail=f'O gênero de ID {id_genero} não foi encontrado.',
-        )
-
-    genero_schema = genero_schema.model_dump(exclude_unset=True)
-    for key, value in genero_schema.items():
-        setattr(genero, key, value)
-
-    session.add(genero)
-    session.commit()
-    session.refresh(genero)
-
-    return genero
+async def patch_genero(id_genero: int, genero_schema: GeneroUpdateSchema, session: SessionPostgres):
+    return await atualizar_genero(id_genero, genero_schema.model_dump(exclude_unset=True), session)
 
 
 @router.delete(
@@ -178,17 +387,26 @@ def patch_genero(id_genero: int, genero_schema: GeneroUpdateSchema, session: Ses
     description='Remove um gênero pelo seu identificador único.',
     response_model=Mensagem,
 )
-def delete_genero(id_genero: int, session: SessionPostgres):
-    colecao = session.scalar(select(Genero).where(Genero.id_genero == id_genero))
-
-    if not colecao:
+async def delete_genero(id_genero: int, session: SessionPostgres):
+    # As associações saem em uma CTE do mesmo comando (o ORM as removia antes, linha a linha)
+    associacoes = delete(genero_colecao).where(genero_colecao.c.id_genero == id_genero).cte('associacoes')
+    deleted = await session.scalar(
+        delete(Genero)
+        .where(Genero.id_genero == id_genero)
+        .add_cte(associacoes)
+        .returning(Genero.id_genero)
+        .execution_options(synchronize_session=False)
+    )
+
+    if deleted is None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
-            detail=f'A coleção de ID {id_genero} não foi encontrada.',
+            detail=f'O gênero de ID {id_genero} não foi encontrado.',
         )
 
-    session.delete(colecao)
-    session.commit()
+    await session.commit()
+    invalidar_genero(id_genero)
+    postgres_generos_registro.remover(id_genero)
 
     return {'mensagem': 'Gênero deletado com sucesso.'}
 
@@ -199,8 +417,10 @@ def delete_genero(id_genero: int, session: SessionPostgres):
     description='Retorna todas as coleções associadas a um gênero específico.',
     response_model=GeneroWithColecoes,
 )
-def get_colecoes_from_genero(id_genero: int, session: SessionPostgres):
-    genero = session.scalar(select(Genero).where(Genero.id_genero == id_genero))
+async def get_colecoes_from_genero(id_genero: int, session: SessionPostgres):
+    genero = await session.scalar(
+        select(Genero).options(selectinload(Genero.colecoes)).where(Genero.id_genero == id_genero)
+    )
     if not genero:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter(tags=['Métricas'])
+
+
+@router.get(
+    '/metrics',
+    summary='Métricas Prometheus',
+    description="""
+    Métricas do processo no formato de texto do Prometheus: latência por rota, requisições em
+    andamento, comandos e tempo no PostgreSQL e no MongoDB por requisição e espera por conexões
+    dos pools (ver `rato_player.metricas`).
+    """,
+    response_class=Response,
+)
+async def read_metricas():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
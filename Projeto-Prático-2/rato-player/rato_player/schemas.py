@@ -1,18 +1,20 @@
-from datetime import date
+from datetime import date, datetime
 from typing import Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
-from rato_player.enums import TipoColecaoEnum
+from rato_player.enums import ModoBuscaEnum, StatusBulkEnum, TipoColecaoEnum
 
 
 class FilterPage(BaseModel):
     offset: int = Field(0, ge=0)
     limit: int = Field(10, ge=1)
+    after: Optional[str] = None  # cursor (`next_cursor` da página anterior); ignora o offset
 
 
 class ColecaoSearchFilters(FilterPage):
     titulo: Optional[str] = None
+    modo: ModoBuscaEnum = ModoBuscaEnum.contem
     tipo: Optional[TipoColecaoEnum] = None
     data_inicio: Optional[date] = None
     data_fim: Optional[date] = None
@@ -20,6 +22,7 @@ class ColecaoSearchFilters(FilterPage):
 
 class GeneroSearchFilters(FilterPage):
     nome: Optional[str] = None
+    modo: ModoBuscaEnum = ModoBuscaEnum.contem
     data_inicio: Optional[date] = None
     data_fim: Optional[date] = None
 
@@ -34,7 +37,18 @@ class GeneroSchema(BaseModel):
     surgiu_em: date
 
 
-class GeneroUpdateSchema(BaseModel):
+class AtualizacaoParcial(BaseModel):
+    """Base dos schemas de PATCH: os campos podem ser omitidos, mas não enviados como null."""
+
+    @field_validator('*')
+    @classmethod
+    def rejeitar_nulo(cls, valor):
+        if valor is None:
+            raise ValueError('o campo não pode ser nulo (omita-o para mantê-lo)')
+        return valor
+
+
+class GeneroUpdateSchema(AtualizacaoParcial):
     nome: Optional[str] = None
     surgiu_em: Optional[date] = None
 
@@ -47,7 +61,7 @@ class ColecaoSchema(BaseModel):
     data_lancamento: date
 
 
-class ColecaoUpdateSchema(BaseModel):
+class ColecaoUpdateSchema(AtualizacaoParcial):
     titulo: Optional[str] = None
     tipo: Optional[TipoColecaoEnum] = None
     duracao: Optional[int] = None
@@ -92,12 +106,84 @@ class ColecaoPublic(BaseModel):
 # Schemas para listas (reutilizáveis para PostgreSQL e MongoDB)
 class GeneroList(BaseModel):
     generos: list[GeneroPublic]
+    next_cursor: Optional[str] = None
 
 
 class ColecaoList(BaseModel):
     colecoes: list[ColecaoPublic]
+    next_cursor: Optional[str] = None
+
+
+# Busca facetada: contagens de todas as coleções encontradas, não só da página
+class ContagemFaceta(BaseModel):
+    valor: Union[int, str]  # tipo, década (ano inicial) ou ID do gênero
+    quantidade: int
+    nome: Optional[str] = None  # nome do gênero
+
+
+class Facetas(BaseModel):
+    total: int
+    tipos: list[ContagemFaceta]
+    decadas: list[ContagemFaceta]
+    generos: list[ContagemFaceta]  # os FACETAS_MAX_GENEROS mais frequentes
+
+
+class ColecaoFacetas(ColecaoList):
+    facetas: Facetas
+
+
+# Estatísticas do catálogo, lidas de resumos atualizados periodicamente
+class EstatisticaItem(BaseModel):
+    valor: Union[int, str]  # ID do gênero, tipo ou ano de lançamento
+    nome: Optional[str] = None  # nome do gênero
+    colecoes: int
+    duracao_total: int
+    duracao_media: float
+
+
+class Estatisticas(BaseModel):
+    atualizada_em: Optional[datetime] = None  # None se os resumos ainda não foram calculados
+    idade: Optional[float] = None  # segundos desde a atualização
+    itens: list[EstatisticaItem]
 
 
 class GeneroWithColecoes(BaseModel):
     genero: GeneroBasic
     colecoes: list[ColecaoBasic] = []
+
+
+# Criação em lote (comuns para PostgreSQL e MongoDB)
+class BulkItemResult(BaseModel):
+    indice: int  # posição do item no corpo da requisição
+    status: StatusBulkEnum
+    id: Optional[Union[int, str]] = None
+    detalhe: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    criados: int
+    conflitos: int
+    erros: int
+    resultados: list[BulkItemResult]
+
+
+class AssociacaoSchema(BaseModel):
+    id_colecao: int
+    id_genero: int
+
+
+# Exportação NDJSON (uma linha por entidade, sem os objetos relacionados)
+class GeneroExport(BaseModel):
+    id_genero: Union[int, str]
+    nome: str
+    surgiu_em: date
+
+
+class ColecaoExport(BaseModel):
+    id_colecao: Union[int, str]
+    titulo: str
+    tipo: TipoColecaoEnum
+    duracao: int
+    caminho_capa: str
+    data_lancamento: date
+    generos_ids: list[Union[int, str]]
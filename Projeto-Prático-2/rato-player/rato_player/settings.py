@@ -10,6 +10,9 @@ class Settings(BaseSettings):
     POSTGRES_DB_NAME: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
+    POSTGRES_ASYNC: bool = True  # False usa o engine síncrono (threadpool), para comparação
+    POSTGRES_POOL_SIZE: int = 10
+    POSTGRES_MAX_OVERFLOW: int = 20
 
     # MongoDB
     MONGODB_HOST: str
@@ -17,3 +20,32 @@ class Settings(BaseSettings):
     MONGODB_DB_NAME: str
     MONGODB_USER: str
     MONGODB_PASSWORD: str
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_HEALTH_TTL: float = 10.0  # segundos
+    MONGODB_CREATE_INDEXES: bool = True  # cria os índices de busca (os únicos são sempre criados)
+    MONGODB_GENEROS_EMBUTIDOS: bool = False  # snapshots dos gêneros nas coleções (`rato_player.embutidos`)
+
+    # Cache de entidades (leituras por ID), por backend
+    CACHE_POSTGRES: bool = True
+    CACHE_MONGO: bool = True
+    CACHE_MAX_ITENS: int = 10_000  # por cache
+    CACHE_TTL: float = 60.0  # segundos
+    CACHE_FACETAS_TTL: float = 30.0  # segundos; as escritas não invalidam as facetas, só o TTL
+
+    # Registro de gêneros em memória (resolve os gêneros das coleções sem consultar o banco)
+    REGISTRO_GENEROS: bool = True
+    REGISTRO_GENEROS_RECARGA: float = 300.0  # segundos entre recargas completas (0 desativa)
+
+    # Estatísticas do catálogo (`rato_player.estatisticas`)
+    ESTATISTICAS_INTERVALO: float = 60.0  # segundos entre atualizações (0 desativa)
+
+    # Métricas Prometheus em /metrics (`rato_player.metricas`)
+    METRICAS: bool = True
+
+    # Respostas
+    MAX_COLECOES_POR_GENERO: int = 50  # coleções embutidas em cada gênero nas listagens
+    FACETAS_MAX_GENEROS: int = 20  # gêneros na faceta de gêneros da busca facetada
+    BULK_CHUNK_SIZE: int = 1000  # itens por INSERT / insert_many nas rotas /bulk
+    EXPORT_BATCH_SIZE: int = 1000  # linhas por busca no cursor das rotas /export
+    HTTP_CACHE_CONTROL: str = 'no-cache'  # os clientes guardam a resposta, mas revalidam pelo ETag
@@ -0,0 +1,69 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+from sqlalchemy.exc import OperationalError
+
+from rato_player.app import app
+from rato_player.cache import (
+    mongo_colecoes_cache,
+    mongo_generos_cache,
+    postgres_colecoes_cache,
+    postgres_generos_cache,
+)
+from rato_player.databases import postgres
+from rato_player.databases.mongo import get_mongo
+from rato_player.databases.postgres import async_engine, engine
+from rato_player.registro import mongo_generos_registro, postgres_generos_registro
+
+
+@asynccontextmanager
+async def sem_lifespan(app):
+    yield
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # O lifespan (conexão com o MongoDB, registros e estatísticas) não roda nos testes
+    monkeypatch.setattr(app.router, 'lifespan_context', sem_lifespan)
+    with TestClient(app) as client:
+        yield client
+        # As conexões do engine assíncrono pertencem ao event loop deste cliente
+        client.portal.call(async_engine.dispose)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(autouse=True)
+def sem_memoria(monkeypatch):
+    """Desliga os caches de entidades e os registros de gêneros: toda leitura vai ao banco."""
+    for memoria in (
+        postgres_generos_cache,
+        postgres_colecoes_cache,
+        mongo_generos_cache,
+        mongo_colecoes_cache,
+        postgres_generos_registro,
+        mongo_generos_registro,
+    ):
+        monkeypatch.setattr(memoria, 'ativo', False)
+
+
+@pytest.fixture(params=[True, False], ids=['async', 'sync'])
+def postgres_async(request, monkeypatch):
+    """Roda o teste nos dois caminhos das rotas (POSTGRES_ASYNC=true/false), com o banco do .env."""
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip('PostgreSQL indisponível (ver POSTGRES_* e `task bancos`)')
+
+    monkeypatch.setattr(postgres.settings, 'POSTGRES_ASYNC', request.param)
+    return request.param
+
+
+@pytest.fixture
+def db(client):
+    """Banco MongoDB em memória (mongomock) no lugar do servidor, para as rotas do cliente."""
+    db = AsyncMongoMockClient()['rato']
+    app.dependency_overrides[get_mongo] = lambda: db
+    return db
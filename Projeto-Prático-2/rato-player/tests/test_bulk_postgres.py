@@ -0,0 +1,78 @@
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, select
+
+from rato_player.databases.postgres import engine
+from rato_player.models import Colecao, Genero
+
+
+@pytest.fixture
+def marcador(postgres_async):
+    """Marcador único nos nomes/títulos criados, removidos ao final do teste."""
+    marcador = f'bulk-{uuid4().hex[:8]}'
+    yield marcador
+
+    with engine.begin() as conn:
+        conn.execute(delete(Genero).where(Genero.nome.startswith(marcador)))
+        conn.execute(delete(Colecao).where(Colecao.titulo.startswith(marcador)))
+
+
+@pytest.fixture
+def lotes_de_dois(monkeypatch):
+    # Itens válidos antes e depois do inválido, no mesmo lote e em outros lotes
+    monkeypatch.setattr('rato_player.routers.generos_postgres.settings.BULK_CHUNK_SIZE', 2)
+    monkeypatch.setattr('rato_player.routers.colecoes_postgres.settings.BULK_CHUNK_SIZE', 2)
+
+
+def test_criar_generos_em_lote_com_itens_invalidos(client, marcador, lotes_de_dois):
+    nomes = [f'{marcador} a', f'{marcador} ' + 'x' * 60, f'{marcador} b', f'{marcador} a', f'{marcador} c']
+
+    response = client.post(
+        '/postgres/generos/bulk', json=[{'nome': nome, 'surgiu_em': '1950-01-01'} for nome in nomes]
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    corpo = response.json()
+    assert [item['status'] for item in corpo['resultados']] == [
+        'criado',
+        'erro',  # maior que VARCHAR(60)
+        'criado',
+        'conflito',  # repete o primeiro
+        'criado',
+    ]
+    assert [item['indice'] for item in corpo['resultados']] == list(range(len(nomes)))
+    assert (corpo['criados'], corpo['conflitos'], corpo['erros']) == (3, 1, 1)
+
+    with engine.connect() as conn:
+        gravados = conn.scalars(select(Genero.nome).where(Genero.nome.startswith(marcador))).all()
+    assert sorted(gravados) == [f'{marcador} a', f'{marcador} b', f'{marcador} c']
+
+
+def test_criar_colecoes_em_lote_com_itens_invalidos(client, marcador, lotes_de_dois):
+    titulos = [f'{marcador} 1', f'{marcador} 2', f'{marcador} ' + 'x' * 90, f'{marcador} 3']
+    colecoes = [
+        {
+            'titulo': titulo,
+            'tipo': 'Album',
+            'duracao': 2700,
+            'caminho_capa': '/capas/1.jpg',
+            'data_lancamento': '2000-01-01',
+        }
+        for titulo in titulos
+    ]
+
+    response = client.post('/postgres/colecoes/bulk', json=colecoes)
+
+    assert response.status_code == HTTPStatus.OK
+    corpo = response.json()
+    assert [item['status'] for item in corpo['resultados']] == ['criado', 'criado', 'erro', 'criado']
+    assert (corpo['criados'], corpo['erros']) == (3, 1)
+
+    ids = [item['id'] for item in corpo['resultados'] if item['status'] == 'criado']
+    with engine.connect() as conn:
+        gravados = dict(
+            conn.execute(select(Colecao.id_colecao, Colecao.titulo).where(Colecao.id_colecao.in_(ids))).all()
+        )
+    assert [gravados[id_colecao] for id_colecao in ids] == [titulos[0], titulos[1], titulos[3]]
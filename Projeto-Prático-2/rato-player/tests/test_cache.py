@@ -0,0 +1,62 @@
+import pytest
+
+from rato_player.cache import EntityCache
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio controlado pelo teste no lugar do `monotonic` usado pela cache."""
+    agora = [1000.0]
+    monkeypatch.setattr('rato_player.cache.monotonic', lambda: agora[0])
+    return agora
+
+
+@pytest.fixture
+def cache():
+    return EntityCache('teste', ativo=True, max_itens=3, ttl=60)
+
+
+def test_leitura_anterior_a_invalidacao_nao_e_gravada(cache):
+    # A leitura começa (miss) e anota a versão; uma escrita invalida a chave antes de ela terminar
+    assert cache.get(1) is None
+    versao = cache.versao
+    cache.invalidate(1)
+
+    cache.set(1, 'valor antigo', versao)
+
+    assert cache.get(1) is None
+    cache.set(1, 'valor novo', cache.versao)
+    assert cache.get(1) == 'valor novo'
+
+
+def test_remove_o_menos_recente_ao_passar_de_max_itens(cache):
+    for key in (1, 2, 3):
+        cache.set(key, f'valor {key}', cache.versao)
+    cache.get(1)  # 1 passa a ser o mais recente; 2 é o menos recente
+
+    cache.set(4, 'valor 4', cache.versao)
+
+    assert cache.get(2) is None
+    assert [cache.get(key) for key in (1, 3, 4)] == ['valor 1', 'valor 3', 'valor 4']
+    assert cache.stats()['itens'] == cache.max_itens
+    assert cache.evictions == 1
+
+
+def test_expira_apos_o_ttl(cache, relogio):
+    cache.set(1, 'valor', cache.versao)
+
+    relogio[0] += cache.ttl - 1
+    assert cache.get(1) == 'valor'
+
+    relogio[0] += 1
+    assert cache.get(1) is None
+    assert cache.expirations == 1
+    assert cache.stats()['itens'] == 0
+
+
+def test_inativa_nao_guarda_nada(cache):
+    cache.ativo = False
+    cache.set(1, 'valor', cache.versao)
+
+    assert cache.get(1) is None
+    assert cache.stats()['itens'] == 0
@@ -0,0 +1,89 @@
+import asyncio
+from collections import Counter
+from http import HTTPStatus
+
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockCollection
+
+# Tamanhos de página testados: o número de comandos não pode crescer com a página
+TAMANHOS_PAGINA = (1, 5, 20)
+
+# Operações das coleções do MongoDB contadas (cada uma é um comando no servidor)
+OPERACOES = ('find', 'find_one', 'aggregate', 'count_documents', 'distinct')
+
+# Uma agregação na coleção e uma única busca dos gêneros de todas as coleções da página
+COMANDOS_ESPERADOS = Counter({'colecoes.aggregate': 1, 'generos.find': 1})
+
+
+@pytest.fixture
+def catalogo(db):
+    generos = [{'_id': ObjectId(), 'nome': f'Gênero {i}', 'surgiu_em': '1950-01-01'} for i in range(5)]
+    colecoes = [
+        {
+            '_id': ObjectId(),
+            'titulo': f'Coleção {i}',
+            'tipo': 'Album',
+            'duracao': 2700,
+            'caminho_capa': f'/capas/{i}.jpg',
+            'data_lancamento': '2000-01-01',
+            'generos_ids': [str(genero['_id']) for genero in generos[i % 4 : i % 4 + 2]],
+        }
+        for i in range(30)
+    ]
+
+    async def inserir():
+        await db.generos.insert_many(generos)
+        await db.colecoes.insert_many(colecoes)
+
+    asyncio.run(inserir())
+    return colecoes
+
+
+@pytest.fixture
+def comandos(monkeypatch):
+    """Conta as operações que as rotas fazem nas coleções do MongoDB, por `coleção.operação`."""
+    contagem = Counter()
+
+    def contar(operacao, original):
+        def contada(self, *args, **kwargs):
+            contagem[f'{self.name}.{operacao}'] += 1
+            return original(self, *args, **kwargs)
+
+        return contada
+
+    for operacao in OPERACOES:
+        monkeypatch.setattr(
+            AsyncMongoMockCollection, operacao, contar(operacao, getattr(AsyncMongoMockCollection, operacao))
+        )
+    return contagem
+
+
+@pytest.mark.parametrize('limit', TAMANHOS_PAGINA)
+def test_listar_colecoes_comandos_por_pagina(client, catalogo, comandos, limit):
+    response = client.get('/mongo/colecoes/', params={'limit': limit})
+
+    assert response.status_code == HTTPStatus.OK
+    colecoes = response.json()['colecoes']
+    assert len(colecoes) == limit
+    assert all(len(colecao['generos']) == 2 for colecao in colecoes)  # noqa: PLR2004
+    assert comandos == COMANDOS_ESPERADOS
+
+
+@pytest.mark.parametrize('limit', TAMANHOS_PAGINA)
+def test_buscar_colecoes_comandos_por_pagina(client, catalogo, comandos, limit):
+    response = client.get('/mongo/colecoes/buscar', params={'titulo': 'coleção', 'limit': limit})
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['colecoes']) == limit
+    assert comandos == COMANDOS_ESPERADOS
+
+
+def test_colecao_por_id_comandos(client, catalogo, comandos):
+    colecao = catalogo[0]
+
+    response = client.get(f'/mongo/colecoes/{colecao["_id"]}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert [genero['id_genero'] for genero in response.json()['generos']] == colecao['generos_ids']
+    assert comandos == COMANDOS_ESPERADOS
@@ -0,0 +1,135 @@
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, event, insert
+
+from rato_player.databases.postgres import async_engine, engine
+from rato_player.models import Colecao, Genero, genero_colecao
+from rato_player.pagination import encode_cursor
+
+# Tamanhos de página testados: o número de comandos não pode crescer com a página
+TAMANHOS_PAGINA = (1, 5, 20)
+
+
+@pytest.fixture
+def catalogo(postgres_async):
+    """Gêneros e coleções com um marcador único no nome/título, removidos ao final do teste."""
+    marcador = f'teste-{uuid4().hex[:8]}'
+    with engine.begin() as conn:
+        ids_generos = conn.scalars(
+            insert(Genero).returning(Genero.id_genero),
+            [{'nome': f'{marcador} {i}', 'surgiu_em': '1950-01-01'} for i in range(5)],
+        ).all()
+        ids_colecoes = conn.scalars(
+            insert(Colecao).returning(Colecao.id_colecao),
+            [
+                {
+                    'titulo': f'{marcador} {i}',
+                    'tipo': 'Album',
+                    'duracao': 2700,
+                    'caminho_capa': f'/capas/{i}.jpg',
+                    'data_lancamento': '2000-01-01',
+                }
+                for i in range(30)
+            ],
+        ).all()
+        # Cada coleção em 2 gêneros; cada gênero em 12 coleções
+        conn.execute(
+            insert(genero_colecao),
+            [
+                {'id_genero': id_genero, 'id_colecao': id_colecao}
+                for i, id_colecao in enumerate(ids_colecoes)
+                for id_genero in ids_generos[i % 4 : i % 4 + 2]
+            ],
+        )
+
+    yield {'marcador': marcador, 'generos': sorted(ids_generos), 'colecoes': sorted(ids_colecoes)}
+
+    with engine.begin() as conn:
+        conn.execute(delete(genero_colecao).where(genero_colecao.c.id_genero.in_(ids_generos)))
+        conn.execute(delete(Colecao).where(Colecao.id_colecao.in_(ids_colecoes)))
+        conn.execute(delete(Genero).where(Genero.id_genero.in_(ids_generos)))
+
+
+@pytest.fixture
+def comandos():
+    """Comandos SQL executados pelos dois engines (o assíncrono envolve um engine síncrono)."""
+    executados = []
+
+    def registrar(conn, cursor, statement, *args):
+        executados.append(statement)
+
+    engines = (engine, async_engine.sync_engine)
+    for alvo in engines:
+        event.listen(alvo, 'before_cursor_execute', registrar)
+    yield executados
+    for alvo in engines:
+        event.remove(alvo, 'before_cursor_execute', registrar)
+
+
+def depois_de(ids: list[int]) -> str:
+    """Cursor da página que começa no primeiro dos IDs."""
+    return encode_cursor(ids[0] - 1)
+
+
+# Gêneros: a página e as coleções de todos os gêneros dela (selectinload)
+@pytest.mark.parametrize('limit', TAMANHOS_PAGINA)
+def test_listar_generos_comandos_por_pagina(client, catalogo, comandos, limit):
+    response = client.get(
+        '/postgres/generos/', params={'after': depois_de(catalogo['generos']), 'limit': limit}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['generos']) == min(limit, len(catalogo['generos']))
+    assert len(comandos) == 2, comandos  # noqa: PLR2004
+
+
+@pytest.mark.parametrize('limit', TAMANHOS_PAGINA)
+def test_buscar_generos_comandos_por_pagina(client, catalogo, comandos, limit):
+    response = client.get('/postgres/generos/buscar', params={'nome': catalogo['marcador'], 'limit': limit})
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['generos']) == min(limit, len(catalogo['generos']))
+    assert len(comandos) == 2, comandos  # noqa: PLR2004
+
+
+def test_genero_por_id_comandos(client, catalogo, comandos):
+    response = client.get(f'/postgres/generos/{catalogo["generos"][0]}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['colecoes']) == 8  # noqa: PLR2004
+    assert len(comandos) == 2, comandos  # noqa: PLR2004
+
+
+# Coleções: a página e os gêneros de todas as coleções dela
+@pytest.mark.parametrize('limit', TAMANHOS_PAGINA)
+def test_listar_colecoes_comandos_por_pagina(client, catalogo, comandos, limit):
+    response = client.get(
+        '/postgres/colecoes/', params={'after': depois_de(catalogo['colecoes']), 'limit': limit}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    colecoes = response.json()['colecoes']
+    assert len(colecoes) == limit
+    assert all(len(colecao['generos']) == 2 for colecao in colecoes)  # noqa: PLR2004
+    assert len(comandos) == 2, comandos  # noqa: PLR2004
+
+
+@pytest.mark.parametrize('limit', TAMANHOS_PAGINA)
+def test_buscar_colecoes_comandos_por_pagina(client, catalogo, comandos, limit):
+    response = client.get(
+        '/postgres/colecoes/buscar', params={'titulo': catalogo['marcador'], 'limit': limit}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['colecoes']) == limit
+    assert len(comandos) == 2, comandos  # noqa: PLR2004
+
+
+def test_colecao_por_id_comandos(client, catalogo, comandos):
+    response = client.get(f'/postgres/colecoes/{catalogo["colecoes"][0]}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['generos']) == 2  # noqa: PLR2004
+    assert len(comandos) == 2, comandos  # noqa: PLR2004
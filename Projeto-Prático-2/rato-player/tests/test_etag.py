@@ -0,0 +1,77 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from bson import ObjectId
+
+from rato_player.etag import etag_matches
+from rato_player.settings import Settings
+
+settings = Settings()
+
+ETAG = '"abc123"'
+
+
+@pytest.fixture
+def colecao(db):
+    colecao = {
+        '_id': ObjectId(),
+        'titulo': 'Acabou Chorare',
+        'tipo': 'Album',
+        'duracao': 2200,
+        'caminho_capa': '/capas/1.jpg',
+        'data_lancamento': '1972-01-01',
+        'colecaos_ids': [],
+    }
+    asyncio.run(db.colecoes.insert_one(colecao))
+    return f'/mongo/colecoes/{colecao["_id"]}'
+
+
+@pytest.mark.parametrize(
+    ('if_none_match', 'esperado'),
+    [
+        (None, False),
+        ('', False),
+        (ETAG, True),
+        (f'W/{ETAG}', True),  # comparação fraca
+        ('*', True),
+        (f'"outro", {ETAG}', True),
+        ('"outro", W/"mais um"', False),
+        ('abc123', False),  # sem aspas não é o mesmo ETag
+    ],
+)
+def test_etag_matches(if_none_match, esperado):
+    assert etag_matches(if_none_match, ETAG) is esperado
+
+
+def test_resposta_com_etag(client, colecao):
+    response = client.get(colecao)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['titulo'] == 'Acabou Chorare'
+    assert response.headers['ETag'].startswith('"')
+    assert response.headers['Cache-Control'] == settings.HTTP_CACHE_CONTROL
+
+
+@pytest.mark.parametrize('formato', ['{}', 'W/{}', '"outro", {}', '*'])
+def test_if_none_match_responde_304(client, colecao, formato):
+    etag = client.get(colecao).headers['ETag']
+
+    response = client.get(colecao, headers={'If-None-Match': formato.format(etag)})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b''
+    assert response.headers['ETag'] == etag
+    assert response.headers['Cache-Control'] == settings.HTTP_CACHE_CONTROL
+
+
+def test_etag_muda_apos_patch(client, colecao):
+    titulo = 'Acabou Chorare (Remasterizado)'
+    etag = client.get(colecao).headers['ETag']
+
+    assert client.patch(colecao, json={'titulo': titulo}).status_code == HTTPStatus.OK
+    response = client.get(colecao, headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['titulo'] == titulo
+    assert response.headers['ETag'] != etag
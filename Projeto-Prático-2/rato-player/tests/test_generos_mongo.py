@@ -0,0 +1,74 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from rato_player.databases import mongo
+from rato_player.databases.mongo import DB_NAME, get_mongo, mongo_state
+
+
+@pytest.fixture
+def sem_indice_unico(monkeypatch):
+    """Estado da aplicação quando o índice único de `nome` não pôde ser criado."""
+    monkeypatch.setitem(mongo_state, 'indices', False)
+    monkeypatch.setitem(mongo_state, 'indices_tentado_em', None)
+
+
+@pytest.fixture
+def generos(db, sem_indice_unico):
+    generos = [{'_id': ObjectId(), 'nome': nome, 'surgiu_em': '1950-01-01'} for nome in ('Rock', 'Jazz')]
+    asyncio.run(db.generos.insert_many(generos))
+    return generos
+
+
+def test_indice_unico_com_nomes_repetidos_nao_derruba_a_api(monkeypatch, sem_indice_unico, caplog):
+    client = AsyncMongoMockClient()
+    monkeypatch.setitem(mongo_state, 'client', client)
+    monkeypatch.setitem(mongo_state, 'ok', True)
+    monkeypatch.setattr(mongo.settings, 'MONGODB_CREATE_INDEXES', False)
+    generos = client[DB_NAME].generos
+    asyncio.run(generos.insert_many([{'nome': 'Rock'}, {'nome': 'Rock'}]))
+
+    # A falha vai para o log e o banco continua disponível para as rotas
+    assert asyncio.run(get_mongo()) is not None
+    assert not mongo_state['indices']
+    assert 'Não foi possível criar os índices do MongoDB' in caplog.text
+
+    # Depois de remover o nome repetido, a próxima tentativa (após MONGODB_HEALTH_TTL) cria o índice
+    asyncio.run(generos.delete_one({'nome': 'Rock'}))
+    monkeypatch.setitem(mongo_state, 'indices_tentado_em', None)
+    asyncio.run(get_mongo())
+    assert mongo_state['indices']
+
+
+def test_criar_genero_sem_indice_unico_confere_o_nome(client, generos):
+    response = client.post('/mongo/generos/', json={'nome': 'Rock', 'surgiu_em': '1960-01-01'})
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {'detail': 'O nome "Rock" já está em uso.'}
+
+    response = client.post('/mongo/generos/', json={'nome': 'Blues', 'surgiu_em': '1960-01-01'})
+
+    assert response.status_code == HTTPStatus.CREATED
+
+
+def test_atualizar_genero_sem_indice_unico_confere_o_nome(client, generos):
+    rock, jazz = (str(genero['_id']) for genero in generos)
+
+    response = client.put(f'/mongo/generos/{jazz}', json={'nome': 'Rock', 'surgiu_em': '1960-01-01'})
+    assert response.status_code == HTTPStatus.CONFLICT
+
+    response = client.patch(f'/mongo/generos/{jazz}', json={'nome': 'Rock'})
+    assert response.status_code == HTTPStatus.CONFLICT
+
+    # O nome do próprio gênero não é conflito
+    response = client.patch(f'/mongo/generos/{rock}', json={'nome': 'Rock'})
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_criar_generos_em_lote_sem_indice_unico(client, generos):
+    response = client.post('/mongo/generos/bulk', json=[{'nome': 'Rock', 'surgiu_em': '1960-01-01'}])
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
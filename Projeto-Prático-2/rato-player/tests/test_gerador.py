@@ -0,0 +1,53 @@
+from datetime import date
+from itertools import product
+
+from rato_player.gerador import (
+    DATA_FINAL,
+    DATA_INICIAL,
+    QUALIFICADORES_GENERO,
+    RAIZES_GENERO,
+    gerar_colecoes,
+    gerar_generos,
+)
+
+COLECOES = 2000
+GENEROS = 50
+
+# Mais gêneros do que combinações de raiz e qualificador: os nomes passam a ser numerados
+NOMES_DISTINTOS = len(list(product(RAIZES_GENERO, ('', *QUALIFICADORES_GENERO))))
+
+
+def test_mesma_semente_gera_os_mesmos_registros():
+    assert list(gerar_generos(GENEROS, semente=7)) == list(gerar_generos(GENEROS, semente=7))
+    assert list(gerar_colecoes(COLECOES, GENEROS, semente=7)) == list(
+        gerar_colecoes(COLECOES, GENEROS, semente=7)
+    )
+
+
+def test_outra_semente_gera_outros_registros():
+    assert list(gerar_generos(GENEROS, semente=7)) != list(gerar_generos(GENEROS, semente=8))
+    assert list(gerar_colecoes(COLECOES, GENEROS, semente=7)) != list(
+        gerar_colecoes(COLECOES, GENEROS, semente=8)
+    )
+
+
+def test_generos_das_colecoes_sem_repeticao_e_existentes():
+    for colecao in gerar_colecoes(COLECOES, GENEROS, semente=42):
+        generos_ids = colecao['generos_ids']
+        assert 1 <= len(generos_ids) <= 4  # noqa: PLR2004
+        assert len(set(generos_ids)) == len(generos_ids)
+        assert all(1 <= id_genero <= GENEROS for id_genero in generos_ids)
+
+
+def test_nomes_de_generos_unicos_alem_das_combinacoes():
+    quantidade = 2 * NOMES_DISTINTOS + 10
+
+    generos = list(gerar_generos(quantidade, semente=42))
+
+    assert [genero['id_genero'] for genero in generos] == list(range(1, quantidade + 1))
+    assert len({genero['nome'] for genero in generos}) == quantidade
+
+
+def test_datas_de_lancamento_no_periodo():
+    for colecao in gerar_colecoes(COLECOES * 10, GENEROS, semente=42):
+        assert DATA_INICIAL <= date.fromisoformat(colecao['data_lancamento']) <= DATA_FINAL
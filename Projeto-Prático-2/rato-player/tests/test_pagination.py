@@ -0,0 +1,92 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from rato_player.pagination import decode_cursor, encode_cursor, next_cursor
+from rato_player.schemas import FilterPage
+
+TOTAL = 25
+
+
+@pytest.fixture
+def colecoes(db):
+    colecoes = [
+        {
+            '_id': ObjectId(),
+            'titulo': f'Coleção {i}',
+            'tipo': 'Album',
+            'duracao': 2700,
+            'caminho_capa': f'/capas/{i}.jpg',
+            'data_lancamento': '2000-01-01',
+            'generos_ids': [],
+        }
+        for i in range(TOTAL)
+    ]
+    asyncio.run(db.colecoes.insert_many(colecoes))
+    return [str(colecao['_id']) for colecao in colecoes]
+
+
+def ids_da_pagina(response) -> list[str]:
+    assert response.status_code == HTTPStatus.OK
+    return [colecao['id_colecao'] for colecao in response.json()['colecoes']]
+
+
+@pytest.mark.parametrize('last_id', [1, 2**40, str(ObjectId())])
+def test_cursor_ida_e_volta(last_id):
+    assert decode_cursor(encode_cursor(last_id), type(last_id)) == last_id
+
+
+@pytest.mark.parametrize('cursor', ['!!!', 'bmFvLWUtanNvbg', encode_cursor('1'), encode_cursor(True)])
+def test_cursor_malformado(cursor):
+    with pytest.raises(HTTPException) as erro:
+        decode_cursor(cursor, int)
+
+    assert erro.value.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_next_cursor_so_com_pagina_completa():
+    pagination = FilterPage(limit=3)
+
+    assert next_cursor([1, 2], pagination) is None
+    assert decode_cursor(next_cursor([1, 2, 3], pagination), int) == 3  # noqa: PLR2004
+
+
+@pytest.mark.parametrize('cursor', ['nao-e-um-cursor', encode_cursor(7), encode_cursor('nao-e-objectid')])
+def test_rota_com_cursor_malformado_responde_422(client, colecoes, cursor):
+    response = client.get('/mongo/colecoes/', params={'after': cursor})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json() == {'detail': 'Cursor inválido.'}
+
+
+def test_cursor_equivale_ao_offset(client, colecoes):
+    limit = 10
+    pagina = client.get('/mongo/colecoes/', params={'limit': limit})
+    assert ids_da_pagina(pagina) == sorted(colecoes)[:limit]
+
+    cursor = pagina.json()['next_cursor']
+    seguinte = client.get('/mongo/colecoes/', params={'limit': limit, 'after': cursor})
+
+    assert ids_da_pagina(seguinte) == ids_da_pagina(
+        client.get('/mongo/colecoes/', params={'limit': limit, 'offset': limit})
+    )
+
+
+def test_ultima_pagina_sem_next_cursor(client, colecoes):
+    response = client.get('/mongo/colecoes/', params={'limit': 10, 'offset': 20})
+
+    assert len(ids_da_pagina(response)) == TOTAL - 20
+    assert response.json()['next_cursor'] is None
+
+
+def test_busca_por_relevancia_rejeita_cursor(client, colecoes):
+    response = client.get(
+        '/mongo/colecoes/buscar',
+        params={'titulo': 'coleção', 'modo': 'relevancia', 'after': encode_cursor(colecoes[0])},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json() == {'detail': 'A busca por relevância não suporta cursor; use offset.'}